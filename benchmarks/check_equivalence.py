@@ -0,0 +1,78 @@
+"""
+Check of the fast paths replacing a model on the corpus (fantastic.paths.JSON_DIR, or --json-dir): the tagging of
+the Select guidelines by spaCy only (see tagging_agreement.py) and the plurality of "intrus" found with a regex
+(see intrus_plurality.py) have to agree with the hugging face tagger at least as much as the thresholds, otherwise
+the disagreements are printed and the script exits with the status 1:
+    python -m benchmarks.check_equivalence [--min-tag-agreement 0.9] [--min-color-agreement 0.95]
+    [--min-intrus-agreement 1.0]
+"""
+from configparser import ConfigParser
+import argparse
+import os
+import sys
+import fantastic.paths
+from benchmarks.intrus_plurality import compare_pluralities
+from benchmarks.tagging_agreement import COMPARED_TAGS, agreement, run_taggings
+
+
+def rate(agreed: int, total: int) -> float:
+    """Returns the agreement rate (1 without anything to compare)"""
+    return agreed / total if total else 1.0
+
+
+def check_tagging(json_dir: str, config: ConfigParser, min_tag_agreement: float, min_color_agreement: float):
+    """Returns the failures of the agreement of the spaCy only tagging with the hugging face one"""
+    exercises, (reference, _), (fast, _) = run_taggings(json_dir, config)
+    found, agreed, same_colors, disagreements = agreement(exercises, reference, fast)
+    failures = []
+    for tag_name in COMPARED_TAGS:
+        tag_rate = rate(agreed[tag_name], found[tag_name])
+        print(f"{tag_name:<8} tagging agreement: {tag_rate:.1%} (minimum {min_tag_agreement:.1%})")
+        if tag_rate < min_tag_agreement:
+            failures.append(f"{tag_name} tagging agreement {tag_rate:.1%} < {min_tag_agreement:.1%}")
+    color_rate = rate(same_colors, len(exercises))
+    print(f"same colors to display: {color_rate:.1%} (minimum {min_color_agreement:.1%})")
+    if color_rate < min_color_agreement:
+        failures.append(f"same colors {color_rate:.1%} < {min_color_agreement:.1%}")
+        for guideline, reference_colors, fast_colors in disagreements:
+            print(f"- {guideline!r}\n    hugging face + spaCy: {reference_colors}\n    spaCy only:           {fast_colors}")
+    return failures
+
+
+def check_intrus(json_dir: str, config: ConfigParser, min_intrus_agreement: float):
+    """Returns the failures of the agreement of the regex plurality of "intrus" with the POS tagger one"""
+    guidelines, (tagger_results, _), (regex_results, _) = compare_pluralities(json_dir, config)
+    differences = [
+        (guideline, tagger_result, regex_result)
+        for guideline, tagger_result, regex_result in zip(guidelines, tagger_results, regex_results)
+        if tagger_result != regex_result
+    ]
+    intrus_rate = rate(len(guidelines) - len(differences), len(guidelines))
+    print(f"same plurality of intrus: {intrus_rate:.1%} (minimum {min_intrus_agreement:.1%})")
+    if intrus_rate >= min_intrus_agreement:
+        return []
+    for guideline, tagger_result, regex_result in differences:
+        print(f"- {guideline!r}: POS tagger {tagger_result}, regex {regex_result}")
+    return [f"same plurality of intrus {intrus_rate:.1%} < {min_intrus_agreement:.1%}"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json-dir", default=fantastic.paths.JSON_DIR, help="folder of the json of the exercises")
+    parser.add_argument("--min-tag-agreement", type=float, default=0.9, help="minimal agreement of each tag")
+    parser.add_argument("--min-color-agreement", type=float, default=0.95, help="minimal rate of same colors")
+    parser.add_argument("--min-intrus-agreement", type=float, default=1.0, help="minimal rate of same plurality")
+    args = parser.parse_args()
+
+    config = ConfigParser()
+    config.read(os.path.join(fantastic.paths.FANTASTIC_DIR, "exercises", "data.cfg"))
+    failures = check_tagging(args.json_dir, config, args.min_tag_agreement, args.min_color_agreement)
+    failures += check_intrus(args.json_dir, config, args.min_intrus_agreement)
+    if failures:
+        print("FAILED: " + "; ".join(failures))
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
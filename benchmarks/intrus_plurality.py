@@ -0,0 +1,75 @@
+"""
+Comparison, on every CocheIntrus / CacheIntrus exercise of the corpus (fantastic.paths.JSON_DIR), of the plurality
+of "intrus" found from the words of the guideline (regex) and from the tokens of the hugging face POS tagger
+(previous behaviour), with the time spent by each one:
+    python -m benchmarks.intrus_plurality
+"""
+from configparser import ConfigParser
+import json
+import os
+import time
+import fantastic.paths
+from fantastic.exercises.exercise import Exercise
+from fantastic.exercises.select.intrus_plurality import guideline_words, intrus_plurality
+from fantastic.exercises.utils import generate_nlp_gilf
+
+INTRUS_TYPES = ["CocheIntrus", "CacheIntrus"]
+
+
+def load_intrus_guidelines(json_dir: str, config: ConfigParser):
+    """Returns the guidelines of the CocheIntrus and CacheIntrus exercises of the corpus"""
+    guidelines = []
+    for file_name in sorted(os.listdir(json_dir)):
+        exercise = Exercise(os.path.join(json_dir, file_name), config).load_json()
+        if exercise.json.get("type") in INTRUS_TYPES:
+            guidelines.append(exercise.find_guideline())
+    return guidelines
+
+
+def compare_pluralities(json_dir: str, config: ConfigParser):
+    """
+    Returns the guidelines of the CocheIntrus and CacheIntrus exercises of the corpus, the plurality of "intrus"
+    found in each one with the POS tagger and with the regex, and the time spent by each one
+    """
+    specifiers = [
+        json.loads(config.get("intrus", "specifiers_singular")),
+        json.loads(config.get("intrus", "specifiers_plural")),
+        json.loads(config.get("intrus", "specifiers_both")),
+    ]
+    guidelines = load_intrus_guidelines(json_dir, config)
+
+    nlp_token_class = generate_nlp_gilf()
+    start = time.perf_counter()
+    tagger_results = [
+        intrus_plurality([token["word"] for token in nlp_token_class(guideline)], *specifiers)
+        for guideline in guidelines
+    ]
+    tagger_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    regex_results = [intrus_plurality(guideline_words(guideline), *specifiers) for guideline in guidelines]
+    regex_time = time.perf_counter() - start
+    return guidelines, (tagger_results, tagger_time), (regex_results, regex_time)
+
+
+def main():
+    config = ConfigParser()
+    config.read(os.path.join(fantastic.paths.FANTASTIC_DIR, "exercises", "data.cfg"))
+    guidelines, (tagger_results, tagger_time), (regex_results, regex_time) = compare_pluralities(
+        fantastic.paths.JSON_DIR, config
+    )
+    print(f"{len(guidelines)} CocheIntrus / CacheIntrus guidelines")
+    print(f"{'POS tagger':<12} {tagger_time:8.3f} s")
+    print(f"{'regex':<12} {regex_time:8.3f} s")
+    differences = [
+        (guideline, tagger_result, regex_result)
+        for guideline, tagger_result, regex_result in zip(guidelines, tagger_results, regex_results)
+        if tagger_result != regex_result
+    ]
+    print(f"same plurality: {len(guidelines) - len(differences)}/{len(guidelines)}")
+    for guideline, tagger_result, regex_result in differences:
+        print(f"- {guideline!r}: POS tagger {tagger_result}, regex {regex_result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark of the json layer (fantastic/serializer.py) on the exercises of the corpus (fantastic.paths.JSON_DIR):
+time to load and dump every json with the previous code (json module, text files, indent=4) and with the
+serializer (orjson if installed, bytes, compact output):
+    python -m benchmarks.json_layer [--repeat 5] [--json-dir folder]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import fantastic.paths
+from fantastic import serializer
+
+
+def stdlib_load(path: str):
+    """Previous loading of a json (Exercise.load_json, main)"""
+    with open(path, "r", encoding="UTF-8") as json_file:
+        return json.load(json_file)
+
+
+def stdlib_dump(obj, path: str) -> None:
+    """Previous writing of a json (jsonify, add_tag_to_json)"""
+    with open(path, mode="w", encoding="UTF-8") as json_file:
+        json.dump(obj, json_file, indent=4, ensure_ascii=False)
+
+
+def measure(function, items, repeat: int) -> float:
+    """Returns the time (s) to call the function on every item, repeat times"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            function(*item)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5, help="number of passes over the corpus")
+    parser.add_argument("--json-dir", default=fantastic.paths.JSON_DIR, help="folder of the json files")
+    args = parser.parse_args()
+
+    paths = [
+        os.path.join(args.json_dir, file_name) for file_name in sorted(os.listdir(args.json_dir))
+        if file_name.endswith(".json")
+    ]
+    objects = [stdlib_load(path) for path in paths]
+    different = sum(serializer.load(path) != obj for path, obj in zip(paths, objects))
+    print(f"{len(paths)} json files, serializer backend: {serializer.BACKEND}, {different} loaded differently")
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        output_paths = [os.path.join(output_dir, os.path.basename(path)) for path in paths]
+        results = [
+            ("load, json module", measure(stdlib_load, [(path,) for path in paths], args.repeat)),
+            ("load, serializer", measure(serializer.load, [(path,) for path in paths], args.repeat)),
+            ("dump, json module", measure(stdlib_dump, list(zip(objects, output_paths)), args.repeat)),
+        ]
+        stdlib_size = sum(os.path.getsize(path) for path in output_paths)
+        results.append(("dump, serializer", measure(serializer.dump, list(zip(objects, output_paths)), args.repeat)))
+        serializer_size = sum(os.path.getsize(path) for path in output_paths)
+
+    for name, elapsed in results:
+        print(f"{name:<20} {elapsed:8.3f} s")
+    print(f"size of the files: {stdlib_size / 1024:.0f} kB (indent=4), {serializer_size / 1024:.0f} kB (compact)")
+
+
+if __name__ == "__main__":
+    main()
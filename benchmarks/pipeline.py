@@ -0,0 +1,160 @@
+"""
+End-to-end benchmark of the adaptation pipeline of fantastic/main.py (create_template().load_json(), adapt,
+write_template) on a synthetic corpus (see benchmarks/synthetic.py), with stubbed nlp models (see
+benchmarks/stub_nlp.py, the Punkt sentence tokenizer too when its nltk data is not downloaded) so that it runs
+offline. Reports as json, for each class: the throughput, the p50 / p99
+latency of one exercise and the peak memory:
+    python -m benchmarks.pipeline [--count 20] [--sentences 6] [--types CocheMots Swap] [--output report.json]
+"""
+from collections import defaultdict
+from configparser import ConfigParser
+from typing import Dict, List
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+import fantastic.paths
+from fantastic.exercises import nlp_cache
+from fantastic.main import class_name_dict
+from benchmarks.stub_nlp import stub_nlp, stub_nlp_token_class, stub_sentence_tokenizer
+from benchmarks.synthetic import GENERATORS, generate_corpus
+
+
+def percentile(values: List[float], rank: float) -> float:
+    """Returns the value under which rank % of the values are (nearest rank)"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(rank / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def use_available_sentence_tokenizer() -> str:
+    """Replaces the Punkt sentence tokenizer by its stub if its nltk data is not downloaded, returns the one used"""
+    try:
+        nlp_cache.sentence_tokenizer("french")
+        return "punkt"
+    except LookupError:
+        nlp_cache.sentence_tokenizer = stub_sentence_tokenizer
+        return "stub"
+
+
+def adapt_exercise(exercise_class, category: str, json_path: str, config: ConfigParser):
+    """Adapts one exercise as fantastic/main.py does"""
+    exercise = exercise_class(json_path, config)
+    exercise.create_template().load_json()
+    if category == "Select":
+        exercise.adapt(stub_nlp_token_class, stub_nlp)
+    else:
+        exercise.adapt()
+    os.makedirs(os.path.join(fantastic.paths.OUTPUT_DIR, exercise.output_folder_name), exist_ok=True)
+    exercise.write_template()
+
+
+def run(paths_by_type: Dict[str, List[str]], config: ConfigParser, measure_memory: bool = True) -> dict:
+    """
+    Adapts all the exercises of each type and returns the report of each class
+
+    Parameters:
+        paths_by_type (Dict[str, List[str]]): The paths of the json files of each type of exercise
+        config (ConfigParser): The content of data.cfg
+        measure_memory (bool) (default: True): Whether to trace the allocations (slower) to get the peak memory
+    Returns:
+        report (dict): For each class, its throughput, latencies, peak memory and errors
+    """
+    categories = {
+        exercise_type: (category, classes[exercise_type])
+        for category, classes in class_name_dict.items()
+        for exercise_type in classes
+    }
+    latencies = defaultdict(list)
+    peaks = defaultdict(int)
+    errors = defaultdict(list)
+    if measure_memory:
+        tracemalloc.start()
+    try:
+        for exercise_type, paths in paths_by_type.items():
+            category, exercise_class = categories[exercise_type]
+            if measure_memory:
+                tracemalloc.reset_peak()
+                memory_start, _ = tracemalloc.get_traced_memory()
+            for json_path in paths:
+                start = time.perf_counter()
+                try:
+                    adapt_exercise(exercise_class, category, json_path, config)
+                except Exception as e:
+                    message = str(e).strip().split("\n")[0]
+                    errors[exercise_class.__name__].append(f"{os.path.basename(json_path)}: {type(e).__name__}: {message}")
+                    continue
+                latencies[exercise_class.__name__].append(time.perf_counter() - start)
+            if measure_memory:
+                _, memory_peak = tracemalloc.get_traced_memory()
+                peaks[exercise_class.__name__] = max(peaks[exercise_class.__name__], memory_peak - memory_start)
+    finally:
+        if measure_memory:
+            tracemalloc.stop()
+
+    report = {}
+    for class_name in sorted(set(latencies) | set(errors)):
+        class_latencies = latencies[class_name]
+        total = sum(class_latencies)
+        report[class_name] = {
+            "exercises": len(class_latencies),
+            "errors": len(errors[class_name]),
+            "total_s": round(total, 6),
+            "throughput_per_s": round(len(class_latencies) / total, 2) if total else None,
+            "p50_ms": round(percentile(class_latencies, 50) * 1000, 3) if class_latencies else None,
+            "p99_ms": round(percentile(class_latencies, 99) * 1000, 3) if class_latencies else None,
+            "peak_memory_kb": round(peaks[class_name] / 1024, 1) if measure_memory else None,
+            "first_errors": errors[class_name][:3],
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=20, help="number of exercises per type")
+    parser.add_argument("--sentences", type=int, default=6, help="number of sentences per exercise text")
+    parser.add_argument("--types", nargs="*", default=list(GENERATORS), help="types of exercises to run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="do not trace the allocations (faster)")
+    parser.add_argument("--output", help="json file of the report (printed otherwise)")
+    args = parser.parse_args()
+
+    config = ConfigParser()
+    config.read(os.path.join(fantastic.paths.FANTASTIC_DIR, "exercises", "data.cfg"))
+    sentence_tokenizer = use_available_sentence_tokenizer()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        json_dir = os.path.join(work_dir, "json")
+        paths = generate_corpus(json_dir, args.types, args.count, args.sentences, args.seed)
+        paths_by_type = defaultdict(list)
+        for path in paths:
+            with open(path, "r", encoding="utf-8") as json_file:
+                paths_by_type[json.load(json_file)["type"]].append(path)
+
+        # the html files are written in the temporary folder, not in the output folder of the project
+        output_dir = fantastic.paths.OUTPUT_DIR
+        fantastic.paths.OUTPUT_DIR = os.path.join(work_dir, "output")
+        try:
+            start = time.perf_counter()
+            classes_report = run(paths_by_type, config, not args.no_memory)
+            elapsed = time.perf_counter() - start
+        finally:
+            fantastic.paths.OUTPUT_DIR = output_dir
+
+    report = {
+        "settings": {"count": args.count, "sentences": args.sentences, "seed": args.seed, "types": args.types},
+        "sentence_tokenizer": sentence_tokenizer,
+        "total_s": round(elapsed, 6),
+        "classes": classes_report,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2, ensure_ascii=False)
+    else:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
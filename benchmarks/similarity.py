@@ -0,0 +1,75 @@
+"""
+Benchmark of the Levenshtein scoring of the Choose guidelines (compare_choices and __has_choices)
+on the Choose exercises of the corpus (fantastic.paths.JSON_DIR):
+    python -m benchmarks.similarity [--repeat 5]
+"""
+from configparser import ConfigParser
+import argparse
+import json
+import os
+import time
+import fantastic.paths
+from fantastic.exercises.exercise import Exercise
+from fantastic.exercises.choose import similarity
+from fantastic.exercises.choose.explore_guideline import find_choices_in_guideline
+
+CHOOSE_TYPES = ["CM", "ClasseCM", "VraiFaux"]
+
+
+def load_choose_guidelines(json_dir: str, config: ConfigParser):
+    """Returns the guidelines of the Choose exercises of the corpus"""
+    guidelines = []
+    for file_name in sorted(os.listdir(json_dir)):
+        exercise = Exercise(os.path.join(json_dir, file_name), config).load_json()
+        if exercise.json.get("type") in CHOOSE_TYPES:
+            guidelines.append(exercise.find_guideline())
+    return guidelines
+
+
+def run(guidelines, config: ConfigParser, use_rapidfuzz: bool, use_cache: bool):
+    """Returns the choices found in all the guidelines and the time spent"""
+    guideline_separators = json.loads(config.get("choose", "guideline_separators"))
+    end_last_choice_patterns = json.loads(config.get("choose", "end_last_choice_patterns"))
+    rapidfuzz_levenshtein = similarity.rapidfuzz_levenshtein
+    if not use_rapidfuzz:
+        similarity.rapidfuzz_levenshtein = None
+    similarity.clear_caches()
+    start = time.perf_counter()
+    results = []
+    try:
+        for guideline in guidelines:
+            if not use_cache:
+                similarity.clear_caches()
+            try:
+                results.append(find_choices_in_guideline(guideline, guideline_separators, end_last_choice_patterns))
+            except Exception as e:
+                results.append(type(e).__name__)
+    finally:
+        similarity.rapidfuzz_levenshtein = rapidfuzz_levenshtein
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5, help="number of passes over the corpus")
+    args = parser.parse_args()
+
+    config = ConfigParser()
+    config.read(os.path.join(fantastic.paths.FANTASTIC_DIR, "exercises", "data.cfg"))
+    guidelines = load_choose_guidelines(fantastic.paths.JSON_DIR, config) * args.repeat
+    print(f"{len(guidelines)} Choose guidelines ({args.repeat} passes)")
+
+    modes = [("python-Levenshtein, no cache", False, False), ("python-Levenshtein + LRU", False, True)]
+    if similarity.rapidfuzz_levenshtein is not None:
+        modes += [("rapidfuzz, no cache", True, False), ("rapidfuzz + LRU", True, True)]
+    reference = None
+    for name, use_rapidfuzz, use_cache in modes:
+        results, elapsed = run(guidelines, config, use_rapidfuzz, use_cache)
+        if reference is None:
+            reference = results
+        same = "identical" if results == reference else "DIFFERENT"
+        print(f"{name:<32} {elapsed:8.3f} s  ({same} choices)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark of the splitting of the words into selectable entities (utils.split_word) on the texts of the Select
+exercises of the corpus (fantastic.paths.JSON_DIR), compared to the previous recursive implementation:
+    python -m benchmarks.split_word [--repeat 5]
+"""
+from configparser import ConfigParser
+import argparse
+import os
+import time
+import fantastic.paths
+from fantastic.main import class_name_dict
+from fantastic.exercises.exercise import Exercise
+from fantastic.exercises.utils import clean_entities_spaces, iter_split_words, split_word
+
+
+def recursive_split_word(word: str, split_characters: str) -> list:
+    """Previous implementation of split_word (one recursive call and one copy of the word per split character)"""
+    if word[0] in split_characters:
+        if len(word) == 1:
+            return [word]
+        return [word[0]] + recursive_split_word(word[1:], split_characters)
+    for i in range(len(word) - 1):
+        if word[i] in split_characters:
+            return [word[:i], word[i]] + recursive_split_word(word[i + 1 :], split_characters)
+    if word[-1] in split_characters:
+        return [word[:-1], word[-1]]
+    return [word]
+
+
+def load_select_words(json_dir: str, config: ConfigParser):
+    """Returns the words (parts of the texts between two spaces) of the Select exercises of the corpus"""
+    words = []
+    for file_name in sorted(os.listdir(json_dir)):
+        exercise = Exercise(os.path.join(json_dir, file_name), config).load_json()
+        if exercise.json.get("type") not in class_name_dict["Select"]:
+            continue
+        for sentence in exercise.find_sentences():
+            if isinstance(sentence, str):
+                words += [word for word in clean_entities_spaces(sentence.split(" ")) if word]
+    return words
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5, help="number of passes over the corpus")
+    args = parser.parse_args()
+
+    config = ConfigParser()
+    config.read(os.path.join(fantastic.paths.FANTASTIC_DIR, "exercises", "data.cfg"))
+    split_characters = config.get("classe", "split_characters").strip('"')
+    words = load_select_words(fantastic.paths.JSON_DIR, config) * args.repeat
+    print(f"{len(words)} words of Select exercises ({args.repeat} passes)")
+
+    modes = [
+        ("recursive", lambda: [entity for word in words for entity in recursive_split_word(word, split_characters)]),
+        ("regex, word by word", lambda: [entity for word in words for entity in split_word(word, split_characters)]),
+        ("regex, generator", lambda: list(iter_split_words(words, split_characters))),
+    ]
+    reference = None
+    for name, split_words in modes:
+        start = time.perf_counter()
+        entities = split_words()
+        elapsed = time.perf_counter() - start
+        if reference is None:
+            reference = entities
+        same = "identical" if entities == reference else "DIFFERENT"
+        print(f"{name:<24} {elapsed:8.3f} s  ({same} entities)")
+
+
+if __name__ == "__main__":
+    main()
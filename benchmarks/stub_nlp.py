@@ -0,0 +1,125 @@
+"""
+Lexicon-based stand-ins for the nlp models of the Select exercises (spaCy fr_core_news_sm and the hugging face
+POS tagger) and for the Punkt sentence tokenizer of nltk, so that the benchmarks run offline without downloading
+any model. The tags are only plausible: the stubs measure the conversion around the models, not the models.
+"""
+from typing import Iterator, List, Tuple
+import re
+from fantastic.exercises.utils import spacy_to_gilf_tokens
+
+# SENTENCE_END_PATTERN: The spaces after the end of a sentence
+SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?…])\s+")
+# TOKEN_PATTERN: The tokens of a text (words with their elision apostrophe, or punctuation)
+TOKEN_PATTERN = re.compile(r"\w+['’]?|[^\w\s]")
+
+AUXILIARIES = {"est", "sont", "a", "ont", "était", "avait"}
+VERBS = {
+    "souligne", "entoure", "coche", "colorie", "classe", "encadre", "cache", "relève", "recopie",
+    "complète", "écris", "remets", "lis", "choisis", "mange", "joue", "court", "regarde", "chante",
+    "dort", "lit", "porte", "aime", "range",
+}
+INFINITIVES_ENDINGS = ("er", "ir", "re")
+DETERMINERS = {"le", "la", "les", "l'", "l’", "un", "une", "des", "chaque", "ce", "cette", "ces", "mon", "ton", "son"}
+RELATIVE_PRONOUNS = {"qui", "que", "qu'", "qu’", "dont", "où", "lesquels", "lesquelles"}
+PRONOUNS = {"il", "elle", "ils", "elles", "je", "tu", "nous", "vous", "on"}
+ADPOSITIONS = {"dans", "de", "à", "avec", "pour", "sur", "sous", "en", "par", "du", "au", "aux"}
+CONJUNCTIONS = {"et", "ou", "mais", "puis"}
+ADJECTIVES = {"vert", "bleu", "rouge", "noir", "petit", "grand", "gentil", "content", "joli", "bon"}
+
+
+class StubMorph:
+    """The morphology of a token (only what spacy_gilf_tag reads)"""
+
+    __slots__ = ("features",)
+
+    def __init__(self, features: dict) -> None:
+        self.features = features
+
+    def get(self, feature: str) -> List[str]:
+        return self.features.get(feature, [])
+
+
+class StubToken:
+    """A token with the attributes of a spaCy token used by the Select exercises"""
+
+    __slots__ = ("text", "idx", "pos_", "tag_", "morph", "is_space")
+
+    def __init__(self, text: str, idx: int, pos: str, morph: dict = None) -> None:
+        self.text = text
+        self.idx = idx
+        self.pos_ = pos
+        self.tag_ = pos
+        self.morph = StubMorph(morph or {})
+        self.is_space = False
+
+
+class StubDoc:
+    """A tagged text with the interface of a spaCy doc used by the Select exercises"""
+
+    def __init__(self, text: str, tokens: List[StubToken]) -> None:
+        self.text = text
+        self.tokens = tokens
+
+    def __iter__(self) -> Iterator[StubToken]:
+        return iter(self.tokens)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    @property
+    def sents(self) -> List["StubDoc"]:
+        return [self]
+
+
+def tag_word(word: str) -> Tuple[str, dict]:
+    """Returns the universal POS and the morphology of a word from the lexicons"""
+    lower = word.lower()
+    if not word[0].isalnum():
+        return "PUNCT", {}
+    if lower in AUXILIARIES:
+        return "AUX", {"VerbForm": ["Fin"]}
+    if lower in VERBS:
+        return "VERB", {"VerbForm": ["Fin"]}
+    if lower in RELATIVE_PRONOUNS:
+        return "PRON", {"PronType": ["Rel"]}
+    if lower in PRONOUNS:
+        return "PRON", {}
+    if lower in DETERMINERS:
+        return "DET", {}
+    if lower in ADPOSITIONS:
+        return "ADP", {}
+    if lower in CONJUNCTIONS:
+        return "CCONJ", {}
+    if lower in ADJECTIVES:
+        return "ADJ", {}
+    if lower.isdigit():
+        return "NUM", {}
+    if len(lower) > 4 and lower.endswith(INFINITIVES_ENDINGS):
+        return "VERB", {"VerbForm": ["Inf"]}
+    return "NOUN", {}
+
+
+def stub_nlp(text: str) -> StubDoc:
+    """Stand-in for the spaCy model (see generate_nlp_spacy)"""
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(text):
+        pos, morph = tag_word(match[0])
+        tokens.append(StubToken(match[0], match.start(), pos, morph))
+    return StubDoc(text, tokens)
+
+
+def stub_nlp_token_class(text: str) -> List[dict]:
+    """Stand-in for the hugging face POS tagger (see generate_nlp_gilf)"""
+    return spacy_to_gilf_tokens(stub_nlp(text))
+
+
+class StubSentenceTokenizer:
+    """Stand-in for the Punkt sentence tokenizer (splits after the final punctuation of the sentences)"""
+
+    def tokenize(self, text: str) -> List[str]:
+        return [sentence for sentence in SENTENCE_END_PATTERN.split(text) if sentence]
+
+
+def stub_sentence_tokenizer(language: str = "french") -> StubSentenceTokenizer:
+    """Stand-in for nlp_cache.sentence_tokenizer"""
+    return StubSentenceTokenizer()
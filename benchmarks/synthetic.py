@@ -0,0 +1,145 @@
+"""
+Generator of a synthetic corpus of exercises (same json format as the corpus of fantastic.paths.JSON_DIR)
+with exercises of every type of fantastic.main.class_name_dict, at a configurable size:
+    python -m benchmarks.synthetic output_dir [--count 20] [--sentences 6] [--seed 0]
+"""
+from typing import Callable, Dict, List
+import argparse
+import json
+import os
+import random
+
+SUBJECTS = ["Le chat", "La petite fille", "Mon frère", "Le maître", "Les enfants", "Ma voisine", "Le chien", "Paul"]
+VERBS = ["mange", "regarde", "porte", "aime", "range", "chante", "lit", "dort"]
+COMPLEMENTS = [
+    "une pomme verte", "le grand livre", "dans le jardin", "avec ses amis", "sous la table",
+    "une chanson", "les jouets", "le journal du matin", "au bord de la mer", "un bon gâteau",
+]
+WORDS = ["chat", "maison", "courir", "joli", "table", "manger", "vert", "lentement", "école", "chanter", "bleu", "arbre"]
+CHOICES = [("a", "à"), ("et", "est"), ("ou", "où"), ("son", "sont"), ("ce", "se")]
+
+
+def sentence(rng: random.Random) -> str:
+    """Returns a random sentence: subject, verb, complement"""
+    return f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(COMPLEMENTS)}."
+
+
+def numbered(sentences: List[str]) -> str:
+    """Returns the sentences numbered as in the textbooks (ex: "1. Le chat dort. 2. ...")"""
+    return " ".join(f"{number}. {text}" for number, text in enumerate(sentences, 1))
+
+
+def fill_text(rng: random.Random, size: int) -> str:
+    """Sentences with a word to write in each one (…)"""
+    sentences = []
+    for _ in range(size):
+        words = sentence(rng).split(" ")
+        words[rng.randrange(1, len(words))] = "…"
+        sentences.append(" ".join(words))
+    return numbered(sentences)
+
+
+def list_text(rng: random.Random, size: int, separator: str = " ◆ ") -> str:
+    """Lists of words separated by a symbol"""
+    return numbered([separator.join(rng.sample(WORDS, 4)) + "." for _ in range(size)])
+
+
+def groups_text(rng: random.Random, size: int) -> str:
+    """Sentences cut into groups of words by a symbol"""
+    return numbered([" / ".join(sentence(rng)[:-1].split(" ", 2)) + "." for _ in range(size)])
+
+
+def swap_text(rng: random.Random, size: int) -> str:
+    """Sentences whose words are mixed up, separated by a symbol"""
+    texts = []
+    for _ in range(size):
+        words = sentence(rng)[:-1].lower().split(" ")
+        rng.shuffle(words)
+        texts.append(" ◆ ".join(words))
+    return numbered(texts)
+
+
+def text(rng: random.Random, size: int) -> str:
+    """A text made of sentences"""
+    return " ".join(sentence(rng) for _ in range(size))
+
+
+def choose_guideline(rng: random.Random) -> str:
+    """A guideline with the choices of a Choose exercise"""
+    first, second = rng.choice(CHOICES)
+    return f"Recopie les phrases et complète avec {first} ou {second}."
+
+
+# GENERATORS: For each type of exercise, the function returning its guideline and its exercise text
+GENERATORS: Dict[str, Callable[[random.Random, int], tuple]] = {
+    # Fill
+    "ExpressionEcrite": lambda rng, size: ("Écris un texte pour raconter ta journée.", text(rng, size)),
+    "RC": lambda rng, size: ("Complète les phrases avec le mot qui convient.", fill_text(rng, size)),
+    "RCCadre": lambda rng, size: ("Complète le tableau.", fill_text(rng, size)),
+    "RCDouble": lambda rng, size: ("Complète les phrases.", fill_text(rng, size)),
+    "RCImage": lambda rng, size: ("Complète avec les mots de l'image.", fill_text(rng, size)),
+    "EditPhrase": lambda rng, size: ("Corrige les phrases.", numbered([sentence(rng) for _ in range(size)])),
+    "TransformePhrase": lambda rng, size: ("Mets les phrases au pluriel.", numbered([sentence(rng) for _ in range(size)])),
+    "TransformeMot": lambda rng, size: ("Conjugue les verbes au présent ➞ nous.", list_text(rng, size)),
+    # Select
+    "Classe": lambda rng, size: ("Classe les mots dans le tableau : noms ou verbes.", list_text(rng, size, " - ")),
+    "CacheIntrus": lambda rng, size: ("Dans chaque liste, cache l'intrus.", list_text(rng, size, " - ")),
+    "CocheIntrus": lambda rng, size: ("Dans chaque liste, trouve le ou les intrus.", list_text(rng, size, " - ")),
+    "CocheMots": lambda rng, size: ("Souligne les verbes et entoure les sujets.", text(rng, size)),
+    "CochePhrases": lambda rng, size: ("Recopie les phrases et souligne les phrases au présent.", text(rng, size)),
+    "CocheGroupeMots": lambda rng, size: ("Entoure les groupes sujets.", groups_text(rng, size)),
+    # Choose
+    "CM": lambda rng, size: (choose_guideline(rng), fill_text(rng, size)),
+    "ClasseCM": lambda rng, size: ("Écris si le mot est un nom ou un verbe.", list_text(rng, size)),
+    "VraiFaux": lambda rng, size: ("Lis les phrases et écris vrai ou faux.", numbered([sentence(rng) for _ in range(size)])),
+    # Swap
+    "Swap": lambda rng, size: ("Remets les mots dans l'ordre pour écrire une phrase.", swap_text(rng, size)),
+    # Show
+    "Texte": lambda rng, size: ("Lis le texte.", text(rng, size)),
+}
+
+
+def generate_exercise(exercise_type: str, rng: random.Random, size: int) -> dict:
+    """Returns the json of an exercise of the type whose text has size sentences"""
+    guideline, exercise_text = GENERATORS[exercise_type](rng, size)
+    return {"type": exercise_type, "exercice": {"consigne": guideline, "enonce": exercise_text}}
+
+
+def generate_corpus(output_dir: str, exercise_types: List[str], count: int, size: int, seed: int = 0) -> List[str]:
+    """
+    Writes count exercises of each type in output_dir and returns their paths
+
+    Parameters:
+        output_dir (str): The folder of the json files
+        exercise_types (List[str]): The types of exercises (keys of GENERATORS)
+        count (int): The number of exercises per type
+        size (int): The number of sentences (or lists) of each exercise text
+        seed (int) (default: 0): The seed of the random generator (the same corpus for the same seed)
+    Returns:
+        paths (List[str]): The paths of the json files
+    """
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for exercise_type in exercise_types:
+        for number in range(count):
+            path = os.path.join(output_dir, f"synthetic_{exercise_type}_{number}.json")
+            with open(path, "w", encoding="utf-8") as json_file:
+                json.dump(generate_exercise(exercise_type, rng, size), json_file, ensure_ascii=False)
+            paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("output_dir", help="folder of the generated json files")
+    parser.add_argument("--count", type=int, default=20, help="number of exercises per type")
+    parser.add_argument("--sentences", type=int, default=6, help="number of sentences per exercise text")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    paths = generate_corpus(args.output_dir, list(GENERATORS), args.count, args.sentences, args.seed)
+    print(f"{len(paths)} exercises written in {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
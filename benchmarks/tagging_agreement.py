@@ -0,0 +1,121 @@
+"""
+Agreement report between the two taggings of the Select guidelines on the Select exercises of the corpus
+(fantastic.paths.JSON_DIR): the hugging face model + spaCy (default) and the spaCy model only (fast tagging
+mode, [select] section of data.cfg), with the time spent by each one:
+    python -m benchmarks.tagging_agreement [--show 10]
+"""
+from collections import Counter
+from configparser import ConfigParser
+import argparse
+import json
+import os
+import time
+import fantastic.paths
+from fantastic.main import class_name_dict
+from fantastic.exercises.exercise import Exercise
+from fantastic.exercises.utils import (
+    generate_nlp_gilf,
+    generate_nlp_spacy,
+    spacy_to_gilf_tokens,
+)
+
+# COMPARED_TAGS: The tags used by the Select exercises (verbs, common nouns, relative pronouns)
+COMPARED_TAGS = ["V", "NC", "PROREL"]
+
+
+def load_select_exercises(json_dir: str, config: ConfigParser):
+    """Returns the exercises of the Select types of the corpus (instances of their class)"""
+    exercises = []
+    for file_name in sorted(os.listdir(json_dir)):
+        json_path = os.path.join(json_dir, file_name)
+        exercise_type = Exercise(json_path, config).load_json().json.get("type")
+        if exercise_type in class_name_dict["Select"]:
+            exercises.append(class_name_dict["Select"][exercise_type](json_path, config).load_json())
+    return exercises
+
+
+def tag(exercises, nlp_token_class, nlp, fast_tagging: bool):
+    """Returns the tokens and the colors found for each exercise, and the time spent tagging the guidelines"""
+    results = []
+    tagging_time = 0
+    for exercise in exercises:
+        guideline = exercise.find_guideline()
+        start = time.perf_counter()
+        exercise.list_of_guideline_tokens_spacy = nlp(guideline)
+        if fast_tagging:
+            exercise.list_of_guideline_tokens = spacy_to_gilf_tokens(exercise.list_of_guideline_tokens_spacy)
+        else:
+            exercise.list_of_guideline_tokens = nlp_token_class(guideline)
+        tagging_time += time.perf_counter() - start
+        exercise.fast_tagging = fast_tagging
+        tokens = [
+            (token["word"], token["entity_group"])
+            for token in exercise.list_of_guideline_tokens
+            if token["entity_group"] in COMPARED_TAGS
+        ]
+        results.append((tokens, exercise.colors_to_display()))
+    return results, tagging_time
+
+
+def agreement(exercises, reference, fast):
+    """
+    Returns the agreement of the two taggings (see tag)
+
+    Returns:
+        found (Counter): The number of words tagged with each tag by one of the taggings at least
+        agreed (Counter): The number of words tagged with each tag by both taggings
+        same_colors (int): The number of exercises with the same colors to display
+        disagreements (List[tuple]): The guideline and the colors of both taggings of the other exercises
+    """
+    found = Counter()
+    agreed = Counter()
+    same_colors = 0
+    disagreements = []
+    for exercise, (reference_tokens, reference_colors), (fast_tokens, fast_colors) in zip(exercises, reference, fast):
+        for tag_name in COMPARED_TAGS:
+            reference_words = Counter(word for word, token_tag in reference_tokens if token_tag == tag_name)
+            fast_words = Counter(word for word, token_tag in fast_tokens if token_tag == tag_name)
+            found[tag_name] += sum((reference_words | fast_words).values())
+            agreed[tag_name] += sum((reference_words & fast_words).values())
+        if reference_colors == fast_colors:
+            same_colors += 1
+        else:
+            disagreements.append((exercise.find_guideline(), reference_colors, fast_colors))
+    return found, agreed, same_colors, disagreements
+
+
+def run_taggings(json_dir: str, config: ConfigParser):
+    """Returns the Select exercises of the corpus and the result and time of both taggings (see tag)"""
+    disabled_components = json.loads(config.get("select", "fast_tagging_disabled_components"))
+    exercises = load_select_exercises(json_dir, config)
+    reference, reference_time = tag(exercises, generate_nlp_gilf(), generate_nlp_spacy(), False)
+    fast, fast_time = tag(exercises, None, generate_nlp_spacy(disabled_components), True)
+    return exercises, (reference, reference_time), (fast, fast_time)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--show", type=int, default=10, help="number of disagreements printed")
+    args = parser.parse_args()
+
+    config = ConfigParser()
+    config.read(os.path.join(fantastic.paths.FANTASTIC_DIR, "exercises", "data.cfg"))
+    disabled_components = json.loads(config.get("select", "fast_tagging_disabled_components"))
+    exercises, (reference, reference_time), (fast, fast_time) = run_taggings(fantastic.paths.JSON_DIR, config)
+    print(f"{len(exercises)} Select guidelines")
+    print(f"{'hugging face + spaCy':<24} {reference_time:8.3f} s")
+    print(f"{'spaCy only':<24} {fast_time:8.3f} s  (parser and components excluded: {disabled_components})")
+
+    found, agreed, same_colors, disagreements = agreement(exercises, reference, fast)
+
+    for tag_name in COMPARED_TAGS:
+        rate = agreed[tag_name] / found[tag_name] if found[tag_name] else 1.0
+        print(f"{tag_name:<8} words tagged by both models: {agreed[tag_name]}/{found[tag_name]} ({rate:.1%})")
+    rate = same_colors / len(exercises) if exercises else 1.0
+    print(f"same colors to display: {same_colors}/{len(exercises)} ({rate:.1%})")
+    for guideline, reference_colors, fast_colors in disagreements[:args.show]:
+        print(f"- {guideline!r}\n    hugging face + spaCy: {reference_colors}\n    spaCy only:           {fast_colors}")
+
+
+if __name__ == "__main__":
+    main()
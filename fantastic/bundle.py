@@ -0,0 +1,152 @@
+"""
+Bundle mode of the output: the adapted exercises of a textbook in one gzipped json instead of one html file
+per exercise. The html of an exercise is split into its layout (the part before and after the body, the same for
+all the exercises of a template, with the references to the shared css and js files) and its body fragment:
+    {"manifest": {"name": ..., "layouts": {layout_id: {"prefix", "suffix", "css", "js"}},
+                  "exercises": {id: {"type", "layout", "title", "size", "sha256"}}},
+     "pages": {id: body fragment}}
+The manifest is also written uncompressed next to the bundle. The pages are extracted on demand by
+fantastic/correction/static/js/bundle_loader.js (in the browser) or by extract_page.
+"""
+from datetime import datetime
+from typing import Dict, List, Tuple
+import gzip
+import hashlib
+import os
+import re
+from fantastic import serializer
+
+# BUNDLE_FOLDER: The folder of the output folder the bundles are written in (not a type of exercise)
+BUNDLE_FOLDER = "bundles"
+# BUNDLE_SUFFIX / MANIFEST_SUFFIX: The extensions of the bundle and of its manifest
+BUNDLE_SUFFIX = ".bundle.json.gz"
+MANIFEST_SUFFIX = ".manifest.json"
+
+BODY_PATTERN = re.compile(r"(?s)^(.*?<body[^>]*>)(.*)(</body>.*)$")
+TITLE_PATTERN = re.compile(r"(?s)<title>(.*?)</title>")
+STYLESHEET_PATTERN = re.compile(r"<link[^>]*rel=[\"']stylesheet[\"'][^>]*href=[\"']([^\"']+)[\"']")
+SCRIPT_PATTERN = re.compile(r"<script[^>]*src=[\"']([^\"']+)[\"']")
+# EMPTY_TITLE: The title of the prefix of a layout, replaced by the title of the exercise
+EMPTY_TITLE = "<title></title>"
+
+
+def split_html(html: str) -> Tuple[str, str, str, str]:
+    """
+    Returns the prefix (before the body, without the title), the title, the body fragment
+    and the suffix (after the body) of the html of an exercise
+    """
+    match = BODY_PATTERN.match(html)
+    if match is None:  # not a page: all of it is the fragment
+        return "", "", html, ""
+    prefix, fragment, suffix = match.groups()
+    title_match = TITLE_PATTERN.search(prefix)
+    title = title_match.group(1) if title_match else ""
+    if title_match:
+        prefix = prefix[: title_match.start()] + EMPTY_TITLE + prefix[title_match.end():]
+    return prefix, title, fragment, suffix
+
+
+def join_html(prefix: str, title: str, fragment: str, suffix: str) -> str:
+    """Returns the html of an exercise from its parts (see split_html)"""
+    return prefix.replace(EMPTY_TITLE, f"<title>{title}</title>", 1) + fragment + suffix
+
+
+class BundleWriter:
+    """
+    Collects the html of the adapted exercises (see Exercise.write_template) and writes them as a bundle when closed
+
+    Class attributes:
+        name (str): The name of the bundle (the textbook)
+        output_dir (str): The folder of the bundle and of its manifest
+        layouts (Dict[str, dict]): The layouts of the pages by id (hash of the prefix and suffix)
+        exercises (Dict[str, dict]): The entry of each exercise in the manifest
+        pages (Dict[str, str]): The body fragment of each exercise
+    """
+
+    def __init__(self, output_dir: str, name: str) -> None:
+        self.name = name
+        self.output_dir = output_dir
+        self.layouts = {}
+        self.exercises = {}
+        self.pages = {}
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.output_dir, self.name + BUNDLE_SUFFIX)
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.output_dir, self.name + MANIFEST_SUFFIX)
+
+    def add(self, exercise_id: str, exercise_type: str, html: str) -> None:
+        """Adds the html of the exercise (type: the output folder of its class, ex: "coche_mots")"""
+        prefix, title, fragment, suffix = split_html(html)
+        layout_id = hashlib.sha1((prefix + "\0" + suffix).encode("utf-8")).hexdigest()[:12]
+        if layout_id not in self.layouts:
+            self.layouts[layout_id] = {
+                "prefix": prefix,
+                "suffix": suffix,
+                "css": STYLESHEET_PATTERN.findall(prefix),
+                "js": sorted(set(SCRIPT_PATTERN.findall(fragment + suffix))),
+            }
+        else:
+            js = set(self.layouts[layout_id]["js"]) | set(SCRIPT_PATTERN.findall(fragment))
+            self.layouts[layout_id]["js"] = sorted(js)
+        self.exercises[exercise_id] = {
+            "type": exercise_type,
+            "layout": layout_id,
+            "title": title,
+            "size": len(fragment.encode("utf-8")),
+            "sha256": hashlib.sha256(html.encode("utf-8")).hexdigest(),
+        }
+        self.pages[exercise_id] = fragment
+
+    def manifest(self) -> dict:
+        return {
+            "name": self.name,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "count": len(self.exercises),
+            "layouts": self.layouts,
+            "exercises": self.exercises,
+        }
+
+    def close(self) -> None:
+        """Writes the bundle and its manifest (replacing the previous ones only once they are complete)"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        manifest = self.manifest()
+        data = gzip.compress(serializer.dumps({"manifest": manifest, "pages": self.pages}), mtime=0)
+        for path, content in [(self.path, data), (self.manifest_path, serializer.dumps(manifest, pretty=True))]:
+            with open(path + ".tmp", "wb") as bundle_file:
+                bundle_file.write(content)
+            os.replace(path + ".tmp", path)
+
+    def __enter__(self) -> "BundleWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def load_bundle(path: str) -> dict:
+    """Returns the content of the bundle (manifest and pages)"""
+    with open(path, "rb") as bundle_file:
+        return serializer.loads(gzip.decompress(bundle_file.read()))
+
+
+def list_pages(bundle: dict) -> List[str]:
+    """Returns the ids of the exercises of the bundle"""
+    return list(bundle["manifest"]["exercises"])
+
+
+def extract_page(bundle: dict, exercise_id: str) -> str:
+    """Returns the html of the exercise of the bundle (the same html as the standalone file)"""
+    entry = bundle["manifest"]["exercises"][exercise_id]
+    layout = bundle["manifest"]["layouts"][entry["layout"]]
+    return join_html(layout["prefix"], entry["title"], bundle["pages"][exercise_id], layout["suffix"])
+
+
+def bundle_stats(bundle: Dict[str, dict], path: str) -> dict:
+    """Returns the number of exercises and the sizes of the pages and of the bundle"""
+    html_size = sum(len(extract_page(bundle, exercise_id).encode("utf-8")) for exercise_id in list_pages(bundle))
+    return {"exercises": len(list_pages(bundle)), "html_kb": round(html_size / 1024, 1),
+            "bundle_kb": round(os.path.getsize(path) / 1024, 1)}
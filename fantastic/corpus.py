@@ -0,0 +1,283 @@
+"""
+Packed corpus: the json of every exercise of fantastic.paths.JSON_DIR in one append-only file of length-prefixed
+records, with an offset index, read through mmap (random access by exercise id without opening one file per
+exercise). Used instead of JSON_DIR when use_pack=true in the [corpus] section of data.cfg, except for the
+exercises whose json file changed since it was packed (ex: tagged again by fantastic/etl). To build it:
+    python -m fantastic.corpus [--json-dir folder] [--pack file]
+"""
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+import argparse
+import mmap
+import os
+import struct
+import fantastic.paths
+from fantastic import serializer
+
+# MAGIC: The first bytes of a pack file (format version 1)
+MAGIC = b"FANTASTIC-PACK-1\n"
+# RECORD_HEADER: The lengths of the id (utf-8) and of the json of a record, before them
+RECORD_HEADER = struct.Struct("<HI")
+# INDEX_SUFFIX: The extension of the index of a pack (next to it)
+INDEX_SUFFIX = ".idx"
+# OPEN_PACKS: The packs mapped in memory by path (None if there is no pack), see open_pack
+OPEN_PACKS: Dict[str, Optional["PackedCorpus"]] = {}
+
+
+class PackWriter:
+    """
+    Appends exercises to a pack file (created if needed) and writes its index when closed.
+    An exercise appended again replaces the previous one (the last record of an id is the one read).
+
+    Class attributes:
+        path (str): The path of the pack file
+        index (Dict[str, Tuple[int, int]]): The offset and length of the json of each exercise id
+        sources (Dict[str, Tuple[int, int]]): The size and modification time (ns) of the json file of each exercise
+        when it was packed
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.index = {}
+        self.sources = {}
+        # the pack mapped in memory is closed before the file is truncated or appended to
+        close_pack(path)
+        if os.path.exists(path):
+            self.index = dict(scan_pack(path))
+            self.sources = {
+                exercise_id: source for exercise_id, source in read_index(path)[1].items() if exercise_id in self.index
+            }
+            # a record truncated by an interrupted write is dropped before appending
+            end = max((offset + length for offset, length in self.index.values()), default=len(MAGIC))
+            os.truncate(path, end if os.path.getsize(path) >= len(MAGIC) else 0)
+        self.__file = open(path, "ab")
+        if self.__file.tell() == 0:
+            self.__file.write(MAGIC)
+
+    def append(self, exercise_id: str, data: bytes, source: Optional[Tuple[int, int]] = None) -> None:
+        """Appends the json (bytes) of the exercise, with the stats of its file if given (see source_stat)"""
+        id_bytes = exercise_id.encode("utf-8")
+        offset = self.__file.tell()
+        self.__file.write(RECORD_HEADER.pack(len(id_bytes), len(data)))
+        self.__file.write(id_bytes)
+        self.__file.write(data)
+        self.index[exercise_id] = (offset + RECORD_HEADER.size + len(id_bytes), len(data))
+        if source is not None:
+            self.sources[exercise_id] = source
+        else:
+            self.sources.pop(exercise_id, None)
+
+    def close(self) -> None:
+        self.__file.close()
+        write_index(self.path, self.index, self.sources)
+        close_pack(self.path)
+
+    def __enter__(self) -> "PackWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def scan_pack(path: str) -> Iterator[Tuple[str, Tuple[int, int]]]:
+    """Yields the id and the (offset, length) of the json of each record of the pack, in order"""
+    with open(path, "rb") as pack_file:
+        if os.fstat(pack_file.fileno()).st_size <= len(MAGIC):
+            return
+        with mmap.mmap(pack_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[: len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not a pack of exercises")
+            offset = len(MAGIC)
+            while offset + RECORD_HEADER.size <= len(data):
+                id_length, json_length = RECORD_HEADER.unpack_from(data, offset)
+                id_start = offset + RECORD_HEADER.size
+                json_start = id_start + id_length
+                if json_start + json_length > len(data):  # record truncated by an interrupted write
+                    return
+                yield data[id_start:json_start].decode("utf-8"), (json_start, json_length)
+                offset = json_start + json_length
+
+
+def source_stat(json_path: str) -> Tuple[int, int]:
+    """Returns the size and the modification time (ns) of the json file of an exercise"""
+    stat_result = os.stat(json_path)
+    return stat_result.st_size, stat_result.st_mtime_ns
+
+
+def write_index(path: str, index: Dict[str, Tuple[int, int]], sources: Dict[str, Tuple[int, int]] = None) -> None:
+    """Writes the index of the pack next to it, with the size of the pack it was built for and the stats of the files"""
+    serializer.dump({"size": os.path.getsize(path), "index": index, "sources": sources or {}}, path + INDEX_SUFFIX)
+
+
+def read_index(path: str) -> Tuple[Dict[str, Tuple[int, int]], Dict[str, Tuple[int, int]]]:
+    """
+    Returns the index of the pack and the stats of the files packed (see source_stat), the index being rebuilt by
+    scanning the pack if it is missing or outdated (without the stats of the files then)
+    """
+    try:
+        stored = serializer.load(path + INDEX_SUFFIX)
+        if stored["size"] == os.path.getsize(path):
+            index = {exercise_id: tuple(location) for exercise_id, location in stored["index"].items()}
+            sources = {exercise_id: tuple(source) for exercise_id, source in stored.get("sources", {}).items()}
+            return index, sources
+    except (OSError, KeyError, serializer.JSONDecodeError):
+        pass
+    return dict(scan_pack(path)), {}
+
+
+class PackedCorpus:
+    """
+    Read-only access to a pack file mapped in memory
+
+    Class attributes:
+        path (str): The path of the pack file
+        index (Dict[str, Tuple[int, int]]): The offset and length of the json of each exercise id
+        sources (Dict[str, Tuple[int, int]]): The size and modification time (ns) of the json file of each exercise
+        when it was packed
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.index, self.sources = read_index(path)
+        self.__file = open(path, "rb")
+        self.__data = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __contains__(self, exercise_id: str) -> bool:
+        return exercise_id in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def ids(self) -> List[str]:
+        """Returns the ids of the exercises, in the order of the pack"""
+        return sorted(self.index, key=lambda exercise_id: self.index[exercise_id][0])
+
+    def read(self, exercise_id: str) -> bytes:
+        """Returns the json (bytes) of the exercise (KeyError if it is not in the pack)"""
+        offset, length = self.index[exercise_id]
+        return self.__data[offset : offset + length]
+
+    def load(self, exercise_id: str) -> dict:
+        """Returns the json of the exercise as a dict"""
+        return serializer.loads(self.read(exercise_id))
+
+    def is_current(self, exercise_id: str, json_path: str) -> bool:
+        """
+        Returns whether the json of the exercise in the pack is the one of its file: the file has the size and
+        modification time it had when it was packed (or there is no file, or no stats in an index rebuilt by scanning)
+        """
+        source = self.sources.get(exercise_id)
+        if source is None:
+            return True
+        try:
+            return source_stat(json_path) == source
+        except OSError:
+            return True
+
+    def close(self) -> None:
+        self.__data.close()
+        self.__file.close()
+
+
+def open_pack(path: str) -> Optional[PackedCorpus]:
+    """Returns the pack of the path, mapped once for the process (None if there is no pack)"""
+    if path not in OPEN_PACKS:
+        OPEN_PACKS[path] = PackedCorpus(path) if os.path.exists(path) else None
+    return OPEN_PACKS[path]
+
+
+def close_pack(path: str) -> None:
+    """Closes the pack of the path if it is mapped (before it is rewritten), the next open_pack maps it again"""
+    pack = OPEN_PACKS.pop(path, None)
+    if pack is not None:
+        pack.close()
+
+
+def configured_pack(config) -> Optional[PackedCorpus]:
+    """Returns the pack of the [corpus] section of data.cfg if it is used (and exists), None otherwise"""
+    # raw: no interpolation, it is read for every exercise
+    if not config.has_section("corpus") or not config.getboolean("corpus", "use_pack", raw=True):
+        return None
+    return open_pack(config.get("corpus", "pack_path", raw=True).strip('"') or fantastic.paths.CORPUS_PACK_PATH)
+
+
+def list_json_ids(json_dir: str) -> List[str]:
+    """Returns the ids of the json files of the folder"""
+    return [file_name[: -len(".json")] for file_name in os.listdir(json_dir) if file_name.endswith(".json")]
+
+
+def list_exercise_ids(config, json_dir: str = None) -> List[str]:
+    """
+    Returns the ids of the exercises of the corpus: the pack if it is used (with the files of json_dir added
+    since it was built), the files of json_dir otherwise
+    """
+    json_dir = json_dir or fantastic.paths.JSON_DIR
+    pack = configured_pack(config)
+    if pack is not None:
+        packed: Set[str] = set(pack.index)
+        added = list_json_ids(json_dir) if os.path.isdir(json_dir) else []
+        return pack.ids() + [exercise_id for exercise_id in added if exercise_id not in packed]
+    return list_json_ids(json_dir)
+
+
+@lru_cache(maxsize=None)
+def same_folder(folder: str, other_folder: str) -> bool:
+    """Returns whether the two paths are the same folder"""
+    return os.path.abspath(folder) == os.path.abspath(other_folder)
+
+
+def load_exercise_json(json_path: str, config) -> dict:
+    """
+    Returns the json of the exercise file, read from the pack if it is used and holds the exercise as it is in the
+    file (only for the files of fantastic.paths.JSON_DIR, the folder the pack is built from)
+    """
+    pack = configured_pack(config)
+    if pack is not None:
+        folder, file_name = os.path.split(json_path)
+        exercise_id = file_name[: -len(".json")] if file_name.endswith(".json") else file_name
+        if exercise_id in pack and same_folder(folder, fantastic.paths.JSON_DIR) \
+                and pack.is_current(exercise_id, json_path):
+            return pack.load(exercise_id)
+    return serializer.load(json_path)
+
+
+def pack_json_dir(json_dir: str, pack_path: str) -> int:
+    """
+    Writes every json of the folder in a new pack (replacing the previous one) and returns the number of exercises
+
+    Parameters:
+        json_dir (str): The folder of the json files (one per exercise)
+        pack_path (str): The path of the pack file to write
+    Returns:
+        count (int): The number of exercises packed
+    """
+    close_pack(pack_path)
+    for path in (pack_path, pack_path + INDEX_SUFFIX):
+        if os.path.exists(path):
+            os.remove(path)
+    count = 0
+    with PackWriter(pack_path) as writer:
+        for file_name in sorted(os.listdir(json_dir)):
+            if not file_name.endswith(".json"):
+                continue
+            json_path = os.path.join(json_dir, file_name)
+            source = source_stat(json_path)
+            with open(json_path, "rb") as json_file:
+                data = json_file.read()
+            # parsed once to check it and compact it (the pack holds the same json as the file)
+            writer.append(file_name[: -len(".json")], serializer.dumps(serializer.loads(data)), source)
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json-dir", default=fantastic.paths.JSON_DIR, help="folder of the json files")
+    parser.add_argument("--pack", default=fantastic.paths.CORPUS_PACK_PATH, help="pack file to write")
+    args = parser.parse_args()
+    count = pack_json_dir(args.json_dir, args.pack)
+    print(f"{count} exercises packed in {args.pack} ({os.path.getsize(args.pack) / 1024:.0f} kB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,7 @@
 import os
-import re
 import pandas as pd
 import fantastic.paths
-from fantastic.correction.backend.store import export_to_csv
+from fantastic.correction.backend.store import ASSETS_FOLDERS, export_to_csv, list_output_folders
 
 OUTPUT_FOLDER_PATH: str = fantastic.paths.OUTPUT_DIR
 CORRECTION_FOLDER_PATH: str = fantastic.paths.CORRECTION_DIR
@@ -23,12 +22,15 @@ def init_file_infos(output_folder_path: str):
     )
     subfolder_paths = [
         os.path.join(output_folder_path, subfolder)
-        for subfolder in os.listdir(output_folder_path)
-        if not re.match(r"^\.|^css$|^js$", subfolder)
+        for subfolder in list_output_folders(output_folder_path)
+        if subfolder not in ASSETS_FOLDERS
     ]
     for subfolder_path in subfolder_paths:
         exercise_type = subfolder_path.split(os.sep)[-1]
+        # only the html files, not their precompressed variants (.html.gz, .html.br, see fantastic/precompress.py)
         for id_exercise in os.listdir(subfolder_path):
+            if not id_exercise.endswith(".html"):
+                continue
             file_infos = file_infos.append(
                 {
                     "id_exercise": id_exercise.split(".")[0],
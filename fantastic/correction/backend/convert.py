@@ -4,6 +4,7 @@ import re
 from transformers.pipelines.token_classification import TokenClassificationPipeline
 from spacy.lang.fr import French
 import fantastic.paths
+from fantastic.corpus import load_exercise_json
 # Fill
 from fantastic.exercises.fill.edit_phrase import EditPhrase
 from fantastic.exercises.fill.expression_ecrite import ExpressionEcrite
@@ -102,8 +103,12 @@ def convert_class_name_to_type(class_name: str):
     """Convert the class name to the output folder name assiociated to the class"""
     return EXERCISE_TYPE_DICT[class_name]
 
-def generate_conversion_from_tag(id_exercise: str, tag: str, nlp_token_class: French = None, nlp: TokenClassificationPipeline = None):
-    """Generates the conversion of an exercise in a certain type (tag)"""
+def generate_conversion_from_tag(id_exercise: str, tag: str, nlp_token_class: French = None, nlp: TokenClassificationPipeline = None,
+                                 client=None):
+    """
+    Generates the conversion of an exercise in a certain type (tag),
+    by the adaptation service if a client is given (see fantastic/service)
+    """
     def init_exercise(id_exercise: str, tag: str):
         """ initializes a new instance of the exercise with the given type (tag)"""
         if not tag in CLASS_NAME_DICT:
@@ -116,6 +121,8 @@ def generate_conversion_from_tag(id_exercise: str, tag: str, nlp_token_class: Fr
     exercise = init_exercise(id_exercise, tag)
     if not exercise:
         return ""
+    if client is not None:
+        return client.adapt(load_exercise_json(exercise.json_path, exercise.config), tag, id_exercise)["html"]
     exercise.load_json()
     exercise.create_template()
     if tag in select_subclasses:
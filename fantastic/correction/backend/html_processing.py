@@ -1,3 +1,4 @@
+import html
 import re
 import os
 import pandas as pd
@@ -10,17 +11,24 @@ from fantastic.correction.backend.convert import (
 )
 
 
+# XML_TAG_PATTERN: Matches the escaped tags of a line of XML: "&lt;" name attributes "&gt;"
+XML_TAG_PATTERN = re.compile(r"&lt;([/?!]?[\w:.-]+)((?:(?!&lt;).)*?)([/?]?)&gt;")
+
+
 def generate_html(
     file_treatment_infos: pd.DataFrame,
     id_exercise: str,
     nlp_token_class: French,
     nlp: TokenClassificationPipeline,
+    client=None,
+    type_conversion: str = None,
 ):
     """Generates the html of the exercise of id_exercise given the latest operations stored
-    in the treatment_infos file"""
-    type_exercise = file_treatment_infos.loc[id_exercise].at["exercise_type"]
-    type_conversion = file_treatment_infos.loc[id_exercise].at["conversion_type"]
-    if type_exercise == type_conversion:
+    in the treatment_infos file (converted by the adaptation service if a client is given),
+    or converted to type_conversion if given (without storing it, ex: a preview of a tag)"""
+    if type_conversion is None:
+        type_conversion = file_treatment_infos.loc[id_exercise].at["conversion_type"]
+    if type_conversion == file_treatment_infos.loc[id_exercise].at["exercise_type"]:
         return open_html(file_treatment_infos, id_exercise)
     else:
         return generate_conversion_from_tag(
@@ -28,44 +36,66 @@ def generate_html(
             convert_type_to_class_name(type_conversion),
             nlp_token_class,
             nlp,
+            client,
         )
 
 
+def output_html_path(file_treatment_infos: pd.DataFrame, id_exercise: str):
+    """Returns the path of the html of the given exercise in the output directory"""
+    exercise_type = file_treatment_infos.loc[id_exercise].at["exercise_type"]
+    return f"{fantastic.paths.OUTPUT_DIR}/{exercise_type}/{id_exercise}.html"
+
+
+def is_converted(file_treatment_infos: pd.DataFrame, id_exercise: str):
+    """Returns whether the exercise is displayed in another type than its output directory one"""
+    type_exercise = file_treatment_infos.loc[id_exercise].at["exercise_type"]
+    type_conversion = file_treatment_infos.loc[id_exercise].at["conversion_type"]
+    return type_exercise != type_conversion
+
+
 def open_html(file_treatment_infos: pd.DataFrame, id_exercise: str):
     """Open the html of the given exercise from the output directory"""
-    exercise_type = file_treatment_infos.loc[id_exercise].at["exercise_type"]
-    html_path = f"{fantastic.paths.OUTPUT_DIR}/{exercise_type}/{id_exercise}.html"
+    html_path = output_html_path(file_treatment_infos, id_exercise)
     with open(html_path, "r", encoding="UTF-8") as html_file:
         html_output = html_file.read()
     return html_output
 
 
-def head_body_html(html_output: str):
+def head_body_html(html_output: str, fingerprints: dict = None):
     """
     returns as strings the head and the body of a string representing a html file
     """
     head = re.search(r"<head>(.+)</head>", html_output, flags=re.DOTALL)
     if head:
-        head = replace_paths_by_folder_path(head[1])
+        head = replace_paths_by_folder_path(head[1], fingerprints)
     else:
         head = ""
     body = re.search(r"<body>(.+)</body>", html_output, flags=re.DOTALL)
     if body:
-        body = replace_paths_by_folder_path(body[1])
+        body = replace_paths_by_folder_path(body[1], fingerprints)
     else:
         body = ""
     return head, body
 
 
-def replace_paths_by_folder_path(html_content: str):
+def replace_paths_by_folder_path(html_content: str, fingerprints: dict = None):
     """
     Adapts the paths of the scripts of the html to match the
     corresponding exported scripts versions by the application
     (exported at "./static/")
+    When the fingerprints of the static files are given, the version of the file
+    is added to its url (ex: "/static/js/front.js?v=3fa2b1c4d5e6")
     """
-    html_content = re.sub(r"\.\./css/", "/static/css/", html_content)
-    html_content_cleaned = re.sub(r"\.\./js/", "/static/js/", html_content)
-    return html_content_cleaned
+    if fingerprints is None:
+        fingerprints = {}
+
+    def versioned_path(match: re.Match):
+        asset_path = f"{match[1]}/{match[2]}"
+        if asset_path in fingerprints:
+            return f"/static/{asset_path}?v={fingerprints[asset_path]}"
+        return f"/static/{asset_path}"
+
+    return re.sub(r"\.\./(css|js)/([\w./-]+)", versioned_path, html_content)
 
 
 def generate_select_tags(class_name_dict: dict, current: str = None):
@@ -94,16 +124,42 @@ def format_most_likely_tags(top_categories: dict):
         count += 1
     return to_display
 
-def open_xml(id_exercise: str):
-    """Returns the XML of the exercise with id_exercise as a string"""
-    xml_path = os.path.join(fantastic.paths.XML_DIR, id_exercise + ".xml")
-    with open(xml_path, "r", encoding="utf-8") as xml_file:
-        xml_output = xml_file.read()
-    return xml_output
-
-def prepare_xml_to_display_html(xml_output: str):
-    """Returns an HTML version of the XML file to display"""
-    xml_to_display = re.sub(r"<", "&lt", xml_output)
-    xml_to_display = re.sub(r">", "&gt", xml_to_display)
-    xml_to_display = f"<textarea readonly>{xml_to_display}</textarea>"
-    return xml_to_display
+def xml_path(id_exercise: str):
+    """Returns the path of the XML of the exercise with id_exercise"""
+    return os.path.join(fantastic.paths.XML_DIR, id_exercise + ".xml")
+
+
+def xml_etag(xml_file_path: str):
+    """Returns an ETag for the XML file, computed from its modification time and size"""
+    xml_stat = os.stat(xml_file_path)
+    return f'"{xml_stat.st_mtime_ns:x}-{xml_stat.st_size:x}"'
+
+
+def highlight_xml_line(xml_line: str):
+    """Returns an escaped HTML version of a line of XML where tags and attributes are wrapped in spans"""
+    escaped_line = html.escape(xml_line, quote=False)
+    return XML_TAG_PATTERN.sub(
+        r"<span class='xml_tag'>&lt;\1</span><span class='xml_attribute'>\2</span><span class='xml_tag'>\3&gt;</span>",
+        escaped_line,
+    )
+
+
+def stream_xml_html(xml_file_path: str, lines_per_chunk: int = 200):
+    """
+    Yields the escaped and highlighted HTML version of the XML file by chunks of lines
+    (each chunk only holds full lines so that it can be displayed as soon as it is received)
+    """
+    with open(xml_file_path, "r", encoding="utf-8") as xml_file:
+        chunk = []
+        for xml_line in xml_file:
+            chunk.append(highlight_xml_line(xml_line))
+            if len(chunk) == lines_per_chunk:
+                yield "".join(chunk)
+                chunk = []
+        if chunk:
+            yield "".join(chunk)
+
+
+def xml_viewer_html(id_exercise: str):
+    """Returns the HTML of the XML viewer of the exercise, filled by the navigator from /xml/{id_exercise}"""
+    return f"<pre id='xml_viewer' src='/xml/{id_exercise}'>Chargement du XML ...</pre>"
@@ -0,0 +1,159 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+import pandas as pd
+
+# TREATMENT_STATUSES: The statuses an exercise can be filtered on in the correction interface
+TREATED = "treated"
+UNTREATED = "untreated"
+TREATMENT_STATUSES = [TREATED, UNTREATED]
+
+
+class NavigationView:
+    """
+    Circular doubly linked list of the positions (in the full index) of the exercises
+    matching a filter, allowing to find the successor and the predecessor of an exercise
+    of the view in constant time (O(log n) with a binary search for an exercise outside the view),
+    and to add or remove an exercise without rebuilding the view: only the links of its neighbours change,
+    but the sorted list of the positions is updated in O(n) (a shift of the list, fast for the size of a corpus)
+    """
+
+    def __init__(self, positions: Iterable[int]) -> None:
+        self.positions: List[int] = sorted(positions)  # kept sorted to place exercises outside the view
+        self.next: Dict[int, int] = {}
+        self.previous: Dict[int, int] = {}
+        number_positions = len(self.positions)
+        for i, position in enumerate(self.positions):
+            self.next[position] = self.positions[(i + 1) % number_positions]
+            self.previous[position] = self.positions[i - 1]
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __contains__(self, position: int) -> bool:
+        return position in self.next
+
+    def successor(self, position: int) -> Optional[int]:
+        """Returns the position of the next exercise of the view (circular), None if the view is empty"""
+        if not self.positions:
+            return None
+        if position in self.next:
+            return self.next[position]
+        # the exercise is not in the view: we look for the first exercise of the view after it
+        index = bisect_right(self.positions, position)
+        return self.positions[index % len(self.positions)]
+
+    def predecessor(self, position: int) -> Optional[int]:
+        """Returns the position of the previous exercise of the view (circular), None if the view is empty"""
+        if not self.positions:
+            return None
+        if position in self.previous:
+            return self.previous[position]
+        index = bisect_left(self.positions, position)
+        return self.positions[index - 1]
+
+    def add(self, position: int) -> None:
+        """Adds the exercise at the given position to the view (O(n), see NavigationView)"""
+        if position in self.next:
+            return
+        if not self.positions:
+            self.positions.append(position)
+            self.next[position] = self.previous[position] = position
+            return
+        successor = self.successor(position)
+        predecessor = self.previous[successor]
+        insort(self.positions, position)
+        self.next[predecessor] = position
+        self.previous[successor] = position
+        self.next[position] = successor
+        self.previous[position] = predecessor
+
+    def remove(self, position: int) -> None:
+        """Removes the exercise at the given position from the view (O(n), see NavigationView)"""
+        if position not in self.next:
+            return
+        successor = self.next.pop(position)
+        predecessor = self.previous.pop(position)
+        del self.positions[bisect_left(self.positions, position)]
+        if successor != position:
+            self.next[predecessor] = successor
+            self.previous[successor] = predecessor
+
+
+class NavigationIndex:
+    """
+    Index built once from the tracking DataFrame to navigate between the exercises of the correction
+    interface: the successor and the predecessor of an exercise are precomputed for the whole corpus
+    and for the views filtered by exercise_type and/or by treatment status (ex: only the untreated
+    "classe" exercises), the views being updated when an exercise is classified
+    """
+
+    def __init__(self, ids: List[str], exercise_types: List[str], treated: List[bool]) -> None:
+        self.ids: List[str] = list(ids)
+        self.positions: Dict[str, int] = {id_exercise: i for i, id_exercise in enumerate(self.ids)}
+        number_ids = len(self.ids)
+        self.successors: List[int] = [(i + 1) % number_ids for i in range(number_ids)]
+        self.predecessors: List[int] = [(i - 1) % number_ids for i in range(number_ids)]
+        self.exercise_types: List[str] = list(exercise_types)
+        self.statuses: List[str] = [TREATED if is_treated else UNTREATED for is_treated in treated]
+        # views: keys are (exercise_type, status), None meaning no filter on the corresponding field
+        grouped_positions: Dict[Tuple[Optional[str], Optional[str]], List[int]] = {}
+        for position, (exercise_type, status) in enumerate(zip(self.exercise_types, self.statuses)):
+            for key in self.__view_keys(exercise_type, status):
+                grouped_positions.setdefault(key, []).append(position)
+        self.views: Dict[Tuple[Optional[str], Optional[str]], NavigationView] = {
+            key: NavigationView(positions) for key, positions in grouped_positions.items()
+        }
+
+    @classmethod
+    def from_dataframe(cls, file_treatment_infos: pd.DataFrame):
+        """Builds the navigation index of the exercises tracked in file_treatment_infos (in the order of its index)"""
+        return cls(
+            list(file_treatment_infos.index),
+            list(file_treatment_infos["exercise_type"]),
+            [bool(category_path) for category_path in file_treatment_infos["category_path"]],
+        )
+
+    @staticmethod
+    def __view_keys(exercise_type: str, status: str):
+        """Returns the keys of the filtered views an exercise belongs to"""
+        return [(exercise_type, None), (None, status), (exercise_type, status)]
+
+    def __neighbour(self, id_exercise: str, exercise_type: Optional[str], status: Optional[str], forward: bool):
+        """Returns the id of the successor (or predecessor) of the exercise in the view matching the filters"""
+        position = self.positions[id_exercise]
+        if exercise_type is None and status is None:
+            neighbour = self.successors[position] if forward else self.predecessors[position]
+            return self.ids[neighbour]
+        view = self.views.get((exercise_type, status))
+        if view is None:
+            return None
+        neighbour = view.successor(position) if forward else view.predecessor(position)
+        return None if neighbour is None else self.ids[neighbour]
+
+    def successor(self, id_exercise: str, exercise_type: Optional[str] = None, status: Optional[str] = None):
+        """
+        Returns the id of the exercise following id_exercise among the exercises with the given
+        exercise_type and treatment status (if specified), None if no exercise matches the filters
+        """
+        return self.__neighbour(id_exercise, exercise_type, status, True)
+
+    def predecessor(self, id_exercise: str, exercise_type: Optional[str] = None, status: Optional[str] = None):
+        """
+        Returns the id of the exercise preceding id_exercise among the exercises with the given
+        exercise_type and treatment status (if specified), None if no exercise matches the filters
+        """
+        return self.__neighbour(id_exercise, exercise_type, status, False)
+
+    def update_treatment(self, id_exercise: str, treated: bool) -> None:
+        """Moves the exercise to the views of its new treatment status"""
+        position = self.positions[id_exercise]
+        status = TREATED if treated else UNTREATED
+        previous_status = self.statuses[position]
+        if status == previous_status:
+            return
+        exercise_type = self.exercise_types[position]
+        for key in [(None, previous_status), (exercise_type, previous_status)]:
+            self.views[key].remove(position)
+        for key in [(None, status), (exercise_type, status)]:
+            self.views.setdefault(key, NavigationView([])).add(position)
+        self.statuses[position] = status
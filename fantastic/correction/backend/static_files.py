@@ -0,0 +1,148 @@
+from mimetypes import guess_type
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs
+import os
+import stat
+import threading
+from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Receive, Scope, Send
+from starlette.responses import Response
+from fantastic.precompress import ENCODINGS, content_hash
+
+# Cache-Control headers: versioned urls (?v=fingerprint) never change, other ones have to be revalidated
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+def quality(parameters: List[str]) -> float:
+    """Returns the q-value of the parameters of an encoding of the Accept-Encoding header (1 if there is none)"""
+    for parameter in parameters:
+        name, _, value = parameter.strip().partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return float(value)
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+def accepted_encodings(scope: Scope) -> Set[str]:
+    """
+    Returns the encodings of the Accept-Encoding header of the request (ex: {"br", "gzip"}),
+    without the ones refused with a q-value of 0 (ex: "br;q=0", "br;q=0.000")
+    """
+    for name, value in scope.get("headers", []):
+        if name == b"accept-encoding":
+            encodings = set()
+            for accepted in value.decode("latin-1").split(","):
+                encoding, *parameters = accepted.split(";")
+                if quality(parameters) > 0:
+                    encodings.add(encoding.strip().lower())
+            return encodings
+    return set()
+
+
+def content_type(path: str) -> str:
+    """Returns the Content-Type of the file (with the utf-8 charset for the text types, as FileResponse does)"""
+    media_type = guess_type(path)[0] or "text/plain"
+    if media_type.startswith("text/"):
+        return f"{media_type}; charset=utf-8"
+    return media_type
+
+
+class FingerprintedStaticFiles(StaticFiles):
+    """
+    StaticFiles serving the files requested with a fingerprint in their url
+    (ex: /static/js/front.js?v=3fa2b1c4d5e6) with long cache headers, so that the
+    navigator does not download them again until their content (hence their url) changes.
+    With precompressed=True, the precompressed variant of a file (front.js.br, front.js.gz, see
+    fantastic/precompress.py) is sent instead of the file when the client accepts its encoding
+
+    A fingerprint is only trusted if it is the one of the current content of the file (an old or empty ?v= is
+    revalidated, otherwise the navigator would keep the old content under the url of the new one)
+
+    Class attributes:
+        precompressed (bool): Whether the precompressed variants of the files are served
+        fingerprint_length (int): The length of the fingerprints of the urls (see compute_assets_fingerprints)
+    """
+
+    def __init__(self, *args, precompressed: bool = False, fingerprint_length: int = 12, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.precompressed = precompressed
+        self.fingerprint_length = fingerprint_length
+        # the fingerprint of each file computed, with the size and modification time of the file it was computed for
+        self.__fingerprints: Dict[str, Tuple[int, int, str]] = {}
+        self.__lock = threading.Lock()
+
+    def current_fingerprint(self, path: str) -> Optional[str]:
+        """Returns the fingerprint of the current content of the file (None if there is no such file)"""
+        full_path, stat_result = self.lookup_path(path)
+        if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+            return None
+        key = (stat_result.st_size, stat_result.st_mtime_ns)
+        with self.__lock:
+            cached = self.__fingerprints.get(full_path)
+        if cached is not None and cached[:2] == key:
+            return cached[2]
+        with open(full_path, "rb") as static_file:
+            fingerprint = content_hash(static_file.read())[: self.fingerprint_length]
+        with self.__lock:
+            self.__fingerprints[full_path] = (*key, fingerprint)
+        return fingerprint
+
+    async def is_fingerprinted(self, path: str, scope: Scope) -> bool:
+        """Returns whether the url holds the fingerprint of the current content of the file (?v=fingerprint)"""
+        versions = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("v")
+        if not versions or len(versions) != 1:
+            return False
+        return versions[0] == await run_in_threadpool(self.current_fingerprint, path.replace(os.sep, "/"))
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = None
+        if self.precompressed:
+            response = await self.get_precompressed_response(path, scope)
+        if response is None:
+            response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            if await self.is_fingerprinted(path, scope):
+                response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+            else:
+                response.headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
+        return response
+
+    async def get_precompressed_response(self, path: str, scope: Scope) -> Response:
+        """Returns the response with the precompressed variant of the file (brotli first), None if there is none"""
+        if scope["method"] not in ("GET", "HEAD"):
+            return None
+        encodings = accepted_encodings(scope)
+        for encoding, suffix in ENCODINGS.items():
+            if encoding not in encodings:
+                continue
+            full_path, stat_result = await run_in_threadpool(self.lookup_path, path + suffix)
+            if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+                continue
+            response = self.file_response(full_path, stat_result, scope)
+            response.headers["Content-Type"] = content_type(path)
+            response.headers["Content-Encoding"] = encoding
+            response.headers["Vary"] = "Accept-Encoding"
+            return response
+        return None
+
+
+class SkipPrefixMiddleware:
+    """
+    Applies a middleware (ex: the compression one) to every request except the ones whose path starts
+    with the prefix (ex: the static files already precompressed, which would be compressed twice)
+    """
+
+    def __init__(self, app: ASGIApp, middleware_class: type, prefix: str, **options) -> None:
+        self.app = app
+        self.middleware_app = middleware_class(app, **options)
+        self.prefix = prefix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+        else:
+            await self.middleware_app(scope, receive, send)
@@ -1,7 +1,27 @@
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+import hashlib
 import os
 import shutil
 import pandas as pd
+from fantastic.bundle import BUNDLE_FOLDER
+from fantastic.precompress import precompress_directory
+
+# ASSETS_FOLDERS: The folders of the output directory holding the files shared by all exercises
+ASSETS_FOLDERS = ["js", "css"]
+
+
+def list_output_folders(output_folder_path: str) -> List[str]:
+    """
+    Returns the folders of the output directory the correction interface uses: one per exercise type
+    and the assets ones (not the hidden ones nor the bundles of fantastic/bundle.py, nor the files such as the
+    manifest.json of fantastic/precompress.py)
+    """
+    return [
+        folder for folder in os.listdir(output_folder_path)
+        if not folder.startswith(".") and folder != BUNDLE_FOLDER
+        and os.path.isdir(os.path.join(output_folder_path, folder))
+    ]
 
 
 def generate_correction_output_folders(
@@ -13,70 +33,154 @@ def generate_correction_output_folders(
     Generates the correction output folder and all its subfolders
     The structure is the following:
     correction_output_folder>correction_feature>exercise_type>exercise_file
+    The js and css folders of each feature are synchronized with the output ones
     """
-    exercise_types = [cat for cat in os.listdir(output_folder_path)]
-    has_js = "js" in exercise_types
-    has_css = "css" in exercise_types
-    old_wd = os.getcwd()
-    os.chdir(correction_output_directory)
-    create_folder_from_current("correction_output")
+    exercise_types = list_output_folders(output_folder_path)
+    correction_output_path = os.path.join(correction_output_directory, "correction_output")
+    jobs = []
     for feature in correction_features:
-        create_folder_from_current(f"correction_output/{feature}")
         for exercise_type in exercise_types:
-            create_folder_from_current(f"correction_output/{feature}/{exercise_type}")
-        if has_js:
-            copy_files(
-                os.path.join(output_folder_path, "js"),
-                os.path.join("correction_output", feature, "js"),
-            )
-        if has_css:
-            copy_files(
-                os.path.join(output_folder_path, "css"),
-                os.path.join("correction_output", feature, "css"),
-            )
-    os.chdir(old_wd)
+            create_folder(os.path.join(correction_output_path, feature, exercise_type))
+        for assets_folder in ASSETS_FOLDERS:
+            if assets_folder in exercise_types:
+                jobs += sync_jobs(
+                    os.path.join(output_folder_path, assets_folder),
+                    os.path.join(correction_output_path, feature, assets_folder),
+                    link=True,
+                )
+    run_sync_jobs(jobs)
     return None
 
 
-def retrieve_css_and_js_files(output_folder_path: str, target_directory: str):
+def retrieve_css_and_js_files(output_folder_path: str, target_directory: str, encodings: List[str] = ()):
     """
     Retrieves the css and js files to the /static folder before mounting them
-    (in case some modifications to the css and js files in the output directory have been made)
+    (in case some modifications to the css and js files in the output directory have been made),
+    then writes the precompressed variants of the css and js files which changed (encodings: ex: ["br", "gzip"])
+    and the manifest of the folder (see fantastic/precompress.py)
     """
-    if "js" in os.listdir(output_folder_path):
-        create_folder_from_current(os.path.join(target_directory, "js"))
-        copy_files(
-            os.path.join(output_folder_path, "js"), os.path.join(target_directory, "js")
-        )
-    if "css" in os.listdir(output_folder_path):
-        create_folder_from_current(os.path.join(target_directory, "css"))
-        copy_files(
-            os.path.join(output_folder_path, "css"),
-            os.path.join(target_directory, "css"),
-        )
+    jobs = []
+    for assets_folder in ASSETS_FOLDERS:
+        if assets_folder in os.listdir(output_folder_path):
+            create_folder(os.path.join(target_directory, assets_folder))
+            jobs += sync_jobs(
+                os.path.join(output_folder_path, assets_folder),
+                os.path.join(target_directory, assets_folder),
+                link=False,
+            )
+    run_sync_jobs(jobs)
+    if encodings:
+        precompress_directory(target_directory, (".css", ".js"), encodings)
+    return None
+
+
+def create_folder(path_folder: str):
+    """Creates the folder at path_folder (and its parents) if it does not exist"""
+    os.makedirs(path_folder, exist_ok=True)
     return None
 
 
-def create_folder_from_current(path_folder: str):
+def sync_jobs(src_folder: str, target_folder: str, link: bool = False):
     """
-    Creates a folder from current working directory if does not exist at path:
-    cwd>path_folder
+    Returns the list of (src_file, target_file, link) to synchronize from the src_folder
+    to the target_folder, leaving out the files whose content did not change
     """
-    if not os.path.exists(path_folder):
-        os.mkdir(path_folder)
+    jobs = []
+    for to_sync in os.listdir(src_folder):
+        src_file = os.path.join(src_folder, to_sync)
+        target_file = os.path.join(target_folder, to_sync)
+        if os.path.isfile(src_file) and not same_content(src_file, target_file):
+            jobs.append((src_file, target_file, link))
+    return jobs
+
+
+def run_sync_jobs(jobs: List[Tuple[str, str, bool]], max_workers: int = 8):
+    """Copies (or hard links) concurrently the files of the synchronization jobs given"""
+    def sync_file(job: Tuple[str, str, bool]):
+        src_file, target_file, link = job
+        if link:
+            link_or_copy_file(src_file, target_file)
+        else:
+            copy_file(src_file, target_file)
+
+    if not jobs:
+        return None
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as executor:
+        list(executor.map(sync_file, jobs))
     return None
 
 
-def copy_files(src_folder: str, target_folder: str):
+def file_hash(file_path: str, chunk_size: int = 1 << 16):
+    """Returns the sha256 hexdigest of the content of the file at file_path"""
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as opened_file:
+        for chunk in iter(lambda: opened_file.read(chunk_size), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def same_content(src_path: str, target_path: str):
+    """
+    Returns whether the files at src_path and target_path have the same content
+    (same inode, or same size and either same modification time or same hash)
+    """
+    if not os.path.exists(target_path):
+        return False
+    src_stat = os.stat(src_path)
+    target_stat = os.stat(target_path)
+    if (src_stat.st_dev, src_stat.st_ino) == (target_stat.st_dev, target_stat.st_ino):
+        return True
+    if src_stat.st_size != target_stat.st_size:
+        return False
+    if src_stat.st_mtime_ns == target_stat.st_mtime_ns:
+        return True
+    return file_hash(src_path) == file_hash(target_path)
+
+
+def compute_assets_fingerprints(static_directory: str, fingerprint_length: int = 12):
+    """
+    Returns a dict associating the path of each css and js file of the static_directory
+    (relative to it, ex: "js/front.js") to a short hash of its content
+    Used to version the urls of the static files so that they can be cached by the navigator
+    """
+    fingerprints = {}
+    for root, _, files in os.walk(static_directory):
+        for file_name in files:
+            if file_name.endswith((".css", ".js")):
+                file_path = os.path.join(root, file_name)
+                relative_path = os.path.relpath(file_path, static_directory).replace(os.sep, "/")
+                fingerprints[relative_path] = file_hash(file_path)[:fingerprint_length]
+    return fingerprints
+
+
+def copy_file(src_path: str, target_path: str):
+    """Atomically replaces the file at target_path by a copy of src_path (modification time included)"""
+    tmp_path = f"{target_path}.{os.getpid()}.tmp"
+    shutil.copy2(src_path, tmp_path)
+    os.replace(tmp_path, target_path)
+    return None
+
+
+def link_or_copy_file(src_path: str, target_path: str):
     """
-    Copies all files from the src_folder to the target_folder
-    (Care to define paths from the current working directory)
+    Atomically replaces the file at target_path by a hard link to src_path
+    (falls back to a copy when hard links are not possible, ex: other device)
     """
-    for file_path in [
-        os.path.join(src_folder, to_copy) for to_copy in os.listdir(src_folder)
-    ]:
-        target_file = file_path.split(os.sep)[-1]
-        shutil.copyfile(file_path, os.path.join(target_folder, target_file))
+    tmp_path = f"{target_path}.{os.getpid()}.tmp"
+    try:
+        os.link(src_path, tmp_path)
+    except OSError:
+        shutil.copyfile(src_path, tmp_path)
+    os.replace(tmp_path, target_path)
+    return None
+
+
+def write_file_atomically(content: str, target_path: str):
+    """Writes content to target_path through a temporary file renamed at the end"""
+    tmp_path = f"{target_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as tmp_file:
+        tmp_file.write(content)
+    os.replace(tmp_path, target_path)
     return None
 
 
@@ -87,21 +191,24 @@ def store_in_corresponding_folder(
     index_feature: int,
     subfolder: str,
     filename: str,
+    source_path: str = None,
 ):
     """
     Stores the file_render as an html file in the corresponding folder
     path form:
     cwd>path_correction_output_directory>correction_feature>type_conversion>filename.html
+    When source_path is given (the file_render is the canonical output file), the stored
+    file is a copy of it (not a hard link: the stored file is a snapshot of the output at the time of the
+    correction, it must not change when the output file is written again)
     """
     feature = correction_features[index_feature]
-    with open(
-        os.path.join(
-            correction_output_directory, feature, subfolder, filename + ".html"
-        ),
-        "w",
-        encoding="utf-8",
-    ) as html_correction_output:
-        html_correction_output.write(file_render)
+    target_path = os.path.join(
+        correction_output_directory, feature, subfolder, filename + ".html"
+    )
+    if source_path and os.path.exists(source_path):
+        copy_file(source_path, target_path)
+    else:
+        write_file_atomically(file_render, target_path)
     return None
 
 
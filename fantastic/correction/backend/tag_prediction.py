@@ -1,8 +1,12 @@
+from typing import List
 import os
 import xml.etree
 import fantastic.paths
 import tagging.train_models
 
+# NB_CATEGORIES: The number of tags predicted by the tagging model
+NB_CATEGORIES = 16
+
 
 def load_tagging_model():
     """load best model of tagging"""
@@ -19,14 +23,29 @@ def load_tagging_model():
     return model
 
 
-def get_most_likely_tags(tagging_model, id_exercise: str):
+def get_most_likely_tags(tagging_model, id_exercise: str, client=None):
     """
     Using tagging ML model, determine what are the most likely tags
     Output is a dict with as keys the classes and as value the
     predicted probability
+    (predicted by the adaptation service if a client is given, see fantastic/service)
     """
 
     # we first get the xml
+    content = read_exercise_xml(id_exercise)
+
+    # then we predict output with a ml model
+    if client is not None:
+        return client.predict_tags(content)
+    top_categories = tagging.train_models.predict(
+        model=tagging_model, input_data=content, nb_cats=NB_CATEGORIES
+    )
+
+    return top_categories
+
+
+def read_exercise_xml(id_exercise: str):
+    """Returns the xml of the exercise of id_exercise as a string"""
     with open(
         os.path.join(fantastic.paths.XML_DIR, f"{id_exercise}.xml"),
         mode="r",
@@ -35,11 +54,9 @@ def get_most_likely_tags(tagging_model, id_exercise: str):
         # we get the content from the xml
         xml_ex = xml.etree.ElementTree.parse(opened_file)
         root = xml_ex.getroot()
-        content = xml.etree.ElementTree.tostring(root, encoding="unicode", method="xml")
+        return xml.etree.ElementTree.tostring(root, encoding="unicode", method="xml")
 
-    # then we predict output with a ml model
-    top_categories = tagging.train_models.predict(
-        model=tagging_model, input_data=content, nb_cats=16
-    )
 
-    return top_categories
+def predict_tags_batch(tagging_model, contents: List[str]):
+    """Returns the probabilities of the tags of each xml, predicted in one call of the model"""
+    return tagging.train_models.predict_batch(model=tagging_model, input_data=contents, nb_cats=NB_CATEGORIES)
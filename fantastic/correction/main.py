@@ -1,11 +1,17 @@
+from configparser import ConfigParser
 import os
 import pandas as pd
 
-from fastapi import FastAPI, Form, Path
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi import Body, FastAPI, Form, Header, HTTPException, Path, Query
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from jinja2 import Environment, FileSystemLoader
 
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
+
 import fantastic.paths
 from fantastic.correction.backend.convert import (
     convert_type_to_class_name,
@@ -13,6 +19,7 @@ from fantastic.correction.backend.convert import (
     convert_class_name_to_type,
 )
 from fantastic.correction.backend.store import (
+    compute_assets_fingerprints,
     generate_correction_output_folders,
     retrieve_css_and_js_files,
     store_in_corresponding_folder,
@@ -23,12 +30,21 @@ from fantastic.correction.backend.html_processing import (
     generate_html,
     generate_select_tags,
     head_body_html,
-    open_xml,
-    prepare_xml_to_display_html
+    is_converted,
+    output_html_path,
+    stream_xml_html,
+    xml_etag,
+    xml_path,
+    xml_viewer_html,
 )
+from fantastic.correction.backend.navigation import NavigationIndex, TREATMENT_STATUSES
+from fantastic.correction.backend.static_files import FingerprintedStaticFiles, SkipPrefixMiddleware
 from fantastic.correction.backend.tag_prediction import get_most_likely_tags, load_tagging_model
 from fantastic.correction.app_init import export_to_csv
-from fantastic.exercises.utils import generate_nlp_gilf, generate_nlp_spacy
+from fantastic.exercises.utils import generate_nlp_models
+from fantastic.output_writer import publish_assets
+from fantastic.precompress import configured_encodings
+from fantastic.service.client import configured_client
 
 # file_treatment_infos: A pd.DataFrame in which the latest operations through the correction interface are registered
 # It allows to keep track of operations on next use and to access more easily to some files
@@ -53,46 +69,56 @@ APP_POST_FEATURES = ["bonne conversion", "mauvaise conversion", "mauvaise extrac
 # CORRECTION_OUTPUT_DIRECTORY: The correction directory where files are classified
 # and stored in from the correction interface
 CORRECTION_OUTPUT_DIRECTORY = fantastic.paths.DATA_DIR
-INDEX_EXERCISES = file_treatment_infos.index
+# NAVIGATION_INDEX: The successors and predecessors of every exercise, in the whole corpus and in the views
+# filtered by exercise_type and/or treatment status, built once and updated on each classification
+NAVIGATION_INDEX = NavigationIndex.from_dataframe(file_treatment_infos)
+# STATIC_DIRECTORY: The folder of the static files mounted at /static
+STATIC_DIRECTORY = os.path.join(fantastic.paths.FANTASTIC_DIR, "correction", "static")
+# ASSETS_FINGERPRINTS: The hashes of the static css and js files (ex: {"js/front.js": "3fa2b1c4d5e6"})
+# added to their urls, filled when starting the application
+ASSETS_FINGERPRINTS = {}
+# STATUS_REGEX: The treatment statuses accepted as navigation filter
+STATUS_REGEX = "^(" + "|".join(TREATMENT_STATUSES) + ")$"
+# COMPRESSION_MINIMUM_SIZE: The size (in bytes) from which responses are compressed
+COMPRESSION_MINIMUM_SIZE = 500
 
 
 # All the ML models are loaded before starting the application to do it only once
 # (Too long to load otherwise)
-nlp_token_class = generate_nlp_gilf()
-nlp = generate_nlp_spacy()
-tagging_model = load_tagging_model()
-
-
-def find_successor_in_index(index_df: pd.Index, current: str):
-    """
-    Finds the successor of the current index in a pd.Index object
-    (current could be in reality of any type as long as it is in the index)
-    """
-    number_indexes = len(index_df)
-    index_int = index_df.get_loc(current)
-    if index_int < number_indexes - 1:
-        return index_df[index_int + 1]
-    else:
-        return index_df[0]
-
-
-def find_predecessor_in_index(index_df: pd.Index, current: str):
-    """
-    Finds the predecessor of the current index in a pd.Index object
-    (current could be in reality of any type as long as it is in the index)
-    """
-    number_indexes = len(index_df)
-    index_int = index_df.get_loc(current)
-    if index_int > 0:
-        return index_df[index_int - 1]
-    else:
-        return index_df[number_indexes - 1]
+# (the hugging face model is not loaded in fast tagging mode, see the [select] section of data.cfg)
+# (none of them is loaded if the adaptation service is used, see the [service] section: it has them already)
+nlp_config = ConfigParser()
+nlp_config.read(os.path.join(fantastic.paths.FANTASTIC_DIR, "exercises", "data.cfg"))
+SERVICE_CLIENT = configured_client(nlp_config)
+if SERVICE_CLIENT is None:
+    nlp_token_class, nlp = generate_nlp_models(nlp_config)
+    tagging_model = load_tagging_model()
+else:
+    nlp_token_class, nlp, tagging_model = None, None, None
+# PRECOMPRESSED_ENCODINGS: The precompressed variants of the static files written and served ([precompress] section)
+PRECOMPRESSED_ENCODINGS = configured_encodings(nlp_config)
 
 
 app = FastAPI()
+# Responses are compressed with brotli when available and accepted by the client, gzip otherwise
+if BrotliMiddleware is not None:
+    compression_middleware = BrotliMiddleware
+    compression_options = {"minimum_size": COMPRESSION_MINIMUM_SIZE, "gzip_fallback": True}
+else:
+    compression_middleware = GZipMiddleware
+    compression_options = {"minimum_size": COMPRESSION_MINIMUM_SIZE}
+if PRECOMPRESSED_ENCODINGS:
+    # the static files are sent precompressed, not compressed again on each request
+    app.add_middleware(
+        SkipPrefixMiddleware, middleware_class=compression_middleware, prefix="/static/", **compression_options
+    )
+else:
+    app.add_middleware(compression_middleware, **compression_options)
 # Static files exported in the static folder of the application instance
 app.mount(
-    "/static", StaticFiles(directory=os.path.join(fantastic.paths.FANTASTIC_DIR, "correction", "static")), name="static"
+    "/static",
+    FingerprintedStaticFiles(directory=STATIC_DIRECTORY, precompressed=bool(PRECOMPRESSED_ENCODINGS)),
+    name="static",
 )
 
 
@@ -104,15 +130,16 @@ def show_info():
 
 @app.on_event("startup")
 def startup_event():
-    """Generates the correction output folder and its subfolders and retrieves
-    the latest versions of css and js files when starting the application"""
+    """Publishes the js the generated html depends on in the output folder (see publish_assets),
+    generates the correction output folder and its subfolders and retrieves
+    the latest versions of css and js files when starting the application
+    (only the files which changed are copied, and precompressed if enabled), then computes their fingerprints"""
+    publish_assets(fantastic.paths.OUTPUT_DIR)
     generate_correction_output_folders(
         fantastic.paths.OUTPUT_DIR, CORRECTION_OUTPUT_DIRECTORY, CORRECTION_FEATURES
     )
-    retrieve_css_and_js_files(
-        fantastic.paths.OUTPUT_DIR,
-        os.path.join(fantastic.paths.FANTASTIC_DIR, "correction", "static"),
-    )
+    retrieve_css_and_js_files(fantastic.paths.OUTPUT_DIR, STATIC_DIRECTORY, PRECOMPRESSED_ENCODINGS)
+    ASSETS_FINGERPRINTS.update(compute_assets_fingerprints(STATIC_DIRECTORY))
 
 
 @app.on_event("shutdown")
@@ -121,24 +148,116 @@ def shutdown_event():
     export_to_csv(file_treatment_infos, fantastic.paths.CORRECTION_DIR)
 
 
-@app.get("/correction/{id_exercise}", response_class=HTMLResponse)
-def get_html_content(*, id_exercise: str = Path(..., regex=r"^\d{1,4}_\d{1,2}")):
-    """Displays the exercise with id_exercise in the navigator"""
-    conversion_type = file_treatment_infos.loc[id_exercise].at["exercise_type"]
-    file_treatment_infos.at[id_exercise, "conversion_type"] = conversion_type  # reset conversion type to original type
-    html_output = generate_html(file_treatment_infos, id_exercise, nlp_token_class, nlp)
-    head, body = head_body_html(html_output)
+def render_correction_page(
+    id_exercise: str,
+    head: str,
+    body: str,
+    to_show: str,
+    result: str = "",
+    exercise_type: str = None,
+    status: str = None,
+):
+    """
+    Returns the correction page displaying the given head and body of the exercise with id_exercise,
+    the navigation going through the exercises with the given exercise_type and status (if specified)
+    """
+    conversion_type = file_treatment_infos.loc[id_exercise].at["conversion_type"]
     html_tags = generate_select_tags(CLASS_NAME_DICT, convert_type_to_class_name(conversion_type))
-    successor = find_successor_in_index(INDEX_EXERCISES, id_exercise)
-    predecessor = find_predecessor_in_index(INDEX_EXERCISES, id_exercise)
+    # we stay on the current exercise if no exercise matches the filters
+    successor = NAVIGATION_INDEX.successor(id_exercise, exercise_type, status) or id_exercise
+    predecessor = NAVIGATION_INDEX.predecessor(id_exercise, exercise_type, status) or id_exercise
     return HTML_CORRECTION_TEMPLATE.render(
         head=head,
         body=body,
         tags=html_tags,
-        to_show="Afficher le XML",
-        result="",
+        to_show=to_show,
+        result=result,
+        current=id_exercise,
         successor=successor,
         predecessor=predecessor,
+        assets=ASSETS_FINGERPRINTS,
+    )
+
+
+def classify_exercise(id_exercise: str, index_feature: int):
+    """
+    Stores the exercise with id_exercise in the correction folder of the feature
+    CORRECTION_FEATURES[index_feature], registers the treatment and returns its html
+    """
+    type_exercise = file_treatment_infos.loc[id_exercise].at["conversion_type"]  # latest conversion type
+    category_correction = CORRECTION_FEATURES[index_feature]  # class of correction selected by user
+    remove_latest_treatment(file_treatment_infos, CORRECTION_OUTPUT_DIRECTORY, id_exercise, category_correction)
+    html_output = generate_html(file_treatment_infos, id_exercise, nlp_token_class, nlp, SERVICE_CLIENT)
+    # the unconverted html is the canonical output file: it is copied instead of written again
+    source_path = None if is_converted(file_treatment_infos, id_exercise) \
+        else output_html_path(file_treatment_infos, id_exercise)
+    store_in_corresponding_folder(
+        html_output,
+        os.path.join(CORRECTION_OUTPUT_DIRECTORY, "correction_output"),
+        CORRECTION_FEATURES,
+        index_feature,
+        type_exercise,
+        id_exercise,
+        source_path,
+    )
+    file_treatment_infos.at[id_exercise, "category_path"] = os.path.join(category_correction, type_exercise)  # store new treatment
+    NAVIGATION_INDEX.update_treatment(id_exercise, True)
+    return html_output
+
+
+def treatment_state(id_exercise: str, exercise_type: str = None, status: str = None):
+    """
+    Returns the metadata and the latest treatment of the exercise with id_exercise as a dict,
+    its successor and predecessor being searched among the exercises matching the filters
+    """
+    infos = file_treatment_infos.loc[id_exercise]
+    return {
+        "id_exercise": id_exercise,
+        "exercise_type": infos.at["exercise_type"],
+        "conversion_type": infos.at["conversion_type"],
+        "category_path": infos.at["category_path"] or None,
+        "successor": NAVIGATION_INDEX.successor(id_exercise, exercise_type, status),
+        "predecessor": NAVIGATION_INDEX.predecessor(id_exercise, exercise_type, status),
+    }
+
+
+@app.get("/correction/{id_exercise}", response_class=HTMLResponse)
+def get_html_content(
+    *,
+    id_exercise: str = Path(..., regex=r"^\d{1,4}_\d{1,2}"),
+    exercise_type: str = Query(None),
+    status: str = Query(None, regex=STATUS_REGEX),
+):
+    """
+    Displays the exercise with id_exercise in the navigator
+    (navigating only through the exercises with the given exercise_type and status if specified)
+    """
+    conversion_type = file_treatment_infos.loc[id_exercise].at["exercise_type"]
+    file_treatment_infos.at[id_exercise, "conversion_type"] = conversion_type  # reset conversion type to original type
+    html_output = generate_html(file_treatment_infos, id_exercise, nlp_token_class, nlp, SERVICE_CLIENT)
+    head, body = head_body_html(html_output, ASSETS_FINGERPRINTS)
+    return render_correction_page(id_exercise, head, body, "Afficher le XML", "", exercise_type, status)
+
+
+@app.get("/xml/{id_exercise}", response_class=StreamingResponse)
+def get_xml_content(
+    *,
+    id_exercise: str = Path(..., regex=r"^\d{1,4}_\d{1,2}"),
+    if_none_match: str = Header(None),
+):
+    """
+    Streams the escaped and highlighted XML of the exercise with id_exercise
+    (answers 304 if the navigator already has the current version of the file)
+    """
+    xml_file_path = xml_path(id_exercise)
+    if not os.path.exists(xml_file_path):
+        raise HTTPException(status_code=404, detail=f"No XML for the exercise {id_exercise}")
+    etag = xml_etag(xml_file_path)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    return StreamingResponse(
+        stream_xml_html(xml_file_path), media_type="text/html; charset=utf-8", headers=headers
     )
 
 
@@ -147,7 +266,9 @@ def form_post(
     *,
     id_exercise: str = Path(..., regex=r"^\d{1,4}_\d{1,2}"),
     new_tag: str = Form(None),
-    action: str = Form(...)
+    action: str = Form(...),
+    exercise_type: str = Query(None),
+    status: str = Query(None, regex=STATUS_REGEX),
 ):
     """
     Does the operations requested when pressing buttons or bind keys
@@ -156,62 +277,130 @@ def form_post(
         id_exercise (str): The id of the exercise to correct
         new_tag (str): the new tag to convert the exercise to (ex: tag = "VraiFaux")
         action (str): The action to do (ex: "Bonne Conversion")
+        exercise_type (str): The exercise type to navigate through (ex: "classe"), all types if None
+        status (str): The treatment status to navigate through ("treated" or "untreated"), all if None
     """
     result = ""
     index_action = APP_POST_FEATURES.index(action.lower())
 
     if index_action < NUMBER_FEATURES:  # classification cases = same treatment
-        html_output = generate_html(file_treatment_infos, id_exercise, nlp_token_class, nlp)
-        type_exercise = file_treatment_infos.loc[id_exercise].at["conversion_type"]  # latest conversion type
-        category_correction = CORRECTION_FEATURES[index_action]  # class of correction selected by user
-        remove_latest_treatment(file_treatment_infos, CORRECTION_OUTPUT_DIRECTORY, id_exercise, category_correction)
-        store_in_corresponding_folder(
-            html_output,
-            os.path.join(CORRECTION_OUTPUT_DIRECTORY, "correction_output"),
-            CORRECTION_FEATURES,
-            index_action,
-            type_exercise,
-            id_exercise,
-        )
-        file_treatment_infos.at[id_exercise, "category_path"] = os.path.join(category_correction, type_exercise)  # store new treatment
+        html_output = classify_exercise(id_exercise, index_action)
         result = "Fichier enregistré en tant que " + action.lower() +"!"
     elif index_action == NUMBER_FEATURES:  # new tag case = other treatment
         file_treatment_infos.at[id_exercise, "conversion_type"] = convert_class_name_to_type(new_tag)  # store new conversion type
-        html_output = generate_html(file_treatment_infos, id_exercise, nlp_token_class, nlp)
+        html_output = generate_html(file_treatment_infos, id_exercise, nlp_token_class, nlp, SERVICE_CLIENT)
     elif index_action == NUMBER_FEATURES + 1: # prediction case
-        top_categories = get_most_likely_tags(tagging_model, id_exercise)
+        top_categories = get_most_likely_tags(tagging_model, id_exercise, SERVICE_CLIENT)
         result = format_most_likely_tags(top_categories)
-        html_output = generate_html(file_treatment_infos, id_exercise, nlp_token_class, nlp)
+        html_output = generate_html(file_treatment_infos, id_exercise, nlp_token_class, nlp, SERVICE_CLIENT)
     elif index_action == NUMBER_FEATURES + 2: # display xml case
-        xml_output = open_xml(id_exercise)
-        xml_render = prepare_xml_to_display_html(xml_output)
-        conversion_type = file_treatment_infos.loc[id_exercise].at["conversion_type"]
-        html_tags = generate_select_tags(CLASS_NAME_DICT, convert_type_to_class_name(conversion_type))
-        successor = find_successor_in_index(INDEX_EXERCISES, id_exercise)
-        predecessor = find_predecessor_in_index(INDEX_EXERCISES, id_exercise)
-        return HTML_CORRECTION_TEMPLATE.render(
-                head="",
-                body=xml_render,
-                tags=html_tags,
-                to_show = "Afficher le HTML",
-                result=result,
-                successor=successor,
-                predecessor=predecessor,
-            )
+        xml_render = xml_viewer_html(id_exercise)  # lazy loaded from /xml/{id_exercise}
+        return render_correction_page(
+            id_exercise, "", xml_render, "Afficher le HTML", result, exercise_type, status
+        )
     elif index_action == NUMBER_FEATURES + 3: #display html case
-        html_output = generate_html(file_treatment_infos, id_exercise, nlp_token_class, nlp)
+        html_output = generate_html(file_treatment_infos, id_exercise, nlp_token_class, nlp, SERVICE_CLIENT)
+
+    head, body = head_body_html(html_output, ASSETS_FINGERPRINTS)
+    return render_correction_page(id_exercise, head, body, "Afficher le XML", result, exercise_type, status)
+
+
+# JSON API: the same operations as the correction page, returning only the data that changed
+
+
+def check_exercise_exists(id_exercise: str):
+    """Raises a 404 HTTPException if the exercise with id_exercise is not tracked"""
+    if id_exercise not in file_treatment_infos.index:
+        raise HTTPException(status_code=404, detail=f"Unknown exercise {id_exercise}")
+
 
-    head, body = head_body_html(html_output)
+@app.get("/api/tags")
+def api_get_tags():
+    """Returns the list of the tags an exercise can be converted to"""
+    return {"tags": list(CLASS_NAME_DICT.keys())}
+
+
+@app.get("/api/exercises/{id_exercise}")
+def api_get_exercise(
+    *,
+    id_exercise: str = Path(..., regex=r"^\d{1,4}_\d{1,2}"),
+    exercise_type: str = Query(None),
+    status: str = Query(None, regex=STATUS_REGEX),
+):
+    """
+    Returns the metadata and the treatment state of the exercise with id_exercise
+    (with its neighbours among the exercises with the given exercise_type and status if specified)
+    """
+    check_exercise_exists(id_exercise)
+    return treatment_state(id_exercise, exercise_type, status)
+
+
+@app.get("/api/exercises/{id_exercise}/html")
+def api_get_exercise_html(
+    *,
+    id_exercise: str = Path(..., regex=r"^\d{1,4}_\d{1,2}"),
+    tag: str = Query(None),
+):
+    """
+    Returns the head and the body of the conversion of the exercise with id_exercise
+    (a preview of its conversion to the given tag if any, ex: tag = "VraiFaux", which is not stored:
+    the conversion type is changed with POST /api/exercises/{id_exercise}/treatment)
+    """
+    check_exercise_exists(id_exercise)
     conversion_type = file_treatment_infos.loc[id_exercise].at["conversion_type"]
-    html_tags = generate_select_tags(CLASS_NAME_DICT, convert_type_to_class_name(conversion_type))
-    successor = find_successor_in_index(INDEX_EXERCISES, id_exercise)
-    predecessor = find_predecessor_in_index(INDEX_EXERCISES, id_exercise)
-    return HTML_CORRECTION_TEMPLATE.render(
-        head=head,
-        body=body,
-        tags=html_tags,
-        to_show = "Afficher le XML",
-        result=result,
-        successor=successor,
-        predecessor=predecessor,
+    if tag is not None:
+        if tag not in CLASS_NAME_DICT:
+            raise HTTPException(status_code=422, detail=f"Unknown tag {tag}")
+        conversion_type = convert_class_name_to_type(tag)
+    html_output = generate_html(
+        file_treatment_infos, id_exercise, nlp_token_class, nlp, SERVICE_CLIENT, conversion_type
     )
+    head, body = head_body_html(html_output, ASSETS_FINGERPRINTS)
+    return {
+        "id_exercise": id_exercise,
+        "conversion_type": conversion_type,
+        "head": head,
+        "body": body,
+    }
+
+
+@app.get("/api/exercises/{id_exercise}/predicted_tags")
+def api_get_predicted_tags(*, id_exercise: str = Path(..., regex=r"^\d{1,4}_\d{1,2}")):
+    """Returns the probabilities of the tags predicted for the exercise with id_exercise"""
+    check_exercise_exists(id_exercise)
+    top_categories = get_most_likely_tags(tagging_model, id_exercise, SERVICE_CLIENT)
+    return {
+        "id_exercise": id_exercise,
+        "tags": {str(tag): float(prob) for tag, prob in top_categories.items()},
+        "result": format_most_likely_tags(top_categories),
+    }
+
+
+@app.post("/api/exercises/{id_exercise}/treatment")
+def api_post_treatment(
+    *,
+    id_exercise: str = Path(..., regex=r"^\d{1,4}_\d{1,2}"),
+    treatment: dict = Body(..., example={"feature": "well_converted"}),
+    exercise_type: str = Query(None),
+    status: str = Query(None, regex=STATUS_REGEX),
+):
+    """
+    Stores the new conversion type of the exercise with id_exercise if a tag is given (ex: {"tag": "VraiFaux"}),
+    then classifies it in the correction feature given if any (one of CORRECTION_FEATURES),
+    and returns its new treatment state
+    """
+    check_exercise_exists(id_exercise)
+    tag = treatment.get("tag")
+    feature = treatment.get("feature")
+    if tag is None and feature is None:
+        raise HTTPException(status_code=422, detail="a tag or a feature is required")
+    if tag is not None and tag not in CLASS_NAME_DICT:
+        raise HTTPException(status_code=422, detail=f"Unknown tag {tag}")
+    if feature is not None and feature not in CORRECTION_FEATURES:
+        raise HTTPException(status_code=422, detail=f"feature must be one of {CORRECTION_FEATURES}")
+    if tag is not None:
+        file_treatment_infos.at[id_exercise, "conversion_type"] = convert_class_name_to_type(tag)
+    if feature is not None:
+        classify_exercise(id_exercise, CORRECTION_FEATURES.index(feature))
+    return treatment_state(id_exercise, exercise_type, status)
+
@@ -1,16 +1,18 @@
 var successor= document.getElementById("script_correction").getAttribute("successor");
 var predecessor=document.getElementById("script_correction").getAttribute("predecessor");
 var current=document.getElementById("script_correction").getAttribute("current");
+// the navigation filters (ex: ?exercise_type=classe&status=untreated) are kept from an exercise to another
+var filters = window.location.search;
 
 document.addEventListener("keydown", function(event){
     var char = event.which || event.keyCode;
     console.log(char);
     switch(char){
         case 39: //right arrow key
-            window.location.href = window.location.protocol + "//" + window.location.host + "/correction/" + successor;
+            window.location.href = window.location.protocol + "//" + window.location.host + "/correction/" + successor + filters;
             break;
         case 37: // left arrow key
-            window.location.href = window.location.protocol + "//" + window.location.host + "/correction/" + predecessor;
+            window.location.href = window.location.protocol + "//" + window.location.host + "/correction/" + predecessor + filters;
             break;
         case 38: // up arrow key
             document.getElementById("nice_conversion_button").click();
@@ -44,3 +46,102 @@ function SubmitCorresponding(div){
     console.log(submit_id);
     document.getElementById(submit_id).click();
 }
+
+async function LoadXmlViewer(){
+    /* fills the XML viewer with the escaped XML streamed by the server,
+       displaying each received line as soon as it is complete
+    */
+    var xml_viewer = document.getElementById("xml_viewer");
+    if (!xml_viewer) {
+        return;
+    }
+    var response = await fetch(xml_viewer.getAttribute("src"));
+    if (!response.ok) {
+        xml_viewer.textContent = "XML introuvable";
+        return;
+    }
+    var reader = response.body.getReader();
+    var decoder = new TextDecoder("utf-8");
+    var pending = "";
+    xml_viewer.innerHTML = "";
+    while (true) {
+        var {done, value} = await reader.read();
+        pending += done ? decoder.decode() : decoder.decode(value, {stream: true});
+        var end_last_line = done ? pending.length : pending.lastIndexOf("\n") + 1;
+        if (end_last_line > 0) {
+            xml_viewer.insertAdjacentHTML("beforeend", pending.slice(0, end_last_line));
+            pending = pending.slice(end_last_line);
+        }
+        if (done) {
+            break;
+        }
+    }
+}
+
+window.addEventListener("load", LoadXmlViewer);
+
+// CLASSIFICATION_FORMS: The forms of the classification treatments and the corresponding features
+// sent to the JSON API, so that the page does not have to be generated again
+var CLASSIFICATION_FORMS = {
+    "nice_conversion": "well_converted",
+    "wrong_conversion": "incorrectly_converted",
+    "wrong_extraction": "incorrectly_extracted",
+};
+
+async function PostTreatment(event){
+    /* registers the classification of the current exercise through the JSON API
+       and only updates the result message
+    */
+    event.preventDefault();
+    var form = event.currentTarget;  // no longer available once the event is dispatched
+    var feature = CLASSIFICATION_FORMS[form.id];
+    var third_part = document.getElementById("third_part");
+    var response = await fetch("/api/exercises/" + current + "/treatment" + filters, {
+        method: "POST",
+        headers: {"Content-Type": "application/json"},
+        body: JSON.stringify({"feature": feature}),
+    });
+    if (!response.ok) {
+        third_part.textContent = "Erreur lors de l'enregistrement";
+        return;
+    }
+    var state = await response.json();
+    // the exercise may have left the filtered view: the neighbours are updated
+    successor = state["successor"] || successor;
+    predecessor = state["predecessor"] || predecessor;
+    var value = form.getAttribute("value").toLowerCase();
+    third_part.textContent = "Fichier enregistré en tant que " + value + "!";
+}
+
+async function ShowPrediction(event){
+    /* displays the tags predicted for the current exercise through the JSON API,
+       the other button of the form (new tag) still reloads the page
+    */
+    if (!event.submitter || event.submitter.id != "show_prediction_button") {
+        return;
+    }
+    event.preventDefault();
+    var third_part = document.getElementById("third_part");
+    third_part.innerHTML = "Veuillez patienter ...";
+    var response = await fetch("/api/exercises/" + current + "/predicted_tags");
+    if (!response.ok) {
+        third_part.textContent = "Erreur lors de la prédiction";
+        return;
+    }
+    var prediction = await response.json();
+    third_part.innerHTML = prediction["result"];
+}
+
+window.addEventListener("load", function(){
+    for (var form_id in CLASSIFICATION_FORMS) {
+        // not getElementById: the div wrapping the wrong_extraction form (and the xml/html one) has the same id
+        var form = document.querySelector("form#" + form_id);
+        if (form) {
+            form.addEventListener("submit", PostTreatment);
+        }
+    }
+    var new_tag_form = document.querySelector("form#new_tag");
+    if (new_tag_form) {
+        new_tag_form.addEventListener("submit", ShowPrediction);
+    }
+});
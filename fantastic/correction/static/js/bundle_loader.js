@@ -0,0 +1,45 @@
+// loader of the bundles of adapted exercises (fantastic/bundle.py): one gzipped json per textbook holding
+// the body of each exercise and the layouts (head, references to the shared css and js) of the templates
+// the page using it must be in a folder next to the css and js folders (ex: the bundles folder of the output),
+// it is copied to the js folder of the output by fantastic/main.py (see fantastic/output_writer.py publish_assets)
+// the references of the layouts being relative (ex: ../css/select.css)
+//
+// load_bundle("textbook.bundle.json.gz").then(bundle => show_bundle_page(bundle, "6_1", iframe));
+
+async function load_bundle(url) {
+    /* fetches and decompresses the bundle (the server may already have decompressed it)
+    */
+    var response = await fetch(url);
+    var data = new Uint8Array(await response.arrayBuffer());
+
+    // gzip magic number
+    if (data[0] == 0x1f && data[1] == 0x8b) {
+        var stream = new Blob([data]).stream().pipeThrough(new DecompressionStream("gzip"));
+        data = new Uint8Array(await new Response(stream).arrayBuffer());
+    }
+    return JSON.parse(new TextDecoder("utf-8").decode(data));
+}
+
+function bundle_page_ids(bundle) {
+    /* the ids of the exercises of the bundle
+    */
+    return Object.keys(bundle.manifest.exercises);
+}
+
+function extract_bundle_page(bundle, exercise_id) {
+    /* the html of the exercise: its layout around its body (the same html as the standalone file)
+    */
+    var entry = bundle.manifest.exercises[exercise_id];
+    var layout = bundle.manifest.layouts[entry.layout];
+    // a function replacement: a title holding $& or $' is inserted as it is
+    var prefix = layout.prefix.replace("<title></title>", function() {
+        return "<title>".concat(entry.title, "</title>");
+    });
+    return prefix.concat(bundle.pages[exercise_id], layout.suffix);
+}
+
+function show_bundle_page(bundle, exercise_id, iframe) {
+    /* shows the exercise in the iframe, its scripts (front.js, select.js...) run as in the standalone file
+    */
+    iframe.srcdoc = extract_bundle_page(bundle, exercise_id);
+}
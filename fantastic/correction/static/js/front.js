@@ -3,6 +3,8 @@
 // the "bit" is defined by a threshold
 var threshold = 15;
 var nb_lines_per_page = document.getElementById("script_front").getAttribute("lines_per_page");
+// the pages are already computed in the html when the exercise was generated: we only show them
+var paginated = document.getElementById("script_front").getAttribute("paginated") == "true";
 
 // we add events to handle
 
@@ -24,7 +26,9 @@ function style() {
        we do not resplit lines when the window is resized for instance, it would not work because of invisible words
     */
        
-    split_lines_into_pages();
+    if (!paginated) {
+        split_lines_into_pages();
+    }
     show_page(0);
     color_lines();
 }
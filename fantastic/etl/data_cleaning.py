@@ -1,9 +1,9 @@
-import json
 import os
 import xmltodict
 import pandas as pd
 
 import fantastic.paths
+from fantastic import serializer
 
 
 def jsonify(xml_folder, json_folder) -> None:
@@ -29,8 +29,7 @@ def jsonify(xml_folder, json_folder) -> None:
         # creating the json
         new_path = os.path.join(json_folder, ex_path.split(".")[0] + ".json")
 
-        with open(new_path, mode="w", encoding="UTF-8") as json_ex:
-            json.dump(obj, json_ex, indent=4, ensure_ascii=False)
+        serializer.dump(obj, new_path)
 
 
 def add_tag_to_json(json_folder, tag_file):
@@ -50,11 +49,9 @@ def add_tag_to_json(json_folder, tag_file):
         json_path = os.path.join(json_folder, json_filename)
 
         try:
-            with open(json_path, mode="r", encoding="UTF-8") as opened_file:
-                json_file = json.load(opened_file)
-            with open(json_path, mode="w", encoding="UTF-8") as opened_file:
-                json_file["type"] = tags[type_exercice][i]
-                json.dump(json_file, opened_file, indent=4, ensure_ascii=False)
+            json_file = serializer.load(json_path)
+            json_file["type"] = tags[type_exercice][i]
+            serializer.dump(json_file, json_path)
             tagged.append(json_filename)
 
         except FileNotFoundError as error_message:
@@ -0,0 +1,169 @@
+from bisect import bisect_right
+from collections import deque
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton finding all the occurrences of a set of strings in a text in one scan
+    (the time of a scan does not depend on the number of strings searched)
+
+    Class attributes:
+        patterns (List[str]): The strings searched (empty strings are ignored)
+    """
+
+    def __init__(self, patterns: Sequence[str]) -> None:
+        self.patterns: List[str] = list(patterns)
+        self.__transitions: List[Dict[str, int]] = [{}]  # state 0 is the root (empty prefix)
+        self.__fail: List[int] = [0]
+        self.__outputs: List[List[int]] = [[]]  # indexes of the patterns ending at each state
+        for index, pattern in enumerate(self.patterns):
+            if pattern:
+                self.__add(pattern, index)
+        self.__build_fail_links()
+
+    def __add(self, pattern: str, index: int) -> None:
+        """Adds the path of the pattern to the trie of the automaton"""
+        state = 0
+        for char in pattern:
+            next_state = self.__transitions[state].get(char)
+            if next_state is None:
+                next_state = len(self.__transitions)
+                self.__transitions[state][char] = next_state
+                self.__transitions.append({})
+                self.__fail.append(0)
+                self.__outputs.append([])
+            state = next_state
+        self.__outputs[state].append(index)
+
+    def __build_fail_links(self) -> None:
+        """Links each state to the state of its longest proper suffix in the trie (breadth first)"""
+        queue = deque(self.__transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.__transitions[state].items():
+                queue.append(next_state)
+                fail = self.__fail[state]
+                while fail and char not in self.__transitions[fail]:
+                    fail = self.__fail[fail]
+                self.__fail[next_state] = self.__transitions[fail].get(char, 0)
+                # the patterns ending at the suffix also end at the state
+                self.__outputs[next_state] = self.__outputs[next_state] + self.__outputs[self.__fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """
+        Yields all the occurrences (overlapping ones included) of the patterns in the text
+        as (start, end, index of the pattern), ordered by end then by decreasing length
+        """
+        transitions = self.__transitions
+        fail = self.__fail
+        outputs = self.__outputs
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in transitions[state]:
+                state = fail[state]
+            state = transitions[state].get(char, 0)
+            for index in outputs[state]:
+                end = position + 1
+                yield end - len(self.patterns[index]), end, index
+
+
+class MultiReplacer:
+    """
+    Replaces all the occurrences of several strings in a text in one scan, giving exactly the result
+    of calling str.replace for each (pattern, replacement) pair in order:
+        for pattern, replacement in replacements:
+            text = text.replace(pattern, replacement)
+
+    Class attributes:
+        replacements (List[Tuple[str, str]]): The (pattern, replacement) pairs, by decreasing priority
+    """
+
+    def __init__(self, replacements: Sequence[Tuple[str, str]]) -> None:
+        self.replacements: List[Tuple[str, str]] = list(replacements)
+        self.__automaton = AhoCorasick([pattern for pattern, _ in self.replacements])
+        self.__max_length = max((len(pattern) for pattern, _ in self.replacements), default=0)
+        # str.replace with an empty pattern inserts the replacement between each character
+        self.__sequential_only = any(not pattern for pattern, _ in self.replacements)
+
+    def sequential_replace(self, text: str) -> str:
+        """Returns the text after calling str.replace for each pair (reference behaviour)"""
+        for pattern, replacement in self.replacements:
+            text = text.replace(pattern, replacement)
+        return text
+
+    def __select_occurrences(self, text: str) -> List[Tuple[int, int, int]]:
+        """
+        Returns the occurrences replaced by the successive str.replace calls: for each pattern by decreasing
+        priority, its leftmost non overlapping occurrences which do not overlap an occurrence already selected
+        """
+        occurrences = sorted(self.__automaton.iter_matches(text), key=lambda match: (match[2], match[0]))
+        selected_starts: List[int] = []
+        selected: List[Tuple[int, int, int]] = []
+        index_pattern = -1
+        end_last = 0
+        for start, end, index in occurrences:
+            if index != index_pattern:  # str.replace of the next pattern
+                index_pattern = index
+                end_last = 0
+            if start < end_last:  # overlaps the previous occurrence of the same pattern
+                continue
+            position = bisect_right(selected_starts, start)
+            if position and selected[position - 1][1] > start:
+                continue
+            if position < len(selected) and selected[position][0] < end:
+                continue
+            selected_starts.insert(position, start)
+            selected.insert(position, (start, end, index))
+            end_last = end
+        return selected
+
+    def __may_change_next_patterns(self, text: str, selected: List[Tuple[int, int, int]]) -> bool:
+        """
+        Returns whether a replacement may create an occurrence of a pattern of lower priority (inside the
+        replacement or across its borders), which the successive str.replace calls would replace too.
+        Checked around each replacement, which must be further than the longest pattern from the other ones.
+        """
+        margin = self.__max_length - 1
+        for position, (start, end, index) in enumerate(selected):
+            if position and selected[position - 1][1] > start - margin:
+                return True
+            if position + 1 < len(selected) and selected[position + 1][0] < end + margin:
+                return True
+            replacement = self.replacements[index][1]
+            before = text[max(start - margin, 0):start]
+            window = before + replacement + text[end:end + margin]
+            region_start, region_end = len(before), len(before) + len(replacement)
+            for start_created, end_created, index_created in self.__automaton.iter_matches(window):
+                if index_created <= index:
+                    continue
+                if region_start == region_end:  # deleted pattern: the occurrence crosses the junction
+                    if start_created < region_start < end_created:
+                        return True
+                elif start_created < region_end and end_created > region_start:
+                    return True
+        return False
+
+    def replace(self, text: str) -> str:
+        """Returns the text after replacing the occurrences of the patterns (see class documentation)"""
+        if self.__sequential_only:
+            return self.sequential_replace(text)
+        selected = self.__select_occurrences(text)
+        if not selected:
+            return text
+        if self.__may_change_next_patterns(text, selected):
+            # rare: a replacement may change what the next patterns match
+            return self.sequential_replace(text)
+        pieces = []
+        position = 0
+        for start, end, index in selected:
+            pieces.append(text[position:start])
+            pieces.append(self.replacements[index][1])
+            position = end
+        pieces.append(text[position:])
+        return "".join(pieces)
+
+
+def multi_replace(text: str, replacements: Sequence[Tuple[str, str]]) -> str:
+    """Returns the text after replacing in order each pattern by its replacement (see MultiReplacer)"""
+    return MultiReplacer(replacements).replace(text)
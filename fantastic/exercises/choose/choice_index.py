@@ -0,0 +1,212 @@
+from collections import Counter
+from configparser import ConfigParser
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import json
+import os
+import re
+from fantastic.exercises.automaton import AhoCorasick
+import fantastic.paths
+from fantastic import serializer
+
+# CHOICES_SEPARATOR_REGEX: What can separate two choices written in a guideline (ex: "le, la ou les")
+CHOICES_SEPARATOR_REGEX = r"(?:\s*,\s*|\s+ou\s+bien\s+|\s+ou\s+)"
+# INDEXED_SETTINGS: The settings of the [choose] section of data.cfg the choices found depend on
+INDEXED_SETTINGS = [
+    "non_separators",
+    "non_fill_chars",
+    "replacing_symbol",
+    "guideline_separators",
+    "end_last_choice_patterns",
+    "compare_choices_threshold",
+    "has_choices_threshold",
+]
+
+
+def settings_key(config: ConfigParser) -> str:
+    """Returns a hash of the settings used to find the choices (an index mined with other settings is ignored)"""
+    settings = [config.get("choose", setting) for setting in INDEXED_SETTINGS]
+    return hashlib.sha256(json.dumps(settings).encode("utf-8")).hexdigest()[:16]
+
+
+class ChoiceIndex:
+    """
+    Index of the choice sets (ex: ["a", "à"], ["ce", "se"]) found by the heuristics of Choose
+    in previously adapted exercises, to propose the choices of a new exercise in one scan
+    of its guideline instead of running all the heuristics
+
+    Class attributes:
+        additional_guidelines (Dict[str, List[str]]): The choices found in an additional guideline,
+        by additional guideline (ex: {"a / à": ["a", "à"]})
+        guideline_spans (Dict[str, List[str]]): The choices found in a guideline, by the part of the
+        guideline holding them (ex: {"a ou à": ["a", "à"]})
+        key (str): The hash of the settings used when mining the exercises (see settings_key)
+    """
+
+    def __init__(
+        self,
+        additional_guidelines: Dict[str, List[str]] = None,
+        guideline_spans: Dict[str, List[str]] = None,
+        key: str = "",
+    ) -> None:
+        self.additional_guidelines = additional_guidelines or {}
+        self.guideline_spans = guideline_spans or {}
+        self.key = key
+        self.__spans = list(self.guideline_spans.keys())
+        self.__automaton = AhoCorasick(self.__spans)
+
+    def __len__(self) -> int:
+        return len(self.additional_guidelines) + len(self.guideline_spans)
+
+    def find(self, additional_guideline: str, guideline: str) -> List[List[str]]:
+        """
+        Returns the choices proposed by the index for an exercise (same format as Choose.find_choices),
+        an empty list if the index does not know them and the heuristics have to be run
+
+        Parameters:
+            additional_guideline (str): The additional guideline of the exercise ("#text" of the exercise text)
+            guideline (str): The guideline of the exercise
+        Returns:
+            choices (List[List[str]]): The choices of the exercise
+        """
+        if additional_guideline:
+            # the heuristics look first in the additional guideline: the guideline is not used
+            choices = self.additional_guidelines.get(additional_guideline)
+            return [list(choices)] if choices else []
+        best_span = None
+        for start, end, index in self.__automaton.iter_matches(guideline):
+            if not is_word_boundary(guideline, start, end):
+                continue
+            # the longest span (the most choices) first, then the first one
+            if best_span is None or end - start > best_span[1] - best_span[0]:
+                best_span = (start, end, index)
+        if best_span is None:
+            return []
+        return [list(self.guideline_spans[self.__spans[best_span[2]]])]
+
+    def to_dict(self) -> dict:
+        """Returns the index as a dict to store in a json"""
+        return {
+            "key": self.key,
+            "additional_guidelines": self.additional_guidelines,
+            "guideline_spans": self.guideline_spans,
+        }
+
+    @classmethod
+    def from_dict(cls, index_dict: dict):
+        """Returns the index stored in a dict (see to_dict)"""
+        return cls(index_dict["additional_guidelines"], index_dict["guideline_spans"], index_dict["key"])
+
+
+def is_word_boundary(text: str, start: int, end: int) -> bool:
+    """Returns whether text[start:end] is neither preceded nor followed by a letter or a digit"""
+    return (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum())
+
+
+def find_choices_span(guideline: str, choices: List[str]) -> Optional[str]:
+    """
+    Returns the part of the guideline holding the choices (ex: "le, la ou les" for the choices
+    ["le", "la", "les"]), None if the choices are not written next to each other in the guideline
+    """
+    if not choices or not all(choices):
+        return None
+    regex = CHOICES_SEPARATOR_REGEX.join(re.escape(choice) for choice in choices)
+    match = re.search(r"(?<!\w)" + regex + r"(?!\w)", guideline)
+    return match[0] if match else None
+
+
+def mine_choice_index(
+    exercises_choices: List[Tuple[str, str, str, List[List[str]]]],
+    key: str,
+    min_occurrences: int = 2,
+) -> ChoiceIndex:
+    """
+    Returns the index of the choice sets found at least min_occurrences times by the heuristics
+
+    Parameters:
+        exercises_choices (List[Tuple[str, str, str, List[List[str]]]]): For each exercise, its additional
+        guideline, its guideline, where the heuristics found the choices ("additional_guideline", "guideline"
+        or "sentences") and the choices found
+        key (str): The hash of the settings used by the heuristics (see settings_key)
+        min_occurrences (int) (default: 2): The number of exercises a choice set has to be found in
+    Returns:
+        choice_index (ChoiceIndex): The index of the choices
+    """
+    additional_guidelines_count = Counter()
+    guideline_spans_count = Counter()
+    for additional_guideline, guideline, source, choices in exercises_choices:
+        if len(choices) != 1:  # choices found sentence by sentence are not indexed
+            continue
+        if source == "additional_guideline" and "." not in additional_guideline:
+            # with a "." the choices found depend on the exercise text too
+            additional_guidelines_count[(additional_guideline, tuple(choices[0]))] += 1
+        elif source == "guideline":
+            span = find_choices_span(guideline, choices[0])
+            if span:
+                guideline_spans_count[(span, tuple(choices[0]))] += 1
+    additional_guidelines = {}
+    for (additional_guideline, choices), count in additional_guidelines_count.most_common():
+        if count >= min_occurrences and additional_guideline not in additional_guidelines:
+            additional_guidelines[additional_guideline] = list(choices)
+    guideline_spans = {}
+    for (span, choices), count in guideline_spans_count.most_common():
+        if count >= min_occurrences and span not in guideline_spans:
+            guideline_spans[span] = list(choices)
+    return ChoiceIndex(additional_guidelines, guideline_spans, key)
+
+
+def save_choice_index(choice_index: ChoiceIndex, path: str = fantastic.paths.CHOICE_INDEX_PATH):
+    """Stores the index in a json file"""
+    serializer.dump(choice_index.to_dict(), path)
+    return None
+
+
+@lru_cache(maxsize=None)
+def load_choice_index(key: str, path: str = fantastic.paths.CHOICE_INDEX_PATH) -> ChoiceIndex:
+    """
+    Returns the index stored in the json file (loaded once), an empty index if there is none
+    or if it was mined with other settings than the ones of the given key
+    """
+    if not os.path.exists(path):
+        return ChoiceIndex(key=key)
+    choice_index = ChoiceIndex.from_dict(serializer.load(path))
+    if choice_index.key != key:
+        return ChoiceIndex(key=key)
+    return choice_index
+
+
+def main():
+    """Mines the choices of the Choose exercises of the corpus and stores the index"""
+    # imported here: the Choose classes import this module
+    from fantastic.exercises.choose.choix_multiples import ChoixMultiples
+    from fantastic.exercises.choose.classe_cm import ClasseCM
+
+    config = ConfigParser()
+    config.read(os.path.join(fantastic.paths.FANTASTIC_DIR, "exercises", "data.cfg"))
+    min_occurrences = json.loads(config.get("choose", "choice_index_min_occurrences"))
+    choose_classes = {"CM": ChoixMultiples, "ClasseCM": ClasseCM}
+
+    exercises_choices = []
+    for file_path in os.listdir(fantastic.paths.JSON_DIR):
+        exercise_path = os.path.join(fantastic.paths.JSON_DIR, file_path)
+        json_dict = serializer.load(exercise_path)
+        exercise_type = json_dict.get("type")
+        if exercise_type not in choose_classes:
+            continue
+        exercise = choose_classes[exercise_type](exercise_path, config).load_json(json_dict)
+        try:
+            choices, source = exercise.find_choices_with_heuristics()
+        except Exception as e:
+            print(f"{file_path} could not be mined: {e}")
+            continue
+        _, additional_guideline = exercise.find_additional_guideline()
+        exercises_choices.append((additional_guideline, exercise.find_guideline(), source, choices))
+
+    choice_index = mine_choice_index(exercises_choices, settings_key(config), min_occurrences)
+    save_choice_index(choice_index)
+    print(f"{len(choice_index)} choice sets indexed from {len(exercises_choices)} exercises")
+
+
+if __name__ == "__main__":
+    main()
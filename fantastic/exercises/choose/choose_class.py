@@ -3,10 +3,9 @@ from typing import List
 import re
 import os
 import json
-from nltk.stem.snowball import FrenchStemmer
-from nltk import word_tokenize
 from fantastic.exercises.exercise import Exercise
 from fantastic.exercises.utils import text_to_html, index_words
+from fantastic.exercises.nlp_cache import stem, tokenize
 from fantastic.exercises.choose.explore_guideline import find_choices_in_guideline
 from fantastic.exercises.choose.explore_additional_guideline import (
     find_choices_in_add_guideline,
@@ -22,6 +21,7 @@ from fantastic.exercises.choose.choices_processing import (
     final_clean_choices,
     choices_to_html,
 )
+from fantastic.exercises.choose.choice_index import load_choice_index, settings_key
 import fantastic.paths
 
 config_file = ConfigParser()
@@ -52,6 +52,8 @@ class Choose(Exercise):
         heuristic compare_choices
         * has_choices_threshold (float) (default: 0.3): A float between 0 and 1 to tune the output of the
         heuristic has_choices
+        * use_choice_index (bool): Whether the choices are first searched in the index of the choices
+        mined from the corpus (see choice_index.py) before running the heuristics
     """
     TEMPLATE_NAME: str = "choose"
     NON_SEPARATORS: List[str] = json.loads(config_file.get("choose","non_separators"))
@@ -65,6 +67,8 @@ class Choose(Exercise):
     END_LAST_CHOICE_PATTERNS: List[str] = json.loads(config_file.get("choose", "end_last_choice_patterns"))
     COMPARE_CHOICES_THRESHOLD: float = json.loads(config_file.get("choose", "compare_choices_threshold"))
     HAS_CHOICES_THRESHOLD: float = json.loads(config_file.get("choose", "has_choices_threshold"))
+    USE_CHOICE_INDEX: bool = json.loads(config_file.get("choose", "use_choice_index"))
+    CHOICE_INDEX_KEY: str = settings_key(config_file)
 
     """See Exercise class documentation to understand the different parameters"""
     def __init__(
@@ -83,13 +87,37 @@ class Choose(Exercise):
 
     def find_choices(self):
         """
-        Returns the choices found in the exercise
+        Returns the choices found in the exercise (proposed by the index of the choices of the
+        corpus if it knows them, found by the heuristics otherwise)
 
         Parameters:
             See in class attributes the different parameters
         Returns:
             choices (List[List[str]]): A list containing lists of choices found
         """
+        choices = self.find_choices_in_index() if self.USE_CHOICE_INDEX else []
+        if not choices:
+            choices, _ = self.find_choices_with_heuristics()
+        self.choices = choices
+        return choices
+
+
+    def find_choices_in_index(self):
+        """Returns the choices proposed by the index of the choices of the corpus (empty list if unknown)"""
+        _, text_try = self.find_additional_guideline()
+        return load_choice_index(self.CHOICE_INDEX_KEY).find(text_try, self.find_guideline())
+
+
+    def find_choices_with_heuristics(self):
+        """
+        Returns the choices found in the exercise by the heuristics and where they were found
+
+        Parameters:
+            See in class attributes the different parameters
+        Returns:
+            choices (List[List[str]]): A list containing lists of choices found
+            source (str): "additional_guideline", "guideline" or "sentences" (None if no choices found)
+        """
         _, text_try = self.find_additional_guideline()
         sentences = self.find_sentences()
         # Some treatments needs to match white spaces
@@ -104,26 +132,27 @@ class Choose(Exercise):
             self.NON_FILL_CHARS,
             self.REPLACING_SYMBOL,
         )  # first the function search in the "#text" field
-        if not choices:  # if nothing is found
-            choices = find_choices_in_guideline(
-                self.find_guideline(),
-                self.GUIDELINE_SEPARATORS,
-                self.END_LAST_CHOICE_PATTERNS,
-                self.REPLACING_SYMBOL,
-                self.COMPARE_CHOICES_THRESHOLD,
-                self.HAS_CHOICES_THRESHOLD,
-                )
-        if not choices:
-            choices = find_choices_in_sentences(
-                sentences,
-                self.NON_SEPARATORS,
-                self.NON_FILL_CHARS,
-                self.REPLACING_SYMBOL,
-                self.SPLIT_CHARS,
-                self.EXCEPTIONS_LIST,
-            )
-        self.choices = choices
-        return choices
+        if choices:
+            return choices, "additional_guideline"
+        choices = find_choices_in_guideline(
+            self.find_guideline(),
+            self.GUIDELINE_SEPARATORS,
+            self.END_LAST_CHOICE_PATTERNS,
+            self.REPLACING_SYMBOL,
+            self.COMPARE_CHOICES_THRESHOLD,
+            self.HAS_CHOICES_THRESHOLD,
+            )  # if nothing is found
+        if choices:
+            return choices, "guideline"
+        choices = find_choices_in_sentences(
+            sentences,
+            self.NON_SEPARATORS,
+            self.NON_FILL_CHARS,
+            self.REPLACING_SYMBOL,
+            self.SPLIT_CHARS,
+            self.EXCEPTIONS_LIST,
+        )
+        return choices, "sentences" if choices else None
 
 
     def prepare_to_display(
@@ -172,10 +201,9 @@ class Choose(Exercise):
             return text.replace(verb_to_replace, replacing_verb)
 
         adapted_guideline = self.find_guideline()
-        stemmer = FrenchStemmer()
-        guideline_list = word_tokenize(adapted_guideline, language="french")
+        guideline_list = tokenize(adapted_guideline, language="french")
         for word in guideline_list:
-            stemmed_word = stemmer.stem(word)
+            stemmed_word = stem(word)
             if stemmed_word in self.STEMMED_VERBS_TO_REPLACE:
                 adapted_guideline = __replace_and_capitalize(
                     adapted_guideline,
@@ -295,7 +323,8 @@ class Choose(Exercise):
         new_sentences += "\n".join(html_choices)
         self.html_output = self.html_template.render(
             exercise_number=self.json_path.split(os.sep)[-1].split(".")[0],
-            exercise_text=new_sentences,
+            exercise_text=self.paginate(new_sentences),
+            paginated=self.paginated,
             additional_guideline=additional_guideline,
             guideline=guideline,
             lines_per_page=self.lines_per_page,
@@ -1,7 +1,11 @@
 from typing import List, Tuple
 import re
-import Levenshtein as lev
-from fantastic.exercises.utils import find_all_sentences, flatten_regex
+from fantastic.exercises.utils import find_all_sentences
+from fantastic.exercises.choose.separator_scanner import SeparatorScanner, get_separator_scanner
+from fantastic.exercises.choose.similarity import is_within_distance, pairwise_distances
+
+# DOUBLE_SPACE_PATTERN: Pattern of the doubled white spaces of a flattened sentence
+DOUBLE_SPACE_PATTERN = re.compile(r"\s{2}")
 
 
 def find_choices_in_guideline(
@@ -34,13 +38,17 @@ def find_choices_in_guideline(
         choices (List[List[str]]): The choices in the guideline
     """
     # if not is_board_exercise(guideline):
+    scanner = get_separator_scanner(guideline_separators)  # compiled once per set of separators
     sentences = find_all_sentences(guideline)
-    sentence_choice = __find_sentence_choice(sentences, guideline_separators)
-    last_choice = __find_last_choice(sentence_choice, guideline_separators, end_last_choice_patterns)
+    sentence_choice = __find_sentence_choice(sentences, scanner)
+    sentence_choice_flat = re.sub(r"\s", " " * 2, sentence_choice) #allows to find two occurences of patterns following
+    # each other. (ex: " ou ou " --> "  ou  ou  ")
+    separator_spans = scanner.separator_spans(sentence_choice_flat)  # all the separators found in one pass
+    last_choice = __find_last_choice(sentence_choice_flat, separator_spans, end_last_choice_patterns)
     choices = __find_other_choices(
-        sentence_choice,
+        sentence_choice_flat,
         last_choice,
-        guideline_separators,
+        separator_spans,
         replacing_symbol,
         compare_choices_threshold
         )
@@ -52,50 +60,46 @@ def find_choices_in_guideline(
     return [choices] #hence (len(choices) == 1) means same choices everywhere
 
 
-def __find_sentence_choice(sentences: List[str], guideline_separators: dict):
+def __find_sentence_choice(sentences: List[str], scanner: SeparatorScanner):
     """
     Returns the sentence containing the choices (based on the hypothesis that
     all choices are in the same sentence of the guideline)
 
     Parameters:
         sentences (List[str]): The sentences composing the guideline
-        guideline_separators (dict): The dictionary containing as keys the possible regex patterns matching a
-        choice separator in the guideline (ordered from highest to lowest priority) and as values a list of all
-        the regex patterns beginning with the key regex and representing a case where the key regex does not match
-        a choice separator.
-        (ex: {"\\sou\\s": "\\sou\\sbien"} means " ou " is considered as a separator only if not followed by "bien")
+        scanner (SeparatorScanner): The scanner of the separators of the guideline
+        (ordered from highest to lowest priority)
     Returns:
         sentence_chosen (str): The sentence which contains the choices
     """
     if not sentences:
         return sentences
     sentence_chosen = sentences[0]
-    separator_regex_list = list(guideline_separators.keys())
-    index_best_pattern = len(separator_regex_list) - 1
+    index_best_pattern = len(scanner.separators) - 1
     for sentence in sentences:
-        for index, pattern in enumerate(separator_regex_list):
-            if not index_best_pattern: # can't find better pattern
-                return sentence_chosen
-            if index >= index_best_pattern:
-                break
-            if re.search(pattern, sentence):
-                index_best_pattern = index
-                sentence_chosen = sentence
+        if not index_best_pattern: # can't find better pattern
+            return sentence_chosen
+        # only the separators with a higher priority than the best one found are searched
+        index = scanner.best_separator_index(sentence, index_best_pattern)
+        if index is not None:
+            index_best_pattern = index
+            sentence_chosen = sentence
     return sentence_chosen
 
 
-def __find_last_choice(sentence_choice: str, guideline_separators: dict, end_last_choice_patterns: List[str]):
+def __find_last_choice(
+    sentence_choice_flat: str,
+    separator_spans: List[List[Tuple[int]]],
+    end_last_choice_patterns: List[str]
+    ):
     """
     Returns the last_choice (from left to right) (empirically easier to find than the first_choice)
     (Many exceptions like "où ou ou bien")
 
     Parameters:
-        choice_sentence (str): The sentences containing the choices
-        guideline_separators (dict): The dictionary containing as keys the possible regex patterns matching a
-        choice separator in the guideline (ordered from highest to lowest priority) and as values a list of all
-        the regex patterns beginning with the key regex and representing a case where the key regex does not match
-        a choice separator.
-        (ex: {"\\sou\\s": "\\sou\\sbien"} means " ou " is considered as a separator only if not followed by "bien")
+        sentence_choice_flat (str): The flattened sentence containing the choices (white spaces doubled)
+        separator_spans (List[List[Tuple[int]]]): The spans of the choice separators found in the flattened
+        sentence for each separator (ordered from highest to lowest priority), see SeparatorScanner
         end_last_choice_patterns (List[str]): the list of possible regex patterns matching the end of the last
         choice in the guideline
     Returns:
@@ -108,19 +112,13 @@ def __find_last_choice(sentence_choice: str, guideline_separators: dict, end_las
         last_choice = re.sub(r"\s{2,}", " ", last_choice)
         return last_choice.strip()
 
-    sentence_choice_flat = re.sub(r"\s", " " * 2, sentence_choice)
-    for separator_regex, separator_exceptions_list in guideline_separators.items():
-        flattened_separator_regex = flatten_regex(separator_regex)
-        flattened_exceptions_regex = [flatten_regex(exception) for exception in separator_exceptions_list]
-        exceptions_pattern = re.compile("|".join(flattened_exceptions_regex))
-        match_separator_list = [match for match in re.finditer(flattened_separator_regex, sentence_choice_flat)]
-        match_separator_list.reverse()
-        for match_separator in match_separator_list:
-            start, end= match_separator.span()
-            if not exceptions_pattern.pattern or not exceptions_pattern.match(sentence_choice_flat[start:]):
-                last_choice = sentence_choice_flat[end:]
-                pattern_end = re.compile("|".join(end_last_choice_patterns))
-                return __clean_last_choice(last_choice, pattern_end)
+    for separator_span_list in separator_spans:
+        if separator_span_list:
+            # the last separator of the pattern with the highest priority found
+            _, end = separator_span_list[-1]
+            last_choice = sentence_choice_flat[end:]
+            pattern_end = re.compile("|".join(end_last_choice_patterns))
+            return __clean_last_choice(last_choice, pattern_end)
     return ""
 
 
@@ -140,19 +138,21 @@ def compare_choices(choice_candidate: str, choice_ref: str, threshold: float = 0
     list_ref = choice_ref.split()
     if len(list_test) == 1:
         return True
-    score = 0
-    for i in range(len(list_test) - 1):
-        if not list_test[i] in list_ref:
-            score += lev.distance(list_test[i], list_ref[i])
+    # only the words not found in the reference are compared to the word at the same place
+    indexes_to_compare = [i for i in range(len(list_test) - 1) if not list_test[i] in list_ref]
+    score = sum(pairwise_distances(
+        [list_test[i] for i in indexes_to_compare],
+        [list_ref[i] for i in indexes_to_compare],
+        ))
     if score <= threshold * len(choice_ref):
         return True
     return False
 
 
 def __find_other_choices(
-    sentence_choice: str,
+    sentence_choice_flat: str,
     last_choice: str,
-    guideline_separators: dict,
+    separator_spans: List[List[Tuple[int]]],
     replacing_symbol: str = "§",
     compare_choices_threshold: float = 0.5
     ):
@@ -160,13 +160,10 @@ def __find_other_choices(
     Returns the choices in the sentence containing the choices knowing the last choice
 
     Parameters:
-        sentence_choice (str): The sentence containing the choices
+        sentence_choice_flat (str): The flattened sentence containing the choices (white spaces doubled)
         last_choice (str): The last choice in the sentence (from left to right)
-        guideline_separators (dict): The dictionary containing as keys the possible regex patterns matching a
-        choice separator in the guideline (ordered from highest to lowest priority) and as values a list of all
-        the regex patterns beginning with the key regex and representing a case where the key regex does not match
-        a choice separator.
-        (ex: {"\\sou\\s": "\\sou\\sbien"} means " ou " is considered as a separator only if not followed by "bien")
+        separator_spans (List[List[Tuple[int]]]): The spans of the choice separators found in the flattened
+        sentence for each separator, see SeparatorScanner
         replacing_symbol (str) (default: "§"):  A string to specify the symbol replacing all separators spoted
         in guideline
         compare_choices_threshold (float) (default: 0.5): A float between 0 and 1 to tune the output of the
@@ -203,43 +200,26 @@ def __find_other_choices(
     def __to_explore_list(sentence_choice_flat: str, all_separator_spans: List[Tuple[int]]):
         """Returns the list of choice candidates by splitting the sentence given on the
         identified choice separators"""
-        sentence_choice_to_split = ""
+        pieces = []
         index_start = 0
         for separator_span in all_separator_spans:
-            sentence_choice_to_split += re.sub(
-                r"\s{2}",
-                " ",
-                sentence_choice_flat[index_start:separator_span[0]] + replacing_symbol
+            pieces.append(
+                DOUBLE_SPACE_PATTERN.sub(" ", sentence_choice_flat[index_start:separator_span[0]] + replacing_symbol)
                 )
             index_start = separator_span[1]
-        to_explore = sentence_choice_to_split.split(replacing_symbol)[:-1]
+        to_explore = "".join(pieces).split(replacing_symbol)[:-1]
         return to_explore
 
-    def __find_all_separator_spans(sentence_choice_flat: str, guideline_separators: dict):
+    def __find_all_separator_spans(separator_spans: List[List[Tuple[int]]]):
         """Returns a list containg the spans (re.Match.span()) of all the choice separators"""
-        all_separator_spans = []
-        for separator_regex, separator_exceptions_list in guideline_separators.items():
-        # for each separator pattern
-            flattened_separator_regex = flatten_regex(separator_regex)
-            flattened_exceptions_regex = [flatten_regex(exception) for exception in separator_exceptions_list]
-            exceptions_pattern = re.compile("|".join(flattened_exceptions_regex))
-            match_separator_list = [match for match in re.finditer(flattened_separator_regex, sentence_choice_flat)]
-            separator_span_list = []
-            for match_separator in match_separator_list:
-                start, end= match_separator.span()
-                if not exceptions_pattern.pattern or not exceptions_pattern.match(sentence_choice_flat[start:]):
-                    # add as separator of choices only if is not part of an associated exception pattern
-                    separator_span_list.append((start, end))
-            all_separator_spans.extend(separator_span_list)
+        all_separator_spans = [span for separator_span_list in separator_spans for span in separator_span_list]
         all_separator_spans.sort()
         return all_separator_spans
 
 
     choices = [last_choice]
     indicator = __set_indicator(last_choice)
-    sentence_choice_flat = re.sub(r"\s", " " * 2, sentence_choice) #allows to find two occurences of patterns following
-    # each other. (ex: " ou ou " --> "  ou  ou  ")
-    all_separator_spans = __find_all_separator_spans(sentence_choice_flat, guideline_separators)
+    all_separator_spans = __find_all_separator_spans(separator_spans)
     to_explore = __to_explore_list(sentence_choice_flat, all_separator_spans)
     to_explore.reverse()
     for candidate in to_explore:
@@ -268,7 +248,7 @@ def __has_choices(sentence_choice: str, choices: List[str], threshold: float = 0
     if len(choices) == 1:
         return False
     guideline_test = ", ".join(choices)
-    if lev.distance(sentence_choice, guideline_test) <= threshold * len(sentence_choice):
+    if is_within_distance(sentence_choice, guideline_test, threshold * len(sentence_choice)):
         return False
     return True
 
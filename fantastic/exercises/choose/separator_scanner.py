@@ -0,0 +1,136 @@
+from functools import lru_cache
+from typing import List, Optional, Tuple
+import re
+from fantastic.exercises.utils import flatten_regex
+
+# Patterns which do not behave the same when matched at a position of a string and at the start of its
+# slice (anchors, word boundaries, lookbehinds): the exceptions using them are matched on the slice
+SLICE_DEPENDENT_REGEX = re.compile(r"\^|\\A|\\b|\\B|\(\?<[=!]")
+
+
+class SeparatorScanner:
+    """
+    Compiled scanner of the choice separators of a guideline (GUIDELINE_SEPARATORS in data.cfg),
+    finding the spans of every separator and of their exceptions in one pass over the text
+    instead of one pass per separator and per exception.
+
+    The separators are expected to be non empty patterns.
+    """
+
+    def __init__(self, guideline_separators: Tuple[Tuple[str, Tuple[str]]]) -> None:
+        self.separators: List[str] = [separator_regex for separator_regex, _ in guideline_separators]
+        self.flattened_separators: List[str] = [flatten_regex(separator) for separator in self.separators]
+        # exceptions checked in the scanning pattern (lookahead) or on the slice of the text after the separator
+        self.slice_exceptions: List[Optional[re.Pattern]] = []
+        lookahead_exceptions: List[Optional[str]] = []
+        for _, separator_exceptions_list in guideline_separators:
+            exceptions_regex = "|".join(flatten_regex(exception) for exception in separator_exceptions_list)
+            if not exceptions_regex:
+                lookahead_exceptions.append(None)
+                self.slice_exceptions.append(None)
+            elif SLICE_DEPENDENT_REGEX.search(exceptions_regex):
+                lookahead_exceptions.append(None)
+                self.slice_exceptions.append(re.compile(exceptions_regex))
+            else:
+                lookahead_exceptions.append(exceptions_regex)
+                self.slice_exceptions.append(None)
+        # the scanning pattern stops only where a separator starts and captures each separator
+        # (and each exception) starting there
+        scanning_regex = "(?=" + "|".join(f"(?:{separator})" for separator in self.flattened_separators) + ")"
+        for i, separator in enumerate(self.flattened_separators):
+            scanning_regex += f"(?:(?=(?P<separator{i}>{separator}))|)"
+        for i, exception in enumerate(lookahead_exceptions):
+            if exception is not None:
+                scanning_regex += f"(?:(?=(?P<exception{i}>{exception}))|)"
+        self.scanning_pattern = re.compile(scanning_regex) if self.separators else None
+        # (index of the separator, number of its group, number of the group of its exceptions or 0, slice exceptions)
+        self.__groups = []
+        if self.scanning_pattern is not None:
+            group_index = self.scanning_pattern.groupindex
+            self.__groups = [
+                (
+                    i,
+                    group_index[f"separator{i}"],
+                    group_index.get(f"exception{i}", 0),
+                    self.slice_exceptions[i],
+                )
+                for i in range(len(self.separators))
+            ]
+        # patterns of the first k separators used to find the sentence holding the choices
+        self.__prefix_patterns = {}
+
+    def separator_spans(self, text_flat: str) -> List[List[Tuple[int, int]]]:
+        """
+        Returns for each separator the spans of its matches in the flattened text which are not
+        the start of one of its exceptions (matches of a separator do not overlap each other,
+        as with re.finditer)
+
+        Parameters:
+            text_flat (str): The flattened text (each white space doubled, see flatten_regex)
+        Returns:
+            separator_spans (List[List[Tuple[int, int]]]): The spans of each separator (in the order of the separators)
+        """
+        separator_spans = [[] for _ in self.separators]
+        if self.scanning_pattern is None:
+            return separator_spans
+        last_ends = [0] * len(self.separators)
+        for match in self.scanning_pattern.finditer(text_flat):
+            spans = match.regs  # spans of all the groups, (-1, -1) if not matched
+            for i, separator_group, exception_group, slice_exception in self.__groups:
+                start, end = spans[separator_group]
+                if start < last_ends[i] or start < 0:
+                    continue
+                last_ends[i] = end
+                if exception_group and spans[exception_group][0] >= 0:
+                    continue
+                if slice_exception is not None and slice_exception.match(text_flat[start:]):
+                    continue
+                separator_spans[i].append((start, end))
+        return separator_spans
+
+    def __prefix_pattern(self, number_separators: int) -> re.Pattern:
+        """Returns the pattern matching at a position the first of the number_separators first separators found"""
+        if number_separators not in self.__prefix_patterns:
+            self.__prefix_patterns[number_separators] = re.compile(
+                "|".join(f"(?=(?P<separator{i}>{self.separators[i]}))" for i in range(number_separators))
+            )
+        return self.__prefix_patterns[number_separators]
+
+    def best_separator_index(self, sentence: str, number_separators: int) -> Optional[int]:
+        """
+        Returns the index of the separator with the highest priority among the number_separators
+        first ones found in the sentence, None if none of them is found
+        """
+        if number_separators <= 0:
+            return None
+        best_index = None
+        for match in self.__prefix_pattern(number_separators).finditer(sentence):
+            index = int(match.lastgroup[len("separator"):])
+            if best_index is None or index < best_index:
+                best_index = index
+                if not best_index:  # can't find better separator
+                    break
+        return best_index
+
+
+@lru_cache(maxsize=None)
+def __cached_separator_scanner(guideline_separators: Tuple[Tuple[str, Tuple[str]]]) -> SeparatorScanner:
+    """Returns the scanner of the given separators, built only once per set of separators"""
+    return SeparatorScanner(guideline_separators)
+
+
+def get_separator_scanner(guideline_separators: dict) -> SeparatorScanner:
+    """
+    Returns the compiled scanner of the separators of guideline_separators
+
+    Parameters:
+        guideline_separators (dict): The dictionary containing as keys the possible regex patterns matching a
+        choice separator in the guideline (ordered from highest to lowest priority) and as values a list of all
+        the regex patterns beginning with the key regex and representing a case where the key regex does not match
+        a choice separator.
+    Returns:
+        scanner (SeparatorScanner): The scanner of the separators
+    """
+    return __cached_separator_scanner(
+        tuple((separator_regex, tuple(exceptions)) for separator_regex, exceptions in guideline_separators.items())
+    )
@@ -0,0 +1,61 @@
+from functools import lru_cache
+from math import floor
+from typing import List, Sequence
+import Levenshtein as lev
+
+try:
+    from rapidfuzz.distance import Levenshtein as rapidfuzz_levenshtein
+except ImportError:  # rapidfuzz is optional, python-Levenshtein is used instead
+    rapidfuzz_levenshtein = None
+
+# WORD_PAIRS_CACHE_SIZE: The number of word pairs whose distance is kept (the same pairs of choices,
+# ex: "a / à", "et / est" or "ou / où", come back in most of the exercises of a textbook)
+WORD_PAIRS_CACHE_SIZE = 2 ** 16
+# TEXT_PAIRS_CACHE_SIZE: The number of pairs of sentences whose bounded distance is kept
+TEXT_PAIRS_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=WORD_PAIRS_CACHE_SIZE)
+def word_distance(word_a: str, word_b: str) -> int:
+    """
+    Returns the Levenshtein distance between two words (cached, the cache can be shared by the threads of the
+    correction application and of the adaptation service)
+    """
+    if rapidfuzz_levenshtein is not None:
+        return rapidfuzz_levenshtein.distance(word_a, word_b)
+    return lev.distance(word_a, word_b)
+
+
+def pairwise_distances(words: Sequence[str], references: Sequence[str]) -> List[int]:
+    """
+    Returns the Levenshtein distances between words[i] and references[i], the pairs already met
+    being read from the cache of word_distance (compare_choices only compares a few words per guideline:
+    one call per pair costs less than a vectorized call)
+
+    Parameters:
+        words (Sequence[str]): The words to compare
+        references (Sequence[str]): The words to compare to (same length as words)
+    Returns:
+        distances (List[int]): The distance of each pair
+    """
+    return [word_distance(word, reference) for word, reference in zip(words, references)]
+
+
+@lru_cache(maxsize=TEXT_PAIRS_CACHE_SIZE)
+def is_within_distance(text_a: str, text_b: str, max_distance: float) -> bool:
+    """
+    Returns whether the Levenshtein distance between two texts is lower or equal to max_distance
+    (the computation stops as soon as the distance is known to be greater with rapidfuzz)
+    """
+    if max_distance < 0:
+        return False
+    if rapidfuzz_levenshtein is not None:
+        return rapidfuzz_levenshtein.distance(text_a, text_b, score_cutoff=floor(max_distance)) <= max_distance
+    return lev.distance(text_a, text_b) <= max_distance
+
+
+def clear_caches():
+    """Empties the caches of distances"""
+    word_distance.cache_clear()
+    is_within_distance.cache_clear()
+    return None
@@ -1,9 +1,23 @@
 from configparser import ConfigParser
+from functools import lru_cache
 import json
 import os
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, Template
 import fantastic.paths
-from fantastic.exercises.utils import find_all_sentences, find_in_dict
+from fantastic.corpus import load_exercise_json
+from fantastic.exercises.utils import find_all_sentences, find_in_dict, paginate_html
+from fantastic.precompress import configured_encodings, write_atomically, write_precompressed
+
+
+@lru_cache(maxsize=None)
+def jinja_environment(template_dir: str) -> Environment:
+    """Returns the jinja environment of the templates of the folder (created once, it keeps the compiled templates)"""
+    return Environment(loader = FileSystemLoader(template_dir))
+
+
+def get_template(template_name: str) -> Template:
+    """Returns the compiled jinja template of the name in fantastic.paths.TEMPLATE_DIR (ex: "select")"""
+    return jinja_environment(fantastic.paths.TEMPLATE_DIR).get_template(template_name + ".html")
 
 
 
@@ -14,6 +28,7 @@ class Exercise:
     """
     Class attributes:
         json_path (str): The path of the json of the exercise
+        exercise_id (str): The id of the exercise (the name of its json and html files)
         config (ConfigParser): An object containing the variables stored in a .cfg file
         (must always be data.cfg if all variables in it)
         template_name (str): The name of the template jinja to use to generate the html
@@ -32,6 +47,7 @@ class Exercise:
             lines_per_page: int = 3
         ) -> None:
         self.json_path = json_path
+        self.exercise_id = os.path.basename(json_path).split('.')[0]
         self.json = {}
         self.template_name = template_name
         self.output_folder_name = output_folder_name
@@ -39,25 +55,58 @@ class Exercise:
         self.html_output = ""
         self.lines_per_page = lines_per_page
         self.config = config
+        self.paginated = False  # whether the pages of the exercise text are computed in the html
+        self.output_manifest_entry = None  # the hash and sizes of the html written (with [precompress] enabled)
 
-    def load_json(self):
-        """loads the json of the exercise and stores it in the attribute json"""
-        with open(self.json_path, 'r', encoding='UTF-8') as json_file:
-            self.json = json.load(json_file)
+    def load_json(self, json_dict: dict = None):
+        """
+        loads the json of the exercise and stores it in the attribute json
+        (json_dict: the json already loaded from json_path, not read again),
+        from the packed corpus if it is used (see fantastic/corpus.py)
+        """
+        if json_dict is not None:
+            self.json = json_dict
+            return self
+        self.json = load_exercise_json(self.json_path, self.config)
         return self
 
     def create_template(self):
         """create the template to fill to generate the html in the output of the conversion"""
-        env = Environment(loader = FileSystemLoader(fantastic.paths.TEMPLATE_DIR)) # loading the jinja templates
-        self.html_template = env.get_template(self.template_name + ".html") # loading the specific html template
+        self.html_template = get_template(self.template_name) # the specific html template, compiled once
         return self
 
-    def write_template(self) -> None: # writing the template to the html and css files
-        """Stores the completed template in a html file in the output folder"""
-        filename = self.json_path.split(os.sep)[-1].split('.')[0]
-        with open(os.path.join(fantastic.paths.OUTPUT_DIR,\
-            self.output_folder_name, filename + ".html"), 'w', encoding='utf-8') as file:
-            file.write(self.html_output)
+    def paginate(self, exercise_text_html: str) -> str:
+        """
+        Returns the html of the exercise text split into pages of lines_per_page lines ([pagination] section
+        of data.cfg), or unchanged if it cannot be (front.js splits it when loading the page then)
+        """
+        self.paginated = False
+        if not json.loads(self.config.get("pagination", "server_side")):
+            return exercise_text_html
+        chars_per_line = json.loads(self.config.get("pagination", "chars_per_line"))
+        pages_html = paginate_html(exercise_text_html, self.lines_per_page, chars_per_line)
+        if pages_html is None:
+            return exercise_text_html
+        self.paginated = True
+        return pages_html
+
+    def write_template(self, writer=None) -> None: # writing the template to the html and css files
+        """
+        Stores the completed template in a html file in the output folder,
+        or through the writer if one is given (see fantastic/output_writer.py and fantastic/bundle.py),
+        with its precompressed variants if enabled in the [precompress] section of data.cfg
+        """
+        if writer is not None:
+            writer.add(self.exercise_id, self.output_folder_name, self.html_output)
+            return None
+        html_path = os.path.join(fantastic.paths.OUTPUT_DIR, self.output_folder_name, self.exercise_id + ".html")
+        # a new file replacing the previous one, never written in place (the copies and links of the output files
+        # made by the correction app keep their content)
+        data = self.html_output.encode("utf-8")
+        write_atomically(html_path, data)
+        encodings = configured_encodings(self.config)
+        if encodings:
+            self.output_manifest_entry = write_precompressed(html_path, data, encodings)
 
     def find_exercise(self):
         """Returns the whole exercise in a dict"""
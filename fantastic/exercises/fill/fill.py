@@ -74,7 +74,8 @@ class Fill(Exercise):
 
         self.html_output = self.html_template.render(
             ex_nb=self.json_path.split(os.sep)[-1].split(".")[0],
-            exercise_text="".join(exercise_text),
+            exercise_text=self.paginate("".join(exercise_text)),
+            paginated=self.paginated,
             additional_guideline=additional_guideline,
             guideline=guideline,
             lines_per_page=self.lines_per_page,
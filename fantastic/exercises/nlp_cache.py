@@ -0,0 +1,83 @@
+from functools import lru_cache
+from typing import List, Tuple
+import nltk
+from nltk.stem.snowball import FrenchStemmer
+from nltk.tokenize import NLTKWordTokenizer
+
+# STEM_CACHE_SIZE: The number of words whose stem is kept (the vocabulary of the guidelines is small)
+STEM_CACHE_SIZE = 2 ** 15
+# TOKENIZE_CACHE_SIZE: The number of texts whose tokens are kept (many guidelines are repeated)
+TOKENIZE_CACHE_SIZE = 2 ** 12
+
+# the stemmer and the tokenizers are loaded once for the whole process
+__stemmer = FrenchStemmer()
+__word_tokenizer = NLTKWordTokenizer()
+__spacy_tokens_reused = [0]
+
+
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def stem(word: str) -> str:
+    """Returns the french stem of the word (ex: "soulignez" --> "soulign")"""
+    return __stemmer.stem(word)
+
+
+@lru_cache(maxsize=None)
+def sentence_tokenizer(language: str = "french"):
+    """Returns the Punkt sentence tokenizer of the language (loaded once)"""
+    try:
+        from nltk.tokenize.punkt import PunktTokenizer  # nltk >= 3.8.2
+        return PunktTokenizer(language)
+    except ImportError:
+        return nltk.data.load(f"tokenizers/punkt/{language}.pickle")
+
+
+@lru_cache(maxsize=TOKENIZE_CACHE_SIZE)
+def __tokenize(text: str, language: str) -> Tuple[str]:
+    """Returns the tokens of the text (same tokens as nltk.word_tokenize)"""
+    return tuple(
+        token
+        for sentence in sentence_tokenizer(language).tokenize(text)
+        for token in __word_tokenizer.tokenize(sentence)
+    )
+
+
+def tokenize(text: str, language: str = "french", doc=None) -> List[str]:
+    """
+    Returns the words of the text, as nltk.word_tokenize(text, language) does, or the
+    tokens of the spaCy doc if one is given for the same text (no tokenization needed)
+
+    Parameters:
+        text (str): The text to tokenize
+        language (str) (default: "french"): The language of the Punkt model
+        doc (spacy.tokens.Doc) (default: None): The doc already produced by spaCy for the text
+    Returns:
+        tokens (List[str]): The tokens of the text
+    """
+    if doc is not None and doc.text == text:
+        __spacy_tokens_reused[0] += 1
+        return [token.text for token in doc]
+    return list(__tokenize(text, language))
+
+
+def cache_stats() -> dict:
+    """Returns the hits, misses, size and hit rate of the caches of stems and tokens"""
+    stats = {}
+    for name, cached_function in [("stem", stem), ("tokenize", __tokenize)]:
+        info = cached_function.cache_info()
+        calls = info.hits + info.misses
+        stats[name] = {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "hit_rate": round(info.hits / calls, 4) if calls else 0.0,
+        }
+    stats["spacy_tokens_reused"] = __spacy_tokens_reused[0]
+    return stats
+
+
+def clear_caches():
+    """Empties the caches of stems and tokens"""
+    stem.cache_clear()
+    __tokenize.cache_clear()
+    __spacy_tokens_reused[0] = 0
+    return None
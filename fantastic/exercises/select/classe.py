@@ -2,18 +2,18 @@ from configparser import ConfigParser
 import string
 import json
 from typing import Tuple
-from nltk.stem.snowball import FrenchStemmer
-from nltk import word_tokenize
 from fantastic.exercises.select.entities_groupe_mots import EntitiesGroupeMots
 from fantastic.exercises.select.entities_phrases import EntitiesPhrases
 from fantastic.exercises.select.entities_mots import EntitiesMots
+from fantastic.exercises.span_model import SpanList
 from fantastic.exercises.utils import (
     find_in_dict,
     splits_to_sentences,
     clean_entities_spaces,
-    split_word,
+    iter_split_words,
     entities_if_symbols,
 )
+from fantastic.exercises.select.guideline_rewriter import get_guideline_rewriter
 from fantastic.exercises.choose.explore_guideline import find_choices_in_guideline
 
 
@@ -42,39 +42,27 @@ class Classe(EntitiesMots, EntitiesPhrases, EntitiesGroupeMots):
         """Adapts the guideline adding the categories, the frames and the colors
         and replacing the verb with "colorie de la bonne couleur"."""
 
-        # removing all the useless phrases of the guideline
-        for useless_noun_group in self.useless_noun_groups:
-            guideline = guideline.replace(useless_noun_group, "")
-
-        adapted_guideline = guideline
-
-        color_id = 0
-        stemmer = FrenchStemmer()
-        guideline_list = word_tokenize(adapted_guideline, language="french")
-
-        for word in guideline_list:
+        rewriter = get_guideline_rewriter(
+            tuple(self.useless_noun_groups), "", tuple(self.stemmed_verbs_to_replace)
+        )  # built once for the configuration
 
-            # taking the radical of the word
-            stemmed_word = stemmer.stem(word)
+        # removing all the useless phrases of the guideline
+        adapted_guideline = rewriter.replace_phrases(guideline)
 
-            if stemmed_word in self.stemmed_verbs_to_replace:
-                # word is a verb that we replace with "colorie"
-                adapted_guideline = adapted_guideline.replace(word, self.verb_to_put)
-                color_id += 1
+        # words that are verbs that we replace with "colorie"
+        verbs = rewriter.find_verbs(adapted_guideline, self.guideline_doc())
+        adapted_guideline = rewriter.replace_words(adapted_guideline, verbs, [self.verb_to_put] * len(verbs))
 
         adapted_guideline_list = splits_to_sentences(adapted_guideline)
         adapted_guideline_list = clean_entities_spaces(adapted_guideline_list)
 
-        for sentence in adapted_guideline_list:
-
-            # capitalizing the sentences
-            # .capitalize lowers every letter except the first one, sometimes we don't want that
-            if len(sentence) > 1:
-                new_sentence = sentence[0].upper() + sentence[1:]
-            else:
-                new_sentence = sentence[0].upper()
-
-            adapted_guideline = adapted_guideline.replace(sentence, new_sentence)
+        # capitalizing the sentences
+        # .capitalize lowers every letter except the first one, sometimes we don't want that
+        capitalized_sentences = [
+            sentence[0].upper() + sentence[1:] if len(sentence) > 1 else sentence[0].upper()
+            for sentence in adapted_guideline_list
+        ]
+        adapted_guideline = rewriter.replace_words(adapted_guideline, adapted_guideline_list, capitalized_sentences)
 
         # adding the categories at the end of the guideline
         adapted_guideline = self.categories_added_guideline(adapted_guideline)
@@ -158,17 +146,17 @@ class Classe(EntitiesMots, EntitiesPhrases, EntitiesGroupeMots):
 
 
     def convert_to_html(
-        self, text: str, html_output: str, word_id_count: int, entity_id_count: int
-    ) -> Tuple[str, int, int]:
+        self, text: str, spans: SpanList, word_id_count: int, entity_id_count: int
+    ) -> Tuple[SpanList, int, int]:
         """Gets the list of selectable entities and converts it to html.
 
         Parameters:
-        - html_output: current value of the html of the exercice
+        - spans: current tokens of the html of the exercice
         - word_id_count: current value of the id of words
         - entity_id_count: current value of the id of entities
         Returns:
         new value of word_id_count and entity_id_count
-        html_output: html version of the text"""
+        spans: tokens of the html version of the text"""
 
         # searching for symbols in the "énoncé" and spliting on symbol
         self.symbol = self.symbols_in_exercice(text)
@@ -189,11 +177,11 @@ class Classe(EntitiesMots, EntitiesPhrases, EntitiesGroupeMots):
 
             # convertion to html
             (
-                html_output,
+                spans,
                 word_id_count,
                 entity_id_count,
             ) = self.text_to_html_coche_phrases(
-                entities_list, html_output, word_id_count, entity_id_count
+                entities_list, spans, word_id_count, entity_id_count
             )
 
         elif words_list == []:
@@ -203,9 +191,7 @@ class Classe(EntitiesMots, EntitiesPhrases, EntitiesGroupeMots):
             words_list = clean_entities_spaces(words_list)
 
             # separating the word from the punctuation and the accents
-            new_words_list = []
-            for word in words_list:
-                new_words_list += split_word(word, self.split_characters)
+            new_words_list = list(iter_split_words(words_list, self.split_characters))
 
             # unifying the numbers
             for i in range(len(words_list)):
@@ -226,8 +212,8 @@ class Classe(EntitiesMots, EntitiesPhrases, EntitiesGroupeMots):
             self.js_script_path = EntitiesMots.js_script_path
 
             # convertion to html
-            html_output, word_id_count, entity_id_count = self.text_to_html_coche_mots(
-                words_list, html_output, word_id_count, entity_id_count
+            spans, word_id_count, entity_id_count = self.text_to_html_coche_mots(
+                words_list, spans, word_id_count, entity_id_count
             )
 
         else:
@@ -239,8 +225,8 @@ class Classe(EntitiesMots, EntitiesPhrases, EntitiesGroupeMots):
             words_list = clean_entities_spaces(words_list)
 
             # convertion to html
-            html_output, word_id_count, entity_id_count = self.text_to_html_groupe_mots(
-                words_list, html_output, word_id_count, entity_id_count
+            spans, word_id_count, entity_id_count = self.text_to_html_groupe_mots(
+                words_list, spans, word_id_count, entity_id_count
             )
 
-        return html_output, word_id_count, entity_id_count
+        return spans, word_id_count, entity_id_count
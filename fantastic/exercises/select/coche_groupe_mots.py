@@ -2,6 +2,7 @@ from configparser import ConfigParser
 from typing import Tuple
 from fantastic.exercises.select.entities_groupe_mots import EntitiesGroupeMots
 from fantastic.exercises.select.entities_phrases import EntitiesPhrases
+from fantastic.exercises.span_model import SpanList
 from fantastic.exercises.utils import (
     splits_to_sentences,
     clean_entities_spaces,
@@ -21,17 +22,17 @@ class CocheGroupeMots(EntitiesGroupeMots, EntitiesPhrases):
 
 
     def convert_to_html(
-        self, text: str, html_output: str, word_id_count: int, entity_id_count: int
-    ) -> Tuple[str, int, int]:
+        self, text: str, spans: SpanList, word_id_count: int, entity_id_count: int
+    ) -> Tuple[SpanList, int, int]:
         """Gets the list of selectable entities and converts it to html.
 
         Parameters:
-        - html_output: current value of the html of the exercice
+        - spans: current tokens of the html of the exercice
         - word_id_count: current value of the id of words
         - entity_id_count: current value of the id of entities
         Returns:
         new value of word_id_count and entity_id_count
-        html_output: html version of the text"""
+        spans: tokens of the html version of the text"""
 
         # searching for symbols in the "énoncé" and spliting on symbol
         self.symbol = self.symbols_in_exercice(text)
@@ -50,11 +51,11 @@ class CocheGroupeMots(EntitiesGroupeMots, EntitiesPhrases):
 
             # convertion to html
             (
-                html_output,
+                spans,
                 word_id_count,
                 entity_id_count,
             ) = self.text_to_html_coche_phrases(
-                entities_list, html_output, word_id_count, entity_id_count
+                entities_list, spans, word_id_count, entity_id_count
             )
 
         else:
@@ -66,8 +67,8 @@ class CocheGroupeMots(EntitiesGroupeMots, EntitiesPhrases):
             self.js_script_path = EntitiesGroupeMots.js_script_path
 
             # convertion to html
-            html_output, word_id_count, entity_id_count = self.text_to_html_groupe_mots(
-                words_list, html_output, word_id_count, entity_id_count
+            spans, word_id_count, entity_id_count = self.text_to_html_groupe_mots(
+                words_list, spans, word_id_count, entity_id_count
             )
 
-        return html_output, word_id_count, entity_id_count
+        return spans, word_id_count, entity_id_count
@@ -3,6 +3,14 @@ from typing import Tuple
 import json
 from fantastic.exercises.select.entities_groupe_mots import EntitiesGroupeMots
 from fantastic.exercises.select.entities_phrases import EntitiesPhrases
+from fantastic.exercises.select.intrus_plurality import (
+    BOTH,
+    PLURAL,
+    SINGULAR,
+    guideline_words,
+    intrus_plurality,
+)
+from fantastic.exercises.span_model import SpanList
 from fantastic.exercises.utils import (
     splits_to_sentences,
     clean_entities_spaces,
@@ -14,6 +22,8 @@ class CocheIntrus(EntitiesGroupeMots, EntitiesPhrases):
     """Class to adapt CocheIntrus exercices"""
 
     output_folder_name: str = "coche_intrus"
+    # the guideline is replaced by a generic sentence: no nlp model is needed
+    needs_guideline_tagging: bool = False
 
     def __init__(self, path: str, config: ConfigParser) -> None:
         EntitiesGroupeMots.__init__(self, path, config)
@@ -33,37 +43,19 @@ class CocheIntrus(EntitiesGroupeMots, EntitiesPhrases):
         Returns:
         adapted_guideline: version of the guideline with the generic sentence"""
 
-        for i in range(len(self.list_of_guideline_tokens)):
-
-            if self.list_of_guideline_tokens[i]["word"] in ["intrus", "int"]:
-                # sometimes the POS tagger has bugs and "intrus" becomes "int ##rus"
-
-                if (
-                    self.list_of_guideline_tokens[i - 1]["word"]
-                    in self.specifiers_plural
-                ):
-                    # there are several "intrus"
-                    if i >= 3:
-                        if (
-                            self.list_of_guideline_tokens[i - 2]["word"] == "ou"
-                            and self.list_of_guideline_tokens[i - 3]["word"] == "le"
-                        ):
-                            self.generic_sentence = self.generic_sentence_both
-                        else:
-                            self.generic_sentence = self.generic_sentence_plural
-
-                elif (
-                    self.list_of_guideline_tokens[i - 1]["word"] in self.specifiers_both
-                ):
-                    # the plurality of "intrus" is not specified
-                    self.generic_sentence = self.generic_sentence_both
-
-                elif (
-                    self.list_of_guideline_tokens[i - 1]["word"]
-                    in self.specifiers_singular
-                ):
-                    # there is only one "intrus"
-                    self.generic_sentence = self.generic_sentence_singular
+        # the plurality of "intrus" is deduced from the words before it (no POS tagging needed)
+        plurality = intrus_plurality(
+            guideline_words(guideline),
+            self.specifiers_singular,
+            self.specifiers_plural,
+            self.specifiers_both,
+        )
+        if plurality:
+            self.generic_sentence = {
+                SINGULAR: self.generic_sentence_singular,
+                PLURAL: self.generic_sentence_plural,
+                BOTH: self.generic_sentence_both,
+            }[plurality]
 
         adapted_guideline = ""
         guideline_list = splits_to_sentences(guideline)
@@ -80,17 +72,17 @@ class CocheIntrus(EntitiesGroupeMots, EntitiesPhrases):
         return self.number_of_colors, self.displayed_colors_dict
 
     def convert_to_html(
-        self, text: str, html_output: str, word_id_count: int, entity_id_count: int
-    ) -> Tuple[str, int, int]:
+        self, text: str, spans: SpanList, word_id_count: int, entity_id_count: int
+    ) -> Tuple[SpanList, int, int]:
         """Gets the list of selectable entities and converts it to html.
 
         Parameters:
-        - html_output: current value of the html of the exercice
+        - spans: current tokens of the html of the exercice
         - word_id_count: current value of the id of words
         - entity_id_count: current value of the id of entities
         Returns:
         new value of word_id_count and entity_id_count
-        html_output: html version of the text"""
+        spans: tokens of the html version of the text"""
 
         # searching for symbols in the "énoncé" and spliting on symbol
         self.symbol = self.symbols_in_exercice(text)
@@ -109,11 +101,11 @@ class CocheIntrus(EntitiesGroupeMots, EntitiesPhrases):
 
             # convertion to html
             (
-                html_output,
+                spans,
                 word_id_count,
                 entity_id_count,
             ) = self.text_to_html_coche_phrases(
-                entities_list, html_output, word_id_count, entity_id_count
+                entities_list, spans, word_id_count, entity_id_count
             )
 
         else:
@@ -125,8 +117,8 @@ class CocheIntrus(EntitiesGroupeMots, EntitiesPhrases):
             self.js_script_path = EntitiesGroupeMots.js_script_path
 
             # convertion to html
-            html_output, word_id_count, entity_id_count = self.text_to_html_groupe_mots(
-                words_list, html_output, word_id_count, entity_id_count
+            spans, word_id_count, entity_id_count = self.text_to_html_groupe_mots(
+                words_list, spans, word_id_count, entity_id_count
             )
 
-        return html_output, word_id_count, entity_id_count
+        return spans, word_id_count, entity_id_count
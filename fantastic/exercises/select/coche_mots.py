@@ -3,9 +3,10 @@ import string
 from typing import Tuple
 from fantastic.exercises.select.entities_mots import EntitiesMots
 from fantastic.exercises.select.entities_groupe_mots import EntitiesGroupeMots
+from fantastic.exercises.span_model import SpanList
 from fantastic.exercises.utils import (
     clean_entities_spaces,
-    split_word,
+    iter_split_words,
     entities_if_symbols
 )
 
@@ -21,17 +22,17 @@ class CocheMots(EntitiesMots, EntitiesGroupeMots):
 
 
     def convert_to_html(
-        self, text: str, html_output: str, word_id_count: int, entity_id_count: int
-    ) -> Tuple[str, int, int]:
+        self, text: str, spans: SpanList, word_id_count: int, entity_id_count: int
+    ) -> Tuple[SpanList, int, int]:
         """Gets the list of selectable entities and converts it to html.
 
         Parameters:
-        - html_output: current value of the html of the exercice
+        - spans: current tokens of the html of the exercice
         - word_id_count: current value of the id of words
         - entity_id_count: current value of the id of entities
         Returns:
         new value of word_id_count and entity_id_count
-        html_output: html version of the text"""
+        spans: tokens of the html version of the text"""
 
         # searching for symbols in the "énoncé" and spliting on symbol
         self.symbol = self.symbols_in_exercice(text)
@@ -46,9 +47,7 @@ class CocheMots(EntitiesMots, EntitiesGroupeMots):
             self.js_script_path = EntitiesMots.js_script_path
 
             # separating the word from the punctuation and the accents
-            new_words_list = []
-            for word in words_list:
-                new_words_list += split_word(word, self.split_characters)
+            new_words_list = list(iter_split_words(words_list, self.split_characters))
 
             # unifying the numbers
             for i in range(len(new_words_list) - 1):
@@ -66,8 +65,8 @@ class CocheMots(EntitiesMots, EntitiesGroupeMots):
                 words_list.remove(words_list[1])
 
             # convertion to html
-            html_output, word_id_count, entity_id_count = self.text_to_html_coche_mots(
-                words_list, html_output, word_id_count, entity_id_count
+            spans, word_id_count, entity_id_count = self.text_to_html_coche_mots(
+                words_list, spans, word_id_count, entity_id_count
             )
 
         else:
@@ -79,8 +78,8 @@ class CocheMots(EntitiesMots, EntitiesGroupeMots):
             self.js_script_path = EntitiesGroupeMots.js_script_path
 
             # convertion to html
-            html_output, word_id_count, entity_id_count = self.text_to_html_groupe_mots(
-                words_list, html_output, word_id_count, entity_id_count
+            spans, word_id_count, entity_id_count = self.text_to_html_groupe_mots(
+                words_list, spans, word_id_count, entity_id_count
             )
 
-        return html_output, word_id_count, entity_id_count
+        return spans, word_id_count, entity_id_count
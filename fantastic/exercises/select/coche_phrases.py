@@ -1,6 +1,7 @@
 from configparser import ConfigParser
 from typing import Tuple
 from fantastic.exercises.select.entities_phrases import EntitiesPhrases
+from fantastic.exercises.span_model import SpanList
 from fantastic.exercises.utils import (
     splits_to_sentences,
     clean_entities_spaces,
@@ -17,17 +18,17 @@ class CochePhrases(EntitiesPhrases):
 
 
     def convert_to_html(
-        self, text: str, html_output: str, word_id_count: int, entity_id_count: int
-    ) -> Tuple[str, int, int]:
+        self, text: str, spans: SpanList, word_id_count: int, entity_id_count: int
+    ) -> Tuple[SpanList, int, int]:
         """Gets the list of selectable entities and converts it to html.
 
         Parameters:
-        - html_output: current value of the html of the exercice
+        - spans: current tokens of the html of the exercice
         - word_id_count: current value of the id of words
         - entity_id_count: current value of the id of entities
         Returns:
         new value of word_id_count and entity_id_count
-        html_output: html version of the text"""
+        spans: tokens of the html version of the text"""
 
         # storing the symbol, if there is one, to be able to clean the sentences later
         self.symbol = self.symbols_in_exercice(text)
@@ -42,8 +43,8 @@ class CochePhrases(EntitiesPhrases):
         self.js_script_path = EntitiesPhrases.js_script_path
 
         # convertion to html
-        html_output, word_id_count, entity_id_count = self.text_to_html_coche_phrases(
-            entities_list, html_output, word_id_count, entity_id_count
+        spans, word_id_count, entity_id_count = self.text_to_html_coche_phrases(
+            entities_list, spans, word_id_count, entity_id_count
         )
 
-        return html_output, word_id_count, entity_id_count
+        return spans, word_id_count, entity_id_count
@@ -2,7 +2,15 @@ from configparser import ConfigParser
 import re
 from typing import Tuple
 from fantastic.exercises.select.select_class import Select
-from fantastic.exercises.utils import replace_starting_from_the_end
+from fantastic.exercises.span_model import (
+    SpanList,
+    entity_end,
+    entity_start,
+    space,
+    word as word_token,
+    word_end,
+    word_start,
+)
 
 
 class EntitiesGroupeMots(Select):
@@ -14,26 +22,26 @@ class EntitiesGroupeMots(Select):
     def text_to_html_groupe_mots(
         self,
         entities_list: list,
-        html_output: str,
+        spans: SpanList,
         word_id_count: int,
         entity_id_count: int,
-    ) -> Tuple[str, int, int]:
+    ) -> Tuple[SpanList, int, int]:
         """Parameters:
         - entities_list: list of groups of words
-        - html_output: current value of the html version of the "énoncé"
+        - spans: current tokens of the html version of the "énoncé"
         - word_id_count: current value of word id
         - entity_id_count: current value of entity id
 
         Returns:
         new value of word_id_count and entity_id_count
-        html_output: html version of the text.
+        spans: tokens of the html version of the text.
         -> each word is inside a span with class word, each space in a span with a class space
         -> a word and a space are inside a class with an id to color words.
         -> selectable group is in a span with class 'framed_entities',
                 a color number and an id that are used in the js script to change the color of the background"""
 
         for entity in entities_list:
-            html_output_temp = ""
+            entity_spans = SpanList()
 
             words_list = entity.split(" ")
 
@@ -45,44 +53,50 @@ class EntitiesGroupeMots(Select):
 
                 if re.search(r"\w\.$", word):
                     # we don't want the number of the sentence to be selectable
-                    html_output_temp += (
-                        f"<span id='word{word_id_count}'> <span class='word'>"
-                        + word
-                        + "</span> <span class='space'> </span> </span>"
-                    )
+                    entity_spans.append(word_start(word_id_count))
+                    entity_spans.append(word_token(word))
+                    entity_spans.append(space())
+                    entity_spans.append(word_end())
 
                 elif len(words_list) == 1:
                     # the "group of word" to select is actually a word
                     # so we put the class framed_entities on the word
-                    html_output_temp += (
-                        f"<span class='framed_entities' color_number = 0"
-                        f" id = 'entity{entity_id_count}'> <span class='word' id='word{word_id_count}'>"
-                        + word
-                        + "</span> </span> <span class='space'> </span>"
+                    entity_spans.append(
+                        entity_start(
+                            f"<span class='framed_entities' color_number = 0 id = 'entity{entity_id_count}'> ",
+                            f"entity{entity_id_count}",
+                            ("framed_entities",),
+                        )
                     )
+                    entity_spans.append(word_token(word, attributes=f" id='word{word_id_count}'", id=f"word{word_id_count}"))
+                    entity_spans.append(entity_end())
+                    entity_spans.append(space())
                     entity_id_count += 1
 
                 else:
-                    html_output_temp += (
-                        f"<span id='word{word_id_count}'> <span class='word'>"
-                        + word
-                        + "</span> <span class='space'> </span> </span>"
-                    )
+                    entity_spans.append(word_start(word_id_count))
+                    entity_spans.append(word_token(word))
+                    entity_spans.append(space())
+                    entity_spans.append(word_end())
                 word_id_count += 1
 
             if len(words_list) > 1:
-                # removing the last character of the html output temp if it is a space
-                html_output_temp_cleaned = replace_starting_from_the_end(
-                    html_output_temp, "<span class='space'> </span>", "", 1
-                )
+                # removing the last space of the group of words
+                entity_spans.remove_last_space()
 
                 # adding a span with class 'framed_entities' around the bunch of words that are selectables
-                html_output_temp = (
-                    f"<span color_number = 0 class = 'framed_entities' id = 'entity{entity_id_count}'>"
-                    + html_output_temp_cleaned
-                    + "</span> <span class='space'> </span>"
+                spans.append(
+                    entity_start(
+                        f"<span color_number = 0 class = 'framed_entities' id = 'entity{entity_id_count}'>",
+                        f"entity{entity_id_count}",
+                        ("framed_entities",),
+                    )
                 )
+                spans.extend(entity_spans)
+                spans.append(entity_end())
+                spans.append(space())
                 entity_id_count += 1
 
-            html_output += html_output_temp
-        return html_output, word_id_count, entity_id_count
+            else:
+                spans.extend(entity_spans)
+        return spans, word_id_count, entity_id_count
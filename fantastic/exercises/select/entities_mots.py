@@ -3,7 +3,7 @@ import json
 import re
 from typing import Tuple
 from fantastic.exercises.select.select_class import Select
-from fantastic.exercises.utils import replace_starting_from_the_end
+from fantastic.exercises.span_model import SpanList, space, word as word_token, word_end, word_start
 
 
 class EntitiesMots(Select):
@@ -18,19 +18,19 @@ class EntitiesMots(Select):
     def text_to_html_coche_mots(
         self,
         entities_list: list,
-        html_output: str,
+        spans: SpanList,
         word_id_count: int,
         entity_id_count: int,
-    ) -> Tuple[str, int, int]:
+    ) -> Tuple[SpanList, int, int]:
         """Parameters:
         - entities_list: list of words, punctuation, accents...
-        - html_output: current value of the html version of the "énoncé"
+        - spans: current tokens of the html version of the "énoncé"
         - word_id_count: current value of word id
         - entity_id_count: current value of entity id
 
         Returns:
         new value of word_id_count and entity_id_count
-        html_output: html version of the text.
+        spans: tokens of the html version of the text.
         -> each word is inside a span with class word and class entities, a color number and an id
         -> each space in a span with a class space
         -> a word and a space are inside a class with an id to color words."""
@@ -38,42 +38,43 @@ class EntitiesMots(Select):
         for word in entities_list:
 
             if word in self.remove_space_before:
-                if html_output.split("<span class='space'> </span>")[-1] == " </span>":
+                if spans.ends_with_space_then(" </span>"):
                     # checking if the last character was a space
-                    html_output = replace_starting_from_the_end(
-                        html_output, "<span class='space'> </span>", "", 1
-                    ) # we remove it
+                    spans.remove_last_space() # we remove it
 
             if re.search(r"\w\.$", word):
                 # we don't want the number of the sentence to be selectable
-                html_output_temp = (
-                    f"<span id='word{word_id_count}'> <span class='word'>"
-                    + word
-                    + "</span> <span class='space'> </span> </span>"
-                )
+                spans.append(word_start(word_id_count))
+                spans.append(word_token(word))
+                spans.append(space())
+                spans.append(word_end())
                 word_id_count += 1
 
             elif word in self.remove_space_after:
                 # adding the html version of the word to the html but no span with class "space" after
-                html_output_temp = (
-                    f"<span id='word{word_id_count}'> <span class='word entities' color_number = 0"
-                    f" id = 'entity{entity_id_count}'>"
-                    + word
-                    + "</span> </span>"
-                )
+                spans.append(word_start(word_id_count))
+                spans.append(self.__entity_word(word, entity_id_count, separator=""))
+                spans.append(word_end())
                 entity_id_count += 1
                 word_id_count += 1
 
             else:
-                html_output_temp = (
-                    f"<span id='word{word_id_count}'> <span class='word entities' color_number = 0"
-                    f" id = 'entity{entity_id_count}'>"
-                    + word
-                    + "</span> <span class='space'> </span> </span>"
-                )
+                spans.append(word_start(word_id_count))
+                spans.append(self.__entity_word(word, entity_id_count))
+                spans.append(space())
+                spans.append(word_end())
                 entity_id_count += 1
                 word_id_count += 1
 
-            html_output += html_output_temp
+        return spans, word_id_count, entity_id_count
 
-        return html_output, word_id_count, entity_id_count
+    @staticmethod
+    def __entity_word(word: str, entity_id_count: int, separator: str = " "):
+        """Returns the token of a selectable word"""
+        return word_token(
+            word,
+            ("word", "entities"),
+            f" color_number = 0 id = 'entity{entity_id_count}'",
+            f"entity{entity_id_count}",
+            separator,
+        )
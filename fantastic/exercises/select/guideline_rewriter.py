@@ -0,0 +1,48 @@
+from functools import lru_cache
+from typing import List, Tuple
+from fantastic.exercises.automaton import MultiReplacer
+from fantastic.exercises.nlp_cache import stem, tokenize
+
+
+class GuidelineRewriter:
+    """
+    Rewrites the guidelines of the Select exercises: removes or replaces the useless phrases
+    (ex: "Recopie les phrases et") in one scan of the guideline, with exactly the result of the successive
+    str.replace calls (see MultiReplacer), and replaces the verbs of the instruction (ex: "Souligne")
+
+    Class attributes:
+        phrases (Tuple[str]): The useless phrases, by decreasing priority
+        phrases_replacement (str): The string replacing the phrases ("" to remove them)
+        stemmed_verbs (Tuple[str]): The stems of the verbs to replace (ex: "soulign")
+    """
+
+    def __init__(self, phrases: Tuple[str], phrases_replacement: str, stemmed_verbs: Tuple[str]) -> None:
+        self.phrases = phrases
+        self.phrases_replacement = phrases_replacement
+        self.stemmed_verbs = set(stemmed_verbs)
+        self.__phrases_replacer = MultiReplacer([(phrase, phrases_replacement) for phrase in phrases])
+
+    def replace_phrases(self, guideline: str) -> str:
+        """Returns the guideline after replacing all the useless phrases"""
+        return self.__phrases_replacer.replace(guideline)
+
+    def find_verbs(self, guideline: str, doc=None) -> List[str]:
+        """
+        Returns the words of the guideline whose stem is one of the verbs to replace (in order, repeated
+        ones included), using the tokens of the spaCy doc of the guideline if given (see nlp_cache.tokenize)
+        """
+        return [word for word in tokenize(guideline, "french", doc) if stem(word) in self.stemmed_verbs]
+
+    @staticmethod
+    def replace_words(guideline: str, words: List[str], replacements: List[str]) -> str:
+        """Returns the guideline after replacing in order each word by the replacement at the same index"""
+        # a few words per guideline, which change with it: str.replace is faster than building an automaton
+        for word, replacement in zip(words, replacements):
+            guideline = guideline.replace(word, replacement)
+        return guideline
+
+
+@lru_cache(maxsize=None)
+def get_guideline_rewriter(phrases: Tuple[str], phrases_replacement: str, stemmed_verbs: Tuple[str]) -> GuidelineRewriter:
+    """Returns the rewriter of the given configuration (built once per configuration)"""
+    return GuidelineRewriter(phrases, phrases_replacement, stemmed_verbs)
@@ -0,0 +1,52 @@
+from typing import List, Optional
+import re
+
+# WORD_PATTERN: The words of a guideline, without the apostrophes of the elisions (ex: "l'intrus" -> "l", "intrus")
+WORD_PATTERN = re.compile(r"\w+")
+# INTRUS_WORDS: The words designating the "intrus" (the POS tagger used to split "intrus" into "int ##rus")
+INTRUS_WORDS = ["intrus", "int"]
+
+SINGULAR = "singular"
+PLURAL = "plural"
+BOTH = "both"
+
+
+def guideline_words(guideline: str) -> List[str]:
+    """Returns the words of the guideline (ex: "Cache l'intrus." -> ["Cache", "l", "intrus"])"""
+    return WORD_PATTERN.findall(guideline)
+
+
+def intrus_plurality(
+    words: List[str],
+    specifiers_singular: List[str],
+    specifiers_plural: List[str],
+    specifiers_both: List[str],
+) -> Optional[str]:
+    """
+    Returns whether the guideline asks for one "intrus" (SINGULAR), several (PLURAL) or does not say (BOTH),
+    from the determiners before the last "intrus" whose plurality is known, None if there is none
+
+    Parameters:
+        words (List[str]): The words of the guideline (see guideline_words)
+        specifiers_singular (List[str]): The determiners of one "intrus" (ex: "l")
+        specifiers_plural (List[str]): The determiners of several "intrus" (ex: "les")
+        specifiers_both (List[str]): The words before "intrus" which do not specify the plurality (ex: "sans")
+    Returns:
+        plurality (Optional[str]): SINGULAR, PLURAL, BOTH or None
+    """
+    plurality = None
+    for i, word in enumerate(words):
+        if word not in INTRUS_WORDS:
+            continue
+        # words[i - 1] is the last word for an "intrus" at the start, as with the tokens of the tagger
+        if words[i - 1] in specifiers_plural:
+            # there are several "intrus", or maybe only one with "le ou les intrus"
+            if i >= 3:
+                plurality = BOTH if words[i - 2] == "ou" and words[i - 3] == "le" else PLURAL
+        elif words[i - 1] in specifiers_both:
+            # the plurality of "intrus" is not specified
+            plurality = BOTH
+        elif words[i - 1] in specifiers_singular:
+            # there is only one "intrus"
+            plurality = SINGULAR
+    return plurality
@@ -4,21 +4,24 @@ from typing import Tuple
 from configparser import ConfigParser
 from spacy.lang.fr import French
 from transformers.pipelines.token_classification import TokenClassificationPipeline
-from nltk.stem.snowball import FrenchStemmer
-from nltk import word_tokenize
 from fantastic.exercises.exercise import Exercise
+from fantastic.exercises.select.guideline_rewriter import get_guideline_rewriter
 from fantastic.exercises.utils import (
     text_to_html,
     find_symbols,
     splits_to_sentences,
     index_words,
     clean_entities_spaces,
-    replace_starting_from_the_end,
+    spacy_to_gilf_tokens,
 )
+from fantastic.exercises.span_model import SpanList, block_end, block_start
+from fantastic.profiling import profiler
 
 class Select(Exercise):
 
     template_name = "select"
+    # whether the guideline is tagged by the nlp models in adapt (the POS tags are not used by every type)
+    needs_guideline_tagging: bool = True
 
     def __init__(self, json_path: str, config: ConfigParser) -> None:
 
@@ -29,6 +32,7 @@ class Select(Exercise):
         self.displayed_colors_dict = {}
         self.list_of_guideline_tokens = []
         self.list_of_guideline_tokens_spacy = []
+        self.exercise_text_spans = SpanList()  # tokens of the html of the exercise text
         self.symbol = ""
         self.categories_in_guideline = []
         self.displayed_colors_dict_select = json.loads(self.config.get("select", "displayed_colors_dict"))
@@ -40,12 +44,14 @@ class Select(Exercise):
         self.useless_verb_groups_replacement = self.config.get("select", "useless_verb_groups_replacement").strip('"')
         self.punctuation = self.config.get("select", "punctuation").strip('"')
         self.non_symbols_chars = json.loads(self.config.get("select", "non_symbols_chars"))
+        self.reuse_spacy_tokens = json.loads(self.config.get("select", "reuse_spacy_tokens"))
+        self.fast_tagging = json.loads(self.config.get("select", "fast_tagging"))
 
 
     def adapt(self, nlp_token_class: TokenClassificationPipeline, nlp: French) -> None:
         """Principal function
         1. gets the data from the json file
-        2. tokenizes the guideline with two different nlp models
+        2. tokenizes the guideline with two different nlp models (only spaCy in fast tagging mode)
         3. determines the number of colors and the colors to display
         4. adapts the guidelines
         5. converts to html the guideline, additional guideline and exercise_text
@@ -61,8 +67,15 @@ class Select(Exercise):
         sentences = self.find_sentences()  # list of sentences from exercise_text
 
         # tokenizing guideline
-        self.list_of_guideline_tokens = nlp_token_class(guideline)
-        self.list_of_guideline_tokens_spacy = nlp(guideline)
+        if self.needs_guideline_tagging:
+            with profiler.stage("select.nlp_spacy"):
+                self.list_of_guideline_tokens_spacy = nlp(guideline)
+            with profiler.stage("select.nlp_token_class"):
+                if self.fast_tagging:
+                    # the tags of the hugging face model are deduced from the spaCy doc (no transformer pass)
+                    self.list_of_guideline_tokens = spacy_to_gilf_tokens(self.list_of_guideline_tokens_spacy)
+                else:
+                    self.list_of_guideline_tokens = nlp_token_class(guideline)
 
         # determining nb of colors and a dict of colors to display
         self.number_of_colors, self.displayed_colors_dict = self.colors_to_display()
@@ -72,7 +85,8 @@ class Select(Exercise):
         self.categories_in_guideline = self.get_categories_in_guideline()
 
         # adapting guideline
-        guideline = self.adapt_guideline(guideline)
+        with profiler.stage("select.adapt_guideline"):
+            guideline = self.adapt_guideline(guideline)
 
         if self.categories_in_guideline:
             # it means that we need to color and frame some words in the guideline
@@ -93,11 +107,12 @@ class Select(Exercise):
             if additional_guideline != ""
             else ""
         )
-        exercise_text_html = (
-            self.__text_to_html_select(sentences)
-            if sentences and isinstance(sentences[0], str)
-            else ""
-        )
+        with profiler.stage("select.exercise_text_html"):
+            exercise_text_html = (
+                self.__text_to_html_select(sentences)
+                if sentences and isinstance(sentences[0], str)
+                else ""
+            )
 
         # getting the html of the script tag
         script_js = self.__get_js_script()
@@ -107,7 +122,8 @@ class Select(Exercise):
             exercise_number=self.json_path.split(os.sep)[-1].split(".")[0],
             guideline=guideline_html,
             additional_guideline=additional_guideline_html,
-            exercise_text_html=exercise_text_html,
+            exercise_text_html=self.paginate(exercise_text_html),
+            paginated=self.paginated,
             script_js=script_js,
             lines_per_page=self.lines_per_page,
         )
@@ -134,55 +150,47 @@ class Select(Exercise):
         Returns: the new formulation of the guideline
         """
 
-        # replacing the "recopie chaque phrase et" by "dans chaque phrase, "
-        for useless_verb_group in self.useless_verb_groups:
-            guideline = guideline.replace(
-                useless_verb_group, self.useless_verb_groups_replacement
-            )
-
-        adapted_guideline = guideline
-        color_id = 0
-        stemmer = FrenchStemmer()
-        guideline_list = word_tokenize(adapted_guideline, language="french")
-
-        for word in guideline_list:
-
-            # we take the radical of the word
-            stemmed_word = stemmer.stem(word)
-
-            if stemmed_word in self.stemmed_verbs_guideline:
-                # the word is a verb that needs to be replaced with "colorie"
-
-                if self.displayed_colors_dict == self.displayed_colors_dict_select:
-                    # there is no color in the guideline
-                    adapted_guideline = adapted_guideline.replace(
-                        word,
-                        self.verb_if_no_color_in_guideline
-                        + str(self.displayed_colors_dict[str(color_id)]),
-                    )
+        rewriter = get_guideline_rewriter(
+            tuple(self.useless_verb_groups),
+            self.useless_verb_groups_replacement,
+            tuple(self.stemmed_verbs_guideline),
+        )  # built once for the configuration
 
-                else:
-                    # there are colors in guideline
-                    adapted_guideline = adapted_guideline.replace(
-                        word, self.verb_if_color_in_guideline
-                    )
-                color_id += 1
+        # replacing the "recopie chaque phrase et" by "dans chaque phrase, "
+        adapted_guideline = rewriter.replace_phrases(guideline)
+
+        # the verbs that need to be replaced with "colorie"
+        verbs = rewriter.find_verbs(adapted_guideline, self.guideline_doc())
+        if self.displayed_colors_dict == self.displayed_colors_dict_select:
+            # there is no color in the guideline
+            replacing_verbs = [
+                self.verb_if_no_color_in_guideline + str(self.displayed_colors_dict[str(color_id)])
+                for color_id in range(len(verbs))
+            ]
+        else:
+            # there are colors in guideline
+            replacing_verbs = [self.verb_if_color_in_guideline] * len(verbs)
+        adapted_guideline = rewriter.replace_words(adapted_guideline, verbs, replacing_verbs)
 
         # cleaning of the result
         adapted_guideline_list = splits_to_sentences(adapted_guideline)
         adapted_guideline_list = clean_entities_spaces(adapted_guideline_list)
 
         # capitalizing the sentences
-        for sentence in adapted_guideline_list:
-            if len(sentence) > 1:
-                new_sentence = (
-                    sentence[0].upper() + sentence[1:]
-                )  # .capitalize lowers every letter except the first one, sometimes we don't want that
-
-                adapted_guideline = adapted_guideline.replace(sentence, new_sentence)
+        # .capitalize lowers every letter except the first one, sometimes we don't want that
+        sentences = [sentence for sentence in adapted_guideline_list if len(sentence) > 1]
+        adapted_guideline = rewriter.replace_words(
+            adapted_guideline, sentences, [sentence[0].upper() + sentence[1:] for sentence in sentences]
+        )
 
         return adapted_guideline
 
+    def guideline_doc(self):
+        """Returns the spaCy doc of the guideline if its tokens can be reused instead of tokenizing it again"""
+        if self.reuse_spacy_tokens and self.list_of_guideline_tokens_spacy:
+            return self.list_of_guideline_tokens_spacy
+        return None
+
     def get_categories_in_guideline(self):
         """This method could be implemented for all types to color and frame
         the categories in the guideline. For now, it is only implemented for
@@ -282,25 +290,26 @@ class Select(Exercise):
         block_id_count: int = 0
         word_id_count: int = 0  # we generate different ids for each word
         entity_id_count: int = 0  # we generate different ids for each clickable entity
-        html_output: str = ""
+        spans = SpanList()
 
         for block in blocks:
-            html_output += f"<span class='block' id='block{block_id_count}'>"
+            spans.append(block_start(block_id_count))
             block_id_count += 1
 
-            # we generate the html version of the block
-            html_output, word_id_count, entity_id_count = self.convert_to_html(
-                block, html_output, word_id_count, entity_id_count
+            # we generate the tokens of the html version of the block
+            spans, word_id_count, entity_id_count = self.convert_to_html(
+                block, spans, word_id_count, entity_id_count
             )
 
             # if there is a space at the end of the block, we remove it
-            if not html_output.split("<span class='space'> </span>")[-1]:
-                html_output = replace_starting_from_the_end(
-                    html_output, "<span class='space'> </span>", "", 1
-                )
+            if spans.ends_with_space():
+                spans.remove_last_space()
 
-            html_output += "<br/></span>"
-        return html_output
+            spans.append(block_end())
+
+        # the tokens are kept to render the text again (ex: to json) without adapting it again
+        self.exercise_text_spans = spans
+        return spans.to_html()
 
 
     def __colors_in_guideline(self) -> dict:
@@ -337,15 +346,22 @@ class Select(Exercise):
             if word_dict["entity_group"] == "PROREL":
                 indic = False
 
-        for sent in self.list_of_guideline_tokens_spacy.sents:
-            # we remove the auxiliaries from the verb list
-            for token in sent:
-                if token.tag_ == "AUX" and token.text in verbs:
-                    verbs.remove(token.text)
+        # we remove the auxiliaries from the verb list
+        # (the tokens of the doc, not its sentences: the parser may not be loaded)
+        for token in self.list_of_guideline_tokens_spacy:
+            if self.__is_auxiliary(token) and token.text in verbs:
+                verbs.remove(token.text)
 
         return len(verbs)
 
 
+    def __is_auxiliary(self, token) -> bool:
+        """Whether the spaCy token is an auxiliary (its universal POS in fast tagging mode)."""
+        if self.fast_tagging:
+            return token.pos_ == "AUX"
+        return token.tag_ == "AUX"
+
+
     def __number_of_nouns(self) -> int:
         """Counts the number of common nouns in the guideline."""
         nb_nouns = 0
@@ -40,7 +40,8 @@ class Show(Exercise):
         exercise_text = text_to_html(sentences, True)
         self.html_output = self.html_template.render(
             exercise_number=self.json_path.split(os.sep)[-1].split(".")[0],
-            exercise_text=exercise_text,
+            exercise_text=self.paginate(exercise_text),
+            paginated=self.paginated,
             additional_guideline=additional_guideline,
             guideline=guideline,
             lines_per_page=self.lines_per_page,
@@ -0,0 +1,178 @@
+from typing import Iterator, List, Optional, Tuple
+
+# the kinds of the tokens of the text of an exercise
+BLOCK_START = "block_start"
+BLOCK_END = "block_end"
+ENTITY_START = "entity_start"
+ENTITY_END = "entity_end"
+WORD_START = "word_start"
+WORD_END = "word_end"
+WORD = "word"
+SPACE = "space"
+
+SPACE_HTML = "<span class='space'> </span>"
+
+
+class SpanToken:
+    """
+    A token of the text of an exercise (block, word, space, start or end of a selectable entity...)
+    with its html, the html of the text being the concatenation of the html of its tokens
+
+    Class attributes:
+        kind (str): The kind of the token (BLOCK_START, WORD, SPACE...)
+        html (str): The html of the token
+        text (Optional[str]): The text of a WORD token
+        id (Optional[str]): The id of the element in the html (ex: "word3", "entity1", "block0")
+        classes (Tuple[str]): The classes of the element in the html (ex: ("word", "entities"))
+    """
+
+    __slots__ = ("kind", "html", "text", "id", "classes")
+
+    def __init__(
+        self,
+        kind: str,
+        html: str,
+        text: Optional[str] = None,
+        id: Optional[str] = None,
+        classes: Tuple[str, ...] = (),
+    ) -> None:
+        self.kind = kind
+        self.html = html
+        self.text = text
+        self.id = id
+        self.classes = classes
+
+    def to_dict(self) -> dict:
+        """Returns the token without its html, as a dict to store in a json"""
+        token_dict = {"kind": self.kind}
+        if self.text is not None:
+            token_dict["text"] = self.text
+        if self.id is not None:
+            token_dict["id"] = self.id
+        if self.classes:
+            token_dict["classes"] = list(self.classes)
+        return token_dict
+
+
+class SpanList:
+    """
+    The flat list of the tokens of the text of an exercise, built by the conversion
+    and serialised once to html (to_html) or json (to_dicts)
+
+    Class attributes:
+        tokens (List[SpanToken]): The tokens of the text, in order
+    """
+
+    __slots__ = ("tokens",)
+
+    def __init__(self, tokens: List[SpanToken] = None) -> None:
+        self.tokens = tokens if tokens is not None else []
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def __iter__(self) -> Iterator[SpanToken]:
+        return iter(self.tokens)
+
+    def append(self, token: SpanToken) -> None:
+        self.tokens.append(token)
+
+    def extend(self, spans: "SpanList") -> None:
+        self.tokens.extend(spans.tokens)
+
+    def clear(self) -> None:
+        self.tokens.clear()
+
+    def ends_with_space(self) -> bool:
+        """Returns whether the last token is a space"""
+        return bool(self.tokens) and self.tokens[-1].kind == SPACE
+
+    def ends_with_space_then(self, html: str, start: int = 0) -> bool:
+        """
+        Returns whether the html of the tokens after the last space (or after start if there is no space
+        after start) is exactly the given html (ex: the end of a word " </span>" after its space)
+        """
+        tail = []
+        tail_length = 0
+        for index in range(len(self.tokens) - 1, start - 1, -1):
+            token = self.tokens[index]
+            if token.kind == SPACE:
+                break
+            tail_length += len(token.html)
+            if tail_length > len(html):
+                return False
+            tail.append(token.html)
+        return "".join(reversed(tail)) == html
+
+    def remove_last_space(self, start: int = 0) -> None:
+        """Removes the last space token (after start), if there is one"""
+        for index in range(len(self.tokens) - 1, start - 1, -1):
+            if self.tokens[index].kind == SPACE:
+                del self.tokens[index]
+                return None
+        return None
+
+    def to_html(self) -> str:
+        """Returns the html of the text"""
+        return "".join(token.html for token in self.tokens)
+
+    def to_dicts(self) -> List[dict]:
+        """Returns the tokens of the text as dicts to store in a json (see SpanToken.to_dict)"""
+        return [token.to_dict() for token in self.tokens]
+
+
+def space() -> SpanToken:
+    """Returns the token of a space between two words"""
+    return SpanToken(SPACE, SPACE_HTML, classes=("space",))
+
+
+def block_start(block_id: int) -> SpanToken:
+    """Returns the token opening a block (part of the text that cannot be cut from one page to the next one)"""
+    return SpanToken(BLOCK_START, f"<span class='block' id='block{block_id}'>", id=f"block{block_id}", classes=("block",))
+
+
+def block_end() -> SpanToken:
+    """Returns the token closing a block"""
+    return SpanToken(BLOCK_END, "<br/></span>")
+
+
+def word_start(word_id: int, separator: str = " ") -> SpanToken:
+    """Returns the token opening the span of id word{word_id} holding a word and its space"""
+    return SpanToken(WORD_START, f"<span id='word{word_id}'>{separator}", id=f"word{word_id}")
+
+
+def word_end() -> SpanToken:
+    """Returns the token closing the span holding a word and its space"""
+    return SpanToken(WORD_END, " </span>")
+
+
+def word(
+    text: str,
+    classes: Tuple[str, ...] = ("word",),
+    attributes: str = "",
+    id: Optional[str] = None,
+    separator: str = " ",
+) -> SpanToken:
+    """
+    Returns the token of a word: <span class='word' ...>text</span>
+
+    Parameters:
+        text (str): The word
+        classes (Tuple[str]) (default: ("word",)): The classes of the span
+        attributes (str) (default: ""): The other attributes of the span (ex: " color_number = 0 id = 'entity2'")
+        id (Optional[str]) (default: None): The id of the word or of the entity of the span
+        separator (str) (default: " "): What follows the span in the html
+    Returns:
+        token (SpanToken): The token of the word
+    """
+    return SpanToken(WORD, f"<span class='{' '.join(classes)}'{attributes}>{text}</span>{separator}", text, id, classes)
+
+
+def entity_start(html: str, entity_id: Optional[str], classes: Tuple[str, ...]) -> SpanToken:
+    """Returns the token opening the span of a selectable entity (the opening tag is given by the exercise type)"""
+    return SpanToken(ENTITY_START, html, id=entity_id, classes=classes)
+
+
+def entity_end() -> SpanToken:
+    """Returns the token closing the span of a selectable entity"""
+    return SpanToken(ENTITY_END, "</span> ")
@@ -8,9 +8,19 @@ from fantastic.exercises.utils import (
     text_to_html,
     find_symbols,
     clean_entities_spaces,
-    replace_starting_from_the_end,
     entities_if_symbols,
 )
+from fantastic.exercises.span_model import (
+    SpanList,
+    block_end,
+    block_start,
+    entity_end,
+    entity_start,
+    space,
+    word,
+    word_end,
+    word_start,
+)
 
 
 class Swap(Exercise):
@@ -22,6 +32,7 @@ class Swap(Exercise):
             self, json_path, config, self.template_name, self.output_folder_name, lines_per_page
         )
         self.symbol: str = ""
+        self.exercise_text_spans = SpanList()  # tokens of the html of the exercise text
         self.non_symbols_chars: list = json.loads(self.config.get("swap", "non_symbols_chars"))
 
     def adapt(self) -> None:
@@ -55,7 +66,8 @@ class Swap(Exercise):
             exercise_number=self.json_path.split(os.sep)[-1].split(".")[0],
             guideline=guideline_html,
             additional_guideline=additional_guideline_html,
-            exercise_text_html=exercise_text_html,
+            exercise_text_html=self.paginate(exercise_text_html),
+            paginated=self.paginated,
             lines_per_page=self.lines_per_page,
         )
 
@@ -83,39 +95,40 @@ class Swap(Exercise):
 
         block_id_count: int = 0
         word_id_count: int = 0  # we generate different ids for each word
-        html_output: str = ""
+        spans = SpanList()
 
         for block in blocks:
-            html_output += f"<span class='block' id='block{block_id_count}'>"
+            spans.append(block_start(block_id_count))
 
-            # we generate the html version of the block
-            html_output, word_id_count = self.__block_to_html(
-                block, html_output, word_id_count, block_id_count
+            # we generate the tokens of the html version of the block
+            spans, word_id_count = self.__block_to_html(
+                block, spans, word_id_count, block_id_count
             )
 
             # if there is a space at the end of the block, we remove it
-            if not html_output.split("<span class='space'> </span>")[-1]:
-                html_output = replace_starting_from_the_end(
-                    html_output, "<span class='space'> </span>", "", 1
-                )
+            if spans.ends_with_space():
+                spans.remove_last_space()
 
             block_id_count += 1
 
-            html_output += "<br/></span>"
-        return html_output
+            spans.append(block_end())
+
+        # the tokens are kept to render the text again (ex: to json) without adapting it again
+        self.exercise_text_spans = spans
+        return spans.to_html()
 
     def __block_to_html(
-        self, text: str, html_output: str, word_id_count: int, block_id_count: int
-    ) -> Tuple[str, int]:
+        self, text: str, spans: SpanList, word_id_count: int, block_id_count: int
+    ) -> Tuple[SpanList, int]:
         """Gets the list of swappable entities and converts it to html.
 
         Parameters:
-        - html_output: current value of the html of the exercice
+        - spans: current tokens of the html of the exercice
         - word_id_count: current value of the id of words
         - block_id_count: number of the block
         Returns:
         new value of word_id_count
-        html_output: html version of the text"""
+        spans: tokens of the html version of the text"""
 
         # searching for symbols in the "énoncé" and spliting on symbol
         self.symbol = self.__symbols_in_exercice(text)
@@ -126,88 +139,94 @@ class Swap(Exercise):
             words_list = clean_entities_spaces(words_list)
 
             # convertion to html
-            html_output, word_id_count = self.__words_list_to_html(
-                words_list, html_output, word_id_count, block_id_count
+            spans, word_id_count = self.__words_list_to_html(
+                words_list, spans, word_id_count, block_id_count
             )
 
         else:
             # there aren't any symbol to split on, we couldn't get the list of entities
-            html_output = ""
-        return html_output, word_id_count
+            spans.clear()
+        return spans, word_id_count
 
     def __words_list_to_html(
         self,
         entities_list: list,
-        html_output: str,
+        spans: SpanList,
         word_id_count: int,
         block_id_count: int,
-    ) -> Tuple[str, int]:
+    ) -> Tuple[SpanList, int]:
         """Parameters:
         - entities_list: list of groups of words
-        - html_output: current value of the html version of the "énoncé"
+        - spans: current tokens of the html version of the "énoncé"
         - word_id_count: current value of word id
         - entity_id_count: current value of entity id
 
         Returns:
         new value of word_id_count
-        html_output: html version of the text.
+        spans: tokens of the html version of the text.
         -> each word is inside a span with class word, each space in a span with a class space
         -> a word and a space are inside a class with an id to color words.
         -> selectable groups are in a span with class 'framed_entities',
                 a color number and an id that are used in the js script to change the color of the background.
                 They also have an onClick attribute"""
 
+        entity_classes = ("framed_entities", f"framed_entities_{block_id_count}")
+        entity_attributes = f"framed_entities = 'framed_entities_{block_id_count}' onclick = 'myFunction(this)'"
+
         if re.search(r"\w\.$", entities_list[0]):
             # we don't want the number of the sentence to be swappable
-            html_output += (
-                f"<span id='word{word_id_count}'><span class='word'>"
-                + entities_list[0]
-                + "</span> <span class='space'> </span> </span>"
-            )
+            spans.append(word_start(word_id_count, separator=""))
+            spans.append(word(entities_list[0]))
+            spans.append(space())
+            spans.append(word_end())
             word_id_count += 1
 
         if len(entities_list) > 1:
 
             for entity in entities_list[1:]:
                 # each entity is a clickable group of words / word of the exercise
-                html_output_temp = ""
+                entity_spans = SpanList()
 
                 words_list = entity.split(" ")
 
-                for word in words_list:
+                for entity_word in words_list:
 
-                    if word == self.symbol:
+                    if entity_word == self.symbol:
                         # nothing is done
                         continue
 
                     if len(words_list) == 1:
                         # the "group of word" to swap is actually a word
                         # so we put the class framed_entities on the word and framed_entities_id on the word
-                        html_output_temp += (
-                            f"<span class='framed_entities framed_entities_{block_id_count}' framed_entities = 'framed_entities_{block_id_count}' onclick = 'myFunction(this)'> <span class='word' id='word{word_id_count}'>"
-                            + word
-                            + "</span> </span> <span class='space'> </span>"
+                        entity_spans.append(
+                            entity_start(
+                                f"<span class='{' '.join(entity_classes)}' {entity_attributes}> ", None, entity_classes
+                            )
                         )
+                        entity_spans.append(word(entity_word, attributes=f" id='word{word_id_count}'", id=f"word{word_id_count}"))
+                        entity_spans.append(entity_end())
+                        entity_spans.append(space())
                     else:
-                        html_output_temp += (
-                            f"<span id='word{word_id_count}'><span class='word'>"
-                            + word
-                            + "</span> <span class='space'> </span> </span>"
-                        )
+                        entity_spans.append(word_start(word_id_count, separator=""))
+                        entity_spans.append(word(entity_word))
+                        entity_spans.append(space())
+                        entity_spans.append(word_end())
                     word_id_count += 1
 
                 if len(words_list) > 1:
-                    # removing the last character of the html output temp if it is a space
-                    html_output_temp_cleaned = replace_starting_from_the_end(
-                        html_output_temp, "<span class='space'> </span>", "", 1
-                    )
+                    # removing the last space of the group of words
+                    entity_spans.remove_last_space()
                     # adding a span with class 'framed_entities' and 'framed_entities_id' around the bunch of words that are selectables
-                    html_output_temp = (
-                        f"<span class = 'framed_entities framed_entities_{block_id_count}' framed_entities = 'framed_entities_{block_id_count}' onclick = 'myFunction(this)'>"
-                        + html_output_temp_cleaned
-                        + "</span> <span class='space'> </span>"
+                    spans.append(
+                        entity_start(
+                            f"<span class = '{' '.join(entity_classes)}' {entity_attributes}>", None, entity_classes
+                        )
                     )
+                    spans.extend(entity_spans)
+                    spans.append(entity_end())
+                    spans.append(space())
 
-                html_output += html_output_temp
+                else:
+                    spans.extend(entity_spans)
 
-        return html_output, word_id_count
+        return spans, word_id_count
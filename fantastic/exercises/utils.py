@@ -1,4 +1,7 @@
-from typing import List, Tuple
+from configparser import ConfigParser
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Pattern, Tuple
+import json
 import re
 import spacy
 from spacy.lang.fr import French
@@ -6,6 +9,27 @@ from transformers import AutoTokenizer, AutoModelForTokenClassification
 from transformers import pipeline
 from transformers.pipelines.token_classification import TokenClassificationPipeline
 
+# SPACY_TO_GILF_TAGS: The gilf tag (entity_group of gilf/french-postag-model) of a spaCy universal POS
+# (the verbs, relative pronouns and participles are refined with the morphology, see spacy_gilf_tag)
+SPACY_TO_GILF_TAGS = {
+    "ADJ": "ADJ",
+    "ADP": "P",
+    "ADV": "ADV",
+    "AUX": "V",
+    "CCONJ": "CC",
+    "DET": "DET",
+    "INTJ": "I",
+    "NOUN": "NC",
+    "NUM": "DET",
+    "PRON": "PRO",
+    "PROPN": "NPP",
+    "PUNCT": "PONCT",
+    "SCONJ": "CS",
+    "SYM": "PONCT",
+    "VERB": "V",
+    "X": "ET",
+}
+
 
 def find_in_dict(json_dict: dict, object_type: type, key: str):
     """
@@ -147,6 +171,96 @@ def text_to_html(text: list, is_exercise: bool = False) -> str:
     return html_output
 
 
+# SPAN_TAG_PATTERN: The opening and closing span tags of a html text
+SPAN_TAG_PATTERN = re.compile(r"<span\b[^>]*>|</span>")
+# BLOCK_ID_PATTERN: The id of a block of an exercise text (see text_to_html)
+BLOCK_ID_PATTERN = re.compile(r"""\bid\s*=\s*['"]block\d+['"]""")
+# TAG_PATTERN: Any html tag (to measure the visible text of a block)
+TAG_PATTERN = re.compile(r"<[^>]*>")
+
+
+def split_blocks(html: str) -> Optional[List[str]]:
+    """
+    Returns the html of each block (span with an id "block{n}") of an exercise text,
+    None if the text is not only made of blocks (the pages cannot be computed then)
+    """
+    blocks = []
+    depth = 0
+    block_start = end_last_block = 0
+    for match in SPAN_TAG_PATTERN.finditer(html):
+        if match[0] == "</span>":
+            depth -= 1
+            if depth < 0:
+                return None
+            if depth == 0:
+                blocks.append(html[block_start:match.end()])
+                end_last_block = match.end()
+            continue
+        if depth == 0:
+            if html[end_last_block:match.start()].strip() or not BLOCK_ID_PATTERN.search(match[0]):
+                # some text or a span which is not a block between two blocks
+                return None
+            block_start = match.start()
+        depth += 1
+    if depth != 0 or html[end_last_block:].strip() or not blocks:
+        return None
+    return blocks
+
+
+def estimate_block_lines(block_html: str, chars_per_line: int) -> int:
+    """Returns the number of lines a block is expected to be displayed on, from the length of its text"""
+    text_length = len(" ".join(TAG_PATTERN.sub(" ", block_html).split()))
+    return max(1, -(-text_length // chars_per_line))
+
+
+def assign_pages(lines_per_block: List[int], lines_per_page: int) -> List[int]:
+    """
+    Returns the page of each block: a block is never cut between two pages and a page has at most
+    lines_per_page lines, unless one of its blocks is longer (same rules as front.js)
+    """
+    pages = []
+    lines_on_last_page = 0
+    for index, block_lines in enumerate(lines_per_block):
+        if index == 0:
+            pages.append(0)
+            lines_on_last_page = block_lines
+        elif lines_per_page != 1 and lines_on_last_page + block_lines <= lines_per_page:
+            pages.append(pages[-1])
+            lines_on_last_page += block_lines
+        else:
+            pages.append(pages[-1] + 1)
+            lines_on_last_page = block_lines
+    return pages
+
+
+def paginate_html(html: str, lines_per_page: int, chars_per_line: int) -> Optional[str]:
+    """
+    Returns the exercise text split into pages (<p id="page{n}">), only the first one being displayed,
+    so that front.js does not have to measure and move the blocks when loading the page
+
+    Parameters:
+        html (str): The html of the exercise text (blocks, see text_to_html)
+        lines_per_page (int): The number of lines to display per page
+        chars_per_line (int): The number of characters expected on a line
+    Returns:
+        pages_html (Optional[str]): The html of the pages, None if the text is not made of blocks
+    """
+    blocks = split_blocks(html)
+    if blocks is None:
+        return None
+    pages = assign_pages([estimate_block_lines(block, chars_per_line) for block in blocks], lines_per_page)
+    pages_html = []
+    for index, (block, page) in enumerate(zip(blocks, pages)):
+        if index == 0 or page != pages[index - 1]:
+            if index:
+                pages_html.append("</p>")
+            display = "block" if page == 0 else "none"
+            pages_html.append(f'<p id="page{page}" style="display: {display};">')
+        pages_html.append(block)
+    pages_html.append("</p>")
+    return "".join(pages_html)
+
+
 def find_all_sentences(text: str):
     """
     Returns the list of all the full sentences found in a text
@@ -407,9 +521,9 @@ def splits_to_sentences(
     return sentences
 
 
-def generate_nlp_spacy() -> French:
-    """Nlp model of spacy"""
-    nlp = spacy.load("fr_core_news_sm")
+def generate_nlp_spacy(disabled_components: List[str] = None) -> French:
+    """Nlp model of spacy, without the disabled components (ex: ["parser", "ner"]) which are not even loaded"""
+    nlp = spacy.load("fr_core_news_sm", exclude=disabled_components or [])
     return nlp
 
 
@@ -423,6 +537,58 @@ def generate_nlp_gilf() -> TokenClassificationPipeline:
     return nlp_token_class
 
 
+def generate_nlp_models(config: ConfigParser) -> Tuple[TokenClassificationPipeline, French]:
+    """
+    Returns the nlp models used by the Select exercises: the hugging face model is not loaded
+    (None) in fast tagging mode, where all the tags come from the spaCy model ([select] section of data.cfg)
+    """
+    if json.loads(config.get("select", "fast_tagging")):
+        disabled_components = json.loads(config.get("select", "fast_tagging_disabled_components"))
+        return None, generate_nlp_spacy(disabled_components)
+    return generate_nlp_gilf(), generate_nlp_spacy()
+
+
+def spacy_gilf_tag(token) -> str:
+    """Returns the gilf tag of a spaCy token (ex: "V" for a conjugated verb, "VINF" for an infinitive)"""
+    tag = SPACY_TO_GILF_TAGS.get(token.pos_, "ET")
+    if tag == "V":
+        verb_form = token.morph.get("VerbForm")
+        if "Inf" in verb_form:
+            return "VINF"
+        if "Part" in verb_form:
+            return "VPP" if "Past" in token.morph.get("Tense") else "VPR"
+    elif tag == "PRO" and "Rel" in token.morph.get("PronType"):
+        return "PROREL"
+    return tag
+
+
+def spacy_to_gilf_tokens(doc) -> List[dict]:
+    """
+    Returns the tokens of a spaCy doc in the format of the grouped entities of the gilf pipeline
+    (see generate_nlp_gilf): [{"entity_group": "V", "word": "souligne", "start": 0, "end": 8}, ...],
+    the consecutive tokens with the same tag being grouped in one entity as the pipeline does
+
+    Parameters:
+        doc (spacy.tokens.Doc): The text tagged by spaCy
+    Returns:
+        tokens (List[dict]): The entities of the text
+    """
+    tokens = []
+    for token in doc:
+        if token.is_space:
+            continue
+        tag = spacy_gilf_tag(token)
+        # the elisions are words without their apostrophe for gilf (ex: "l" for "l'")
+        word = token.text.rstrip("'’") or token.text
+        start = token.idx
+        if tokens and tokens[-1]["entity_group"] == tag:
+            tokens[-1]["word"] = doc.text[tokens[-1]["start"]:start + len(word)]
+            tokens[-1]["end"] = start + len(word)
+        else:
+            tokens.append({"entity_group": tag, "word": word, "start": start, "end": start + len(word)})
+    return tokens
+
+
 def index_words(guideline: str, categories: list) -> list:
     """Returns the indexes of the words that we need to frame and color in the guideline.
 
@@ -475,6 +641,29 @@ def replace_starting_from_the_end(
     return new_value.join(words)
 
 
+@lru_cache(maxsize=None)
+def split_word_pattern(split_characters: str) -> Pattern:
+    """Returns the regex of the entities of a word: each split character alone, or a run of other characters"""
+    escaped_characters = "".join(re.escape(char) for char in split_characters)
+    if not escaped_characters:
+        return re.compile(r".+", flags=re.DOTALL)
+    return re.compile(f"[{escaped_characters}]|[^{escaped_characters}]+")
+
+
+def iter_split_word(word: str, split_characters: str) -> Iterator[str]:
+    """Yields the selectable entities of the word one by one (see split_word)"""
+    for match in split_word_pattern(split_characters).finditer(word):
+        yield match[0]
+
+
+def iter_split_words(words: Iterable[str], split_characters: str) -> Iterator[str]:
+    """Yields the selectable entities of each word of words, in order (see split_word)"""
+    pattern = split_word_pattern(split_characters)
+    for word in words:
+        for match in pattern.finditer(word):
+            yield match[0]
+
+
 def split_word(word: str, split_characters: str) -> list:
     """Splits the word if it contains any character of split_characters (punctuation, apostrophes...)
 
@@ -483,28 +672,10 @@ def split_word(word: str, split_characters: str) -> list:
     - split characters: punctuation, parentheses, appostrophes,...
     that are not part of the word
     Returns:
-    - the word splited so that every element of the list is a selectable entity"""
-
-    if word[0] in split_characters:
-        # the first letter of word is a split character (punctuation / apostrophe / ...)
-        if len(word) == 1:
-            return [word]
-        return [word[0]] + split_word(word[1:], split_characters)
-
-    for i in range(len(word) - 1):
-        if word[i] in split_characters:
-            # the letter at place i in word is in split characters
-            splited_word = [word[:i], word[i]] + split_word(
-                word[i + 1 :], split_characters
-            )
-            return splited_word
-
-    if word[-1] in split_characters:
-        # the last letter of word is a split characters (punctuation / apostrophe / ...)
-        splited_word = [word[:-1], word[-1]]
-        return splited_word
+    - the word splited so that every element of the list is a selectable entity
+    (ex: "l'arbre." -> ["l", "'", "arbre", "."], each split character being an entity)"""
 
-    return [word]
+    return split_word_pattern(split_characters).findall(word)
 
 
 def entities_if_symbols(text: str, symbol: str) -> list:
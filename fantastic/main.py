@@ -1,8 +1,18 @@
+from collections import defaultdict
 from configparser import ConfigParser
+from typing import Dict, List, Tuple
 import json
 import os
 import fantastic.paths
-from fantastic.exercises.utils import generate_nlp_gilf, generate_nlp_spacy
+from fantastic.bundle import BUNDLE_FOLDER, BundleWriter
+from fantastic.corpus import list_exercise_ids, load_exercise_json
+from fantastic.exercises.utils import generate_nlp_models
+from fantastic.exercises.nlp_cache import cache_stats
+from fantastic.output_writer import OutputWriter, publish_assets
+from fantastic.precompress import configured_encodings
+from fantastic.profiling import profiler
+from fantastic.run_log import OK, SKIPPED, ExerciseRecord, RunLog, new_run_log_path
+from fantastic.service.client import ServiceError, configured_client
 # Fill
 from fantastic.exercises.fill.edit_phrase import EditPhrase
 from fantastic.exercises.fill.expression_ecrite import ExpressionEcrite
@@ -63,52 +73,191 @@ class_name_dict = {
 
 
 
-def main():
-    # loading the config to read the config file
-    config = ConfigParser()
-    config.read(os.path.join(fantastic.paths.FANTASTIC_DIR, "exercises", "data.cfg"))
+# DISPATCH: for each type of exercise, the class adapting it and whether its adapt needs the nlp models
+DISPATCH: Dict[str, Tuple[type, bool]] = {
+    exercise_type: (exercise_class, category == "Select")
+    for category, classes in class_name_dict.items()
+    for exercise_type, exercise_class in classes.items()
+}
 
-    # loading the nlp models
-    nlp_token_class = generate_nlp_gilf()
-    nlp = generate_nlp_spacy()
 
-    # path to the json directory
-    path = fantastic.paths.JSON_DIR
+def adapt_exercise(
+    exercise, record: ExerciseRecord, json_dict: dict, needs_nlp: bool, nlp_models: tuple, writer=None
+) -> None:
+    """
+    Adapts an exercise whose json is already loaded and queues its html in the writer (output folder or bundle),
+    timing the stages in its record
+    """
+    with record.stage("create_template"):
+        exercise.create_template()
+    with record.stage("load_json"):
+        exercise.load_json(json_dict)  # the dict read to find the type, not parsed again
+
+    with record.stage("adapt"):
+        if needs_nlp:
+            exercise.adapt(*nlp_models)
+        else:
+            exercise.adapt()
+
+    with record.stage("write_template"):
+        exercise.write_template(writer)
+    record.output_size = len(exercise.html_output.encode("utf-8"))
+
 
+def adapt_with_service(
+    client, queue: Dict[type, List[tuple]], writer, batch_size: int, records: List[ExerciseRecord]
+) -> None:
+    """
+    Adapts the exercises of the queue with the adaptation service (fantastic/service), batch_size exercises
+    per request, queues their html in the writer and their records in records: the ones of the service
+    (with the time spent reading the json here)
+    """
+    for exercises in queue.values():
+        for start in range(0, len(exercises), batch_size):
+            batch = exercises[start : start + batch_size]
+            try:
+                with profiler.stage("service_batch"):
+                    results = client.adapt_batch(
+                        [(record.id, record.type, json_dict) for _, json_dict, record in batch]
+                    )
+            except ServiceError as e:
+                # the records of the batch are the ones read here, with the error of the request
+                results = [None] * len(batch)
+                for _, _, record in batch:
+                    record.fail(e)
+                print(f"{len(batch)} exercises could not be adapted: {e}")
 
-    for file_path in os.listdir(path):
-        with open(os.path.join(path, file_path), 'r', encoding='utf-8') as json_file:
+            for (_, _, record), result in zip(batch, results):
+                if result is not None:
+                    stages = record.stages
+                    record = ExerciseRecord.from_dict(result["record"])
+                    record.stages = {**stages, **record.stages}
+                    if record.status == OK:
+                        writer.add(record.id, result["output_folder"], result["html"])
+                    else:
+                        print(f"{record.id} could not be adapted: {record.error} ({record.traceback_hash})")
+                profiler.add_stages(record.stages)
+                records.append(record)
 
-            json_dict = json.load(json_file)
 
-            # adapting only the exercise that are tagged
-            if 'type' in json_dict.keys():
+def adapt_queue(config, path: str, writer, run_log: RunLog, records: List[ExerciseRecord]) -> None:
+    """
+    Reads the json of the exercises of the folder (or of the packed corpus), logs the ones that are skipped or that
+    cannot be read, adapts the other ones grouped by class (locally or by the adaptation service) and queues their
+    html in the writer, their records in records (logged once their html is written)
+    """
+    # the js the generated html depends on, in its version of this repository (front.js reads the server-side pages)
+    publish_assets(fantastic.paths.OUTPUT_DIR)
 
-                exercise_type = json_dict["type"]
+    # the exercises to adapt grouped by class (json path, json, record), the others are logged as skipped
+    queue: Dict[type, List[tuple]] = defaultdict(list)
+    # the files of the json directory, or the packed corpus if it is used ([corpus] section)
+    for exercise_id in list_exercise_ids(config, path):
+        record = ExerciseRecord(exercise_id, None, None)
+        exercise_path = os.path.join(path, exercise_id + ".json")
+        try:
+            with record.stage("read_json"):
+                json_dict = load_exercise_json(exercise_path, config)
+            record.type = json_dict.get("type")
+        except Exception as e:
+            # a json that cannot be read (missing, malformed...) only fails its own record
+            record.fail(e)
+            print(f"{exercise_id}.json could not be read: {record.error} ({record.traceback_hash})")
+            profiler.count(record.status)
+            run_log.write(record)
+            continue
 
-                for category in class_name_dict:
-                    if exercise_type in class_name_dict[category]:
+        # adapting only the exercise that are tagged, with a type that is converted
+        if record.type not in DISPATCH:
+            record.status = SKIPPED
+            profiler.count(record.status)
+            run_log.write(record)
+            continue
+        exercise_class, _ = DISPATCH[record.type]
+        record.class_name = exercise_class.__name__
+        queue[exercise_class].append((exercise_path, json_dict, record))
 
-                        # gettin the class that we need to adapt the exercise
-                        class_name = class_name_dict[category][exercise_type]
+    # the exercises are adapted by the adaptation service if it is used ([service] section), its models already loaded
+    client = configured_client(config)
+    if client is not None:
+        adapt_with_service(client, queue, writer, json.loads(config.get("service", "batch_size")), records)
+        queue.clear()
 
-                        exercise_path = os.path.join(path, file_path)
+    # loading the nlp models only if an exercise needs them (no hugging face model in fast tagging mode)
+    nlp_models = (None, None)
+    if any(DISPATCH[exercises[0][2].type][1] for exercises in queue.values()):
+        with profiler.stage("load_nlp_models"):
+            nlp_models = generate_nlp_models(config)
 
-                        exercises = class_name(exercise_path, config)
+    for exercise_class, exercises in queue.items():
+        for exercise_path, json_dict, record in exercises:
+            _, needs_nlp = DISPATCH[record.type]
 
-                        try:
-                            exercises.create_template().load_json()
+            with profiler.exercise(os.path.basename(exercise_path), record.type):
+                try:
+                    adapt_exercise(
+                        exercise_class(exercise_path, config), record, json_dict, needs_nlp, nlp_models, writer
+                    )
 
-                            if json_dict["type"] in class_name_dict["Select"]:
-                                exercises.adapt(nlp_token_class, nlp)
+                except Exception as e:
+                    record.fail(e)
+                    print(f"{os.path.basename(exercise_path)} could not be adapted: {record.error} ({record.traceback_hash})")
 
-                            else:
-                                exercises.adapt()
+            profiler.add_stages(record.stages)
+            records.append(record)
+
+
+def main():
+    # loading the config to read the config file
+    config = ConfigParser()
+    config.read(os.path.join(fantastic.paths.FANTASTIC_DIR, "exercises", "data.cfg"))
+
+    # timers of the stages of the conversion (nothing is measured unless enabled in the [profiling] section)
+    profiler.configure(config)
+
+    # path to the json directory
+    path = fantastic.paths.JSON_DIR
 
-                            exercises.write_template()
+    # one record per exercise (stages, output size, status, traceback) in the run log, closed even if the run crashes
+    with RunLog(new_run_log_path(config)) as run_log:
+        # the html of the exercises in one bundle instead of one file per exercise ([bundle] section),
+        # otherwise the files are written on background threads while the next exercises are adapted ([output] section)
+        if json.loads(config.get("bundle", "enabled")):
+            bundle_name = config.get("bundle", "name").strip('"')
+            writer = BundleWriter(os.path.join(fantastic.paths.OUTPUT_DIR, BUNDLE_FOLDER), bundle_name)
+        else:
+            writer = OutputWriter(
+                fantastic.paths.OUTPUT_DIR,
+                configured_encodings(config),
+                json.loads(config.get("output", "writer_threads")),
+            )
 
-                        except Exception as e:
-                            print(f"{file_path} could not be adapted: {e}")
+        # the records of the exercises adapted, logged once their html is written
+        records: List[ExerciseRecord] = []
+        try:
+            adapt_queue(config, path, writer, run_log, records)
+        finally:
+            # waiting for the files still queued (also if the run crashed, so that the records of the exercises
+            # adapted before are logged): an exercise whose html could not be written is logged as an error
+            with profiler.stage("write_output"):
+                writer.close()
+            write_errors = {}
+            if isinstance(writer, BundleWriter):
+                print(f"{len(writer.exercises)} exercises bundled in {writer.path}")
+            else:
+                print(f"{writer.written} html files written, {writer.unchanged} unchanged")
+                write_errors = writer.errors
+            for record in records:
+                if record.id in write_errors and record.status == OK:
+                    record.fail(write_errors[record.id])
+                    print(f"{record.id} could not be written: {record.error}")
+                profiler.count(record.status)
+                run_log.write(record)
+    print(f"{dict(run_log.counts)} exercises logged in {run_log.path}")
+    # hit rates of the shared stemmer and tokenizer caches
+    print(f"nlp caches: {cache_stats()}")
+    # time spent in each stage, slowest exercises... (if the profiler is enabled)
+    profiler.print_report()
 
 if __name__ == '__main__':
     main()
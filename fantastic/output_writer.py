@@ -0,0 +1,127 @@
+"""
+Writer of the html of the adapted exercises in the output folder (fantastic.paths.OUTPUT_DIR) on a pool of
+background threads, so that the adaptation of the next exercises does not wait for the disk. Each file is written
+in a staging folder then renamed (an interrupted run never leaves a half-written html), and is not written again
+if its content did not change (its modification time is kept for the synchronizations of the correction app).
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List
+import hashlib
+import os
+import shutil
+import threading
+import fantastic.paths
+from fantastic.precompress import ENCODINGS, update_manifest, write_atomically, write_precompressed
+
+# STAGING_FOLDER: The folder of the output folder the files are written in before being renamed
+STAGING_FOLDER = ".staging"
+# PAGE_ASSETS: The js files of the output folder whose version of this repository (fantastic.paths.STATIC_DIR)
+# the generated html depends on (ex: the paginated attribute read by front.js, the loader of the bundles)
+PAGE_ASSETS = ["js/front.js", "js/bundle_loader.js"]
+
+
+def same_file_content(path: str, data: bytes) -> bool:
+    """Returns whether the file at path holds the data (its size is compared first, then its hash)"""
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, "rb") as existing_file:
+            return hashlib.sha256(existing_file.read()).digest() == hashlib.sha256(data).digest()
+    except OSError:
+        return False
+
+
+def publish_assets(output_dir: str, assets: Iterable[str] = PAGE_ASSETS) -> List[str]:
+    """
+    Copies the version of this repository of the assets (paths relative to fantastic.paths.STATIC_DIR, ex:
+    "js/front.js") to the output folder, where the generated html loads them from (../js/front.js), if they differ
+
+    Returns:
+        published (List[str]): The assets copied
+    """
+    published = []
+    for asset in assets:
+        with open(os.path.join(fantastic.paths.STATIC_DIR, asset), "rb") as asset_file:
+            data = asset_file.read()
+        target = os.path.join(output_dir, asset)
+        if not same_file_content(target, data):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            write_atomically(target, data)
+            published.append(asset)
+    return published
+
+
+class OutputWriter:
+    """
+    Writes the html of the adapted exercises in the output folder on a pool of threads (see Exercise.write_template,
+    the same interface as fantastic.bundle.BundleWriter), the files are complete once the writer is closed
+
+    Class attributes:
+        output_dir (str): The output folder (one subfolder per type of exercise)
+        encodings (List[str]): The precompressed variants written next to each html (see fantastic/precompress.py)
+        written (int): The number of files written
+        unchanged (int): The number of files not written again because their content did not change
+        errors (Dict[str, Exception]): The error of each exercise whose html could not be written
+        manifest (Dict[str, dict]): The hash and sizes of each html precompressed (path relative to output_dir)
+    """
+
+    def __init__(self, output_dir: str, encodings: Iterable[str] = (), max_workers: int = 4) -> None:
+        self.output_dir = output_dir
+        self.encodings = list(encodings)
+        self.written = 0
+        self.unchanged = 0
+        self.errors = {}
+        self.manifest = {}
+        self.staging_dir = os.path.join(output_dir, STAGING_FOLDER)
+        os.makedirs(self.staging_dir, exist_ok=True)
+        self.__lock = threading.Lock()
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="output_writer")
+
+    def add(self, exercise_id: str, exercise_type: str, html: str) -> None:
+        """Queues the html of the exercise (type: the output folder of its class, ex: "coche_mots")"""
+        self.__executor.submit(self.write, exercise_id, exercise_type, html)
+
+    def write(self, exercise_id: str, exercise_type: str, html: str) -> None:
+        """Writes the html of the exercise (in a thread of the pool), its error is kept in errors"""
+        relative_path = f"{exercise_type}/{exercise_id}.html"
+        path = os.path.join(self.output_dir, exercise_type, exercise_id + ".html")
+        data = html.encode("utf-8")
+        try:
+            unchanged = same_file_content(path, data) and all(
+                os.path.exists(path + ENCODINGS[encoding]) for encoding in self.encodings
+            )
+            if not unchanged:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                staging_path = os.path.join(self.staging_dir, f"{exercise_type}.{exercise_id}.html")
+                with open(staging_path, "wb") as staging_file:
+                    staging_file.write(data)
+                os.replace(staging_path, path)
+                entry = write_precompressed(path, data, self.encodings) if self.encodings else None
+            elif self.encodings:  # the variants already written are kept
+                entry = {"sha256": hashlib.sha256(data).hexdigest(), "size": len(data)}
+                entry.update({encoding: os.path.getsize(path + ENCODINGS[encoding]) for encoding in self.encodings})
+        except Exception as e:
+            with self.__lock:
+                self.errors[exercise_id] = e
+            return None
+        with self.__lock:
+            if unchanged:
+                self.unchanged += 1
+            else:
+                self.written += 1
+            if self.encodings:
+                self.manifest[relative_path] = entry
+        return None
+
+    def close(self) -> None:
+        """Waits for the queued files, writes the manifest of the precompressed ones, removes the staging folder"""
+        self.__executor.shutdown(wait=True)
+        if self.manifest:
+            update_manifest(self.output_dir, self.manifest)
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+    def __enter__(self) -> "OutputWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
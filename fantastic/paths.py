@@ -20,3 +20,7 @@ TEMPLATE_DIR = os.path.join(BASE_DIR, "cartable-fantastique-fall-2021-p1", "jinj
 TAG_DIR = os.path.join(BASE_DIR, "cartable-fantastique-fall-2021-p1", "tagging")
 DATA_DIR = os.path.join(BASE_DIR, "cartable-fantastique-fall-2021-p1-data")
 CORRECTION_DIR = os.path.join(FANTASTIC_DIR, "correction")
+STATIC_DIR = os.path.join(CORRECTION_DIR, "static")
+CORPUS_PACK_PATH = os.path.join(DATA_DIR, "data", "json_exs.pack")
+RUN_LOG_DIR = os.path.join(DATA_DIR, "run_logs")
+CHOICE_INDEX_PATH = os.path.join(DATA_DIR, "choice_index.json")
@@ -0,0 +1,116 @@
+"""
+Precompressed variants of the output files: a .gz (and .br if brotli is installed, optional) sibling of each file,
+so that the servers send them as they are instead of compressing the same file on every request, and a manifest
+with the hash and the sizes of each file (manifest.json in the folder of the files).
+"""
+from typing import Dict, Iterable, List
+import gzip
+import hashlib
+import json
+import os
+from fantastic import serializer
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, only the gzip variants are written
+    brotli = None
+
+# ENCODINGS: The extension of the precompressed variant of each encoding (Content-Encoding)
+ENCODINGS: Dict[str, str] = {"br": ".br", "gzip": ".gz"}
+# MANIFEST_NAME: The name of the manifest of the files of a folder
+MANIFEST_NAME = "manifest.json"
+
+
+def available_encodings(encodings: Iterable[str]) -> List[str]:
+    """Returns the encodings that can be written (brotli needs the brotli package)"""
+    return [encoding for encoding in encodings if encoding in ENCODINGS and (encoding != "br" or brotli is not None)]
+
+
+def configured_encodings(config) -> List[str]:
+    """Returns the encodings of the [precompress] section of data.cfg, none if precompression is disabled"""
+    if not config.has_section("precompress") or not json.loads(config.get("precompress", "enabled")):
+        return []
+    return available_encodings(json.loads(config.get("precompress", "encodings")))
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Returns the data compressed with the encoding, at the highest level (it is done once per file)"""
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def content_hash(data: bytes) -> str:
+    """Returns the sha256 of the data"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def write_atomically(path: str, data: bytes) -> None:
+    """Writes the file, replacing the previous one only once it is complete"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as tmp_file:
+        tmp_file.write(data)
+    os.replace(tmp_path, path)
+
+
+def write_precompressed(path: str, data: bytes, encodings: Iterable[str]) -> dict:
+    """
+    Writes the precompressed variants of the file (path.gz, path.br) and returns its entry in the manifest
+
+    Parameters:
+        path (str): The path of the file (already written)
+        data (bytes): The content of the file
+        encodings (Iterable[str]): The encodings of the variants (keys of ENCODINGS)
+    Returns:
+        entry (dict): The hash and size of the file, and the size of each variant
+    """
+    entry = {"sha256": content_hash(data), "size": len(data)}
+    for encoding in encodings:
+        compressed = compress(data, encoding)
+        write_atomically(path + ENCODINGS[encoding], compressed)
+        entry[encoding] = len(compressed)
+    return entry
+
+
+def load_manifest(directory: str) -> Dict[str, dict]:
+    """Returns the manifest of the folder (path relative to the folder -> entry), empty if there is none"""
+    try:
+        return serializer.load(os.path.join(directory, MANIFEST_NAME))
+    except (OSError, serializer.JSONDecodeError):
+        return {}
+
+
+def update_manifest(directory: str, entries: Dict[str, dict]) -> Dict[str, dict]:
+    """Adds the entries (path relative to the folder -> entry) to the manifest of the folder and returns it"""
+    manifest = load_manifest(directory)
+    manifest.update(entries)
+    write_atomically(os.path.join(directory, MANIFEST_NAME), serializer.dumps(manifest, pretty=True))
+    return manifest
+
+
+def precompress_directory(directory: str, suffixes: Iterable[str], encodings: Iterable[str]) -> Dict[str, dict]:
+    """
+    Writes the precompressed variants of the files of the folder (and subfolders) with the suffixes
+    (ex: (".css", ".js")), only for the files whose content changed since the manifest was written, then the manifest
+
+    Returns:
+        manifest (Dict[str, dict]): The entry of each file (path relative to the folder, ex: "js/front.js")
+    """
+    encodings = available_encodings(encodings)
+    previous = load_manifest(directory)
+    entries = {}
+    for root, _, files in os.walk(directory):
+        for file_name in files:
+            if not file_name.endswith(tuple(suffixes)):
+                continue
+            path = os.path.join(root, file_name)
+            relative_path = os.path.relpath(path, directory).replace(os.sep, "/")
+            with open(path, "rb") as opened_file:
+                data = opened_file.read()
+            entry = previous.get(relative_path)
+            up_to_date = entry is not None and entry["sha256"] == content_hash(data) and all(
+                encoding in entry and os.path.exists(path + ENCODINGS[encoding]) for encoding in encodings
+            )
+            entries[relative_path] = entry if up_to_date else write_precompressed(path, data, encodings)
+    write_atomically(os.path.join(directory, MANIFEST_NAME), serializer.dumps(entries, pretty=True))
+    return entries
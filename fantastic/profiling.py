@@ -0,0 +1,218 @@
+from collections import defaultdict
+from contextlib import nullcontext
+from typing import Callable, Dict
+import cProfile
+import io
+import json
+import pstats
+import time
+import tracemalloc
+
+# the context manager returned by the profiler when it is disabled (nothing is measured)
+_NO_OP = nullcontext()
+
+
+class StageTimer:
+    """
+    Context manager passing the time spent in its block to add (ex: Profiler.add_time, ExerciseRecord.add_time
+    of fantastic/run_log.py), with the name of its stage
+    """
+
+    __slots__ = ("add", "name", "start")
+
+    def __init__(self, add: Callable[[str, float], None], name: str) -> None:
+        self.add = add
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> "StageTimer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.add(self.name, time.perf_counter() - self.start)
+
+
+class ExerciseTimer:
+    """
+    Context manager measuring the adaptation of one exercise: its total time and,
+    if it was asked for its type, its cProfile statistics and its peak memory
+    """
+
+    __slots__ = ("profiler", "file_name", "exercise_type", "start", "cprofile", "tracemalloc")
+
+    def __init__(self, profiler: "Profiler", file_name: str, exercise_type: str) -> None:
+        self.profiler = profiler
+        self.file_name = file_name
+        self.exercise_type = exercise_type
+        self.start = 0.0
+        self.cprofile = exercise_type in profiler.cprofile_types
+        self.tracemalloc = exercise_type in profiler.tracemalloc_types
+
+    def __enter__(self) -> "ExerciseTimer":
+        if self.tracemalloc:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+            else:  # python < 3.9: the peak is reset with the traces
+                tracemalloc.clear_traces()
+        if self.cprofile:
+            self.profiler.cprofiles[self.exercise_type].enable()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        elapsed = time.perf_counter() - self.start
+        if self.cprofile:
+            self.profiler.cprofiles[self.exercise_type].disable()
+        if self.tracemalloc:
+            _, peak = tracemalloc.get_traced_memory()
+            peaks = self.profiler.memory_peaks
+            peaks[self.exercise_type] = max(peaks.get(self.exercise_type, 0), peak)
+        self.profiler.add_exercise(self.file_name, self.exercise_type, elapsed)
+
+
+class Profiler:
+    """
+    Instrumentation of the batch conversion (fantastic/main.py): timers of the stages of the adaptation of the
+    exercises (ex: load_json, adapt, nlp tagging...), counters, and opt-in cProfile / tracemalloc captures per type
+    of exercise. It is configured by the [profiling] section of data.cfg and does nothing when it is disabled.
+
+    Class attributes:
+        enabled (bool): Whether anything is measured
+        cprofile_types (List[str]): The types of exercises profiled with cProfile
+        tracemalloc_types (List[str]): The types of exercises whose peak memory is traced
+        slowest_exercises (int): The number of slowest exercises in the report
+        cprofile_lines (int): The number of functions of each cProfile statistics in the report
+        stage_times (Dict[str, float]): The total time spent in each stage
+        stage_calls (Dict[str, int]): The number of times each stage was entered
+        counters (Dict[str, int]): The counters (ex: number of exercises adapted, errors, skipped)
+        exercises (List[tuple]): The time of each exercise adapted (time, file name, type)
+        cprofiles (Dict[str, cProfile.Profile]): The cProfile statistics of each type
+        memory_peaks (Dict[str, int]): The peak memory (bytes) of the adaptation of an exercise of each type
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.cprofile_types = []
+        self.tracemalloc_types = []
+        self.slowest_exercises = 10
+        self.cprofile_lines = 15
+        self.reset()
+
+    def configure(self, config) -> "Profiler":
+        """Reads the [profiling] section of the config (the profiler stays disabled without it)"""
+        if not config.has_section("profiling"):
+            return self
+        self.enabled = json.loads(config.get("profiling", "enabled"))
+        self.cprofile_types = json.loads(config.get("profiling", "cprofile_types"))
+        self.tracemalloc_types = json.loads(config.get("profiling", "tracemalloc_types"))
+        self.slowest_exercises = config.getint("profiling", "slowest_exercises")
+        self.cprofile_lines = config.getint("profiling", "cprofile_lines")
+        return self
+
+    def reset(self) -> None:
+        """Forgets everything measured"""
+        self.stage_times = defaultdict(float)
+        self.stage_calls = defaultdict(int)
+        self.counters = defaultdict(int)
+        self.exercises = []
+        self.cprofiles = defaultdict(cProfile.Profile)
+        self.memory_peaks = {}
+
+    def stage(self, name: str):
+        """
+        Returns a context manager adding the time spent in its block to the stage
+        (ex: with profiler.stage("adapt"): ...), that does nothing when the profiler is disabled
+        """
+        if not self.enabled:
+            return _NO_OP
+        return StageTimer(self.add_time, name)
+
+    def exercise(self, file_name: str, exercise_type: str):
+        """Returns a context manager measuring the adaptation of one exercise (does nothing when disabled)"""
+        if not self.enabled:
+            return _NO_OP
+        return ExerciseTimer(self, file_name, exercise_type)
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Adds the value to the counter"""
+        if self.enabled:
+            self.counters[name] += value
+
+    def add_time(self, name: str, elapsed: float) -> None:
+        self.stage_times[name] += elapsed
+        self.stage_calls[name] += 1
+
+    def add_stages(self, stages: Dict[str, float]) -> None:
+        """Adds the times of stages measured elsewhere (ex: the stages of a record of the run log)"""
+        if self.enabled:
+            for name, elapsed in stages.items():
+                self.add_time(name, elapsed)
+
+    def add_exercise(self, file_name: str, exercise_type: str, elapsed: float) -> None:
+        self.exercises.append((elapsed, file_name, exercise_type))
+
+    def report(self) -> dict:
+        """
+        Returns the report of the run
+
+        Returns:
+            report (dict): The total time of each stage (stages can be nested, ex: "select.nlp_spacy" is part of
+            "adapt"), the total time of each type of exercise, the slowest exercises, the counters,
+            the peak memory of each traced type and the most expensive functions of each profiled type
+        """
+        type_times = defaultdict(float)
+        type_counts = defaultdict(int)
+        for elapsed, _, exercise_type in self.exercises:
+            type_times[exercise_type] += elapsed
+            type_counts[exercise_type] += 1
+        return {
+            "total_s": round(sum(elapsed for elapsed, _, _ in self.exercises), 6),
+            "stages": {
+                name: {"total_s": round(total, 6), "calls": self.stage_calls[name]}
+                for name, total in sorted(self.stage_times.items(), key=lambda item: -item[1])
+            },
+            "types": {
+                exercise_type: {"total_s": round(total, 6), "exercises": type_counts[exercise_type]}
+                for exercise_type, total in sorted(type_times.items(), key=lambda item: -item[1])
+            },
+            "slowest_exercises": [
+                {"file": file_name, "type": exercise_type, "time_s": round(elapsed, 6)}
+                for elapsed, file_name, exercise_type in sorted(self.exercises, reverse=True)[: self.slowest_exercises]
+            ],
+            "counters": dict(self.counters),
+            "memory_peaks_kb": {
+                exercise_type: round(peak / 1024, 1) for exercise_type, peak in self.memory_peaks.items()
+            },
+            "cprofile": {
+                exercise_type: self.__cprofile_summary(cprofile) for exercise_type, cprofile in self.cprofiles.items()
+            },
+        }
+
+    def __cprofile_summary(self, cprofile: cProfile.Profile) -> str:
+        """Returns the most expensive functions (cumulative time) of the cProfile statistics"""
+        stream = io.StringIO()
+        try:
+            pstats.Stats(cprofile, stream=stream).sort_stats("cumulative").print_stats(self.cprofile_lines)
+        except TypeError:  # no exercise was profiled
+            return ""
+        return stream.getvalue()
+
+    def print_report(self) -> None:
+        """Prints the report of the run (nothing when the profiler is disabled)"""
+        if not self.enabled:
+            return None
+        report = self.report()
+        cprofile_summaries: Dict[str, str] = report.pop("cprofile")
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        for exercise_type, summary in cprofile_summaries.items():
+            print(f"cProfile of {exercise_type}:\n{summary}")
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        return None
+
+
+# the profiler of the process, shared by the driver and the exercises
+profiler = Profiler()
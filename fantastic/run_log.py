@@ -0,0 +1,261 @@
+"""
+Run log of the batch conversion (fantastic/main.py): one json record per exercise (jsonl file) with its
+duration per stage, output size, status and the hash of its traceback if it failed. Two runs are compared with:
+    python -m fantastic.run_log diff old_run.jsonl new_run.jsonl [--threshold 0.5] [--min-ms 5]
+    python -m fantastic.run_log summary run.jsonl
+"""
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+import argparse
+import hashlib
+import json
+import os
+import traceback
+import fantastic.paths
+from fantastic import serializer
+from fantastic.profiling import StageTimer
+
+# the status of the exercises in the run log
+OK = "ok"
+ERROR = "error"
+SKIPPED = "skipped"  # not tagged, or a type that is not converted
+
+
+def traceback_hash(error: BaseException) -> str:
+    """
+    Returns a short hash identifying where the error happened: its type and the functions of its traceback
+    (without the line numbers and the message, so that the same failure has the same hash from one run to the next)
+    """
+    frames = [
+        f"{os.path.basename(frame.filename)}:{frame.name}" for frame in traceback.extract_tb(error.__traceback__)
+    ]
+    return hashlib.sha1("|".join([type(error).__name__] + frames).encode("utf-8")).hexdigest()[:12]
+
+
+class ExerciseRecord:
+    """
+    The record of the conversion of one exercise
+
+    Class attributes:
+        id (str): The name of the json file of the exercise without its extension
+        type (str): The type of the exercise
+        class_name (str): The name of the class converting it
+        stages (Dict[str, float]): The time (s) spent in each stage of the conversion
+        output_size (int): The size (bytes) of the html generated
+        status (str): OK, ERROR or SKIPPED
+        error (str): The type and message of the error
+        traceback (str): The formatted traceback of the error
+        traceback_hash (str): The hash of the traceback (see traceback_hash)
+    """
+
+    def __init__(self, exercise_id: str, exercise_type: Optional[str], class_name: Optional[str]) -> None:
+        self.id = exercise_id
+        self.type = exercise_type
+        self.class_name = class_name
+        self.stages = {}
+        self.output_size = 0
+        self.status = OK
+        self.error = None
+        self.traceback = None
+        self.traceback_hash = None
+
+    def stage(self, name: str) -> StageTimer:
+        """Returns a context manager timing a stage of the conversion (ex: with record.stage("adapt"): ...)"""
+        return StageTimer(self.add_time, name)
+
+    def add_time(self, name: str, elapsed: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def fail(self, error: BaseException) -> None:
+        """Stores the error that stopped the conversion"""
+        self.status = ERROR
+        self.error = f"{type(error).__name__}: {error}"
+        self.traceback = "".join(traceback.format_exception(type(error), error, error.__traceback__))
+        self.traceback_hash = traceback_hash(error)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "type": self.type,
+            "class": self.class_name,
+            "status": self.status,
+            "duration_s": round(sum(self.stages.values()), 6),
+            "stages": {name: round(elapsed, 6) for name, elapsed in self.stages.items()},
+            "output_size": self.output_size,
+            "error": self.error,
+            "traceback_hash": self.traceback_hash,
+            "traceback": self.traceback,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ExerciseRecord":
+        """Returns the record of its dict (see to_dict, ex: a record sent by the adaptation service)"""
+        record = cls(data["id"], data["type"], data["class"])
+        record.stages = dict(data["stages"])
+        record.output_size = data["output_size"]
+        record.status = data["status"]
+        record.error = data["error"]
+        record.traceback = data["traceback"]
+        record.traceback_hash = data["traceback_hash"]
+        return record
+
+
+class RunLog:
+    """
+    Writer of the run log: a jsonl file with one record per exercise, written as soon as the exercise is converted
+    (the log of a run that crashed keeps the exercises converted before the crash)
+
+    Class attributes:
+        path (str): The path of the jsonl file
+        counts (Counter): The number of records of each status
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.counts = Counter()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.__file = open(path, "wb")
+
+    def write(self, record: ExerciseRecord) -> None:
+        self.counts[record.status] += 1
+        self.__file.write(serializer.dumps(record.to_dict()) + b"\n")
+        self.__file.flush()
+
+    def close(self) -> None:
+        self.__file.close()
+
+    def __enter__(self) -> "RunLog":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def new_run_log_path(config) -> str:
+    """Returns the path of the log of a new run, in the folder of the [run_log] section of data.cfg"""
+    directory = json.loads(config.get("run_log", "directory")) or fantastic.paths.RUN_LOG_DIR
+    return os.path.join(directory, f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+
+
+def load_run(path: str) -> Dict[str, dict]:
+    """Returns the records of a run log by exercise id"""
+    with open(path, "rb") as log_file:
+        return {record["id"]: record for record in map(serializer.loads, filter(bytes.strip, log_file))}
+
+
+def percentile(values: List[float], rank: float) -> float:
+    """Returns the value under which rank % of the values are (nearest rank), 0 without values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(rank / 100 * len(ordered) + 0.5) - 1))]
+
+
+def summarize_run(records: Dict[str, dict]) -> dict:
+    """Returns the number of exercises of each status, the failures by traceback hash and the latencies by type"""
+    durations = defaultdict(list)
+    failures = defaultdict(list)
+    for record in records.values():
+        if record["status"] == OK:
+            durations[record["type"]].append(record["duration_s"])
+        elif record["status"] == ERROR:
+            failures[record["traceback_hash"]].append(record["id"])
+    return {
+        "status": dict(Counter(record["status"] for record in records.values())),
+        "failures": {
+            traceback_id: {"count": len(ids), "error": records[ids[0]]["error"], "examples": sorted(ids)[:5]}
+            for traceback_id, ids in sorted(failures.items(), key=lambda item: -len(item[1]))
+        },
+        "latency_ms": {
+            exercise_type: {
+                "exercises": len(values),
+                "p50": round(percentile(values, 50) * 1000, 3),
+                "p99": round(percentile(values, 99) * 1000, 3),
+            }
+            for exercise_type, values in sorted(durations.items())
+        },
+    }
+
+
+def diff_runs(old: Dict[str, dict], new: Dict[str, dict], threshold: float = 0.5, min_ms: float = 5.0) -> dict:
+    """
+    Compares two runs by failure set and by latency
+
+    Parameters:
+        old (Dict[str, dict]): The records of the reference run by exercise id (see load_run)
+        new (Dict[str, dict]): The records of the run to compare by exercise id
+        threshold (float) (default: 0.5): The relative increase of the duration of an exercise to report it
+        min_ms (float) (default: 5.0): The minimal increase (ms) of the duration of an exercise to report it
+        (small durations are noisy)
+    Returns:
+        diff (dict): The exercises that now fail, that are fixed, that fail differently (other traceback hash),
+        that are missing or added, the slower / faster exercises and the p50 / p99 of each type in both runs
+    """
+    def failed(records: Dict[str, dict]) -> set:
+        return {exercise_id for exercise_id, record in records.items() if record["status"] == ERROR}
+
+    old_failed, new_failed = failed(old), failed(new)
+    common = sorted(set(old) & set(new))
+    changed_failures = [
+        {"id": exercise_id, "old": old[exercise_id]["traceback_hash"], "new": new[exercise_id]["traceback_hash"],
+         "error": new[exercise_id]["error"]}
+        for exercise_id in common
+        if exercise_id in old_failed and exercise_id in new_failed
+        and old[exercise_id]["traceback_hash"] != new[exercise_id]["traceback_hash"]
+    ]
+
+    slower, faster = [], []
+    for exercise_id in common:
+        if old[exercise_id]["status"] != OK or new[exercise_id]["status"] != OK:
+            continue
+        old_ms = old[exercise_id]["duration_s"] * 1000
+        new_ms = new[exercise_id]["duration_s"] * 1000
+        change = {"id": exercise_id, "type": new[exercise_id]["type"], "old_ms": round(old_ms, 3),
+                  "new_ms": round(new_ms, 3)}
+        if new_ms - old_ms >= min_ms and new_ms > old_ms * (1 + threshold):
+            slower.append(change)
+        elif old_ms - new_ms >= min_ms and old_ms > new_ms * (1 + threshold):
+            faster.append(change)
+
+    old_latencies = summarize_run(old)["latency_ms"]
+    new_latencies = summarize_run(new)["latency_ms"]
+    return {
+        "new_failures": [
+            {"id": exercise_id, "error": new[exercise_id]["error"], "traceback_hash": new[exercise_id]["traceback_hash"]}
+            for exercise_id in sorted((new_failed - old_failed) & set(old))
+        ],
+        "fixed": sorted((old_failed - new_failed) & set(new)),
+        "changed_failures": changed_failures,
+        "missing": sorted(set(old) - set(new)),
+        "added": sorted(set(new) - set(old)),
+        "slower": sorted(slower, key=lambda change: change["old_ms"] - change["new_ms"]),
+        "faster": sorted(faster, key=lambda change: change["new_ms"] - change["old_ms"]),
+        "latency_ms": {
+            exercise_type: {"old": old_latencies.get(exercise_type), "new": new_latencies.get(exercise_type)}
+            for exercise_type in sorted(set(old_latencies) | set(new_latencies))
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    diff_parser = commands.add_parser("diff", help="compare two runs by failure set and by latency")
+    diff_parser.add_argument("old", help="run log of the reference run")
+    diff_parser.add_argument("new", help="run log of the run to compare")
+    diff_parser.add_argument("--threshold", type=float, default=0.5, help="relative increase of a duration to report")
+    diff_parser.add_argument("--min-ms", type=float, default=5.0, help="minimal increase of a duration to report")
+    summary_parser = commands.add_parser("summary", help="status, failures and latencies of a run")
+    summary_parser.add_argument("run", help="run log")
+    args = parser.parse_args()
+
+    if args.command == "diff":
+        report = diff_runs(load_run(args.old), load_run(args.new), args.threshold, args.min_ms)
+    else:
+        report = summarize_run(load_run(args.run))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Json layer of the project: orjson when it is installed (optional, much faster), the standard library otherwise.
+The files are read and written as utf-8 bytes, compact by default (pretty=True to indent them).
+"""
+from typing import Any, Union
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the json module of the standard library is used instead
+    orjson = None
+
+# BACKEND: The library serializing the json ("orjson" or "json")
+BACKEND = "orjson" if orjson is not None else "json"
+
+# the error raised on an invalid json by both backends (orjson.JSONDecodeError is a subclass)
+JSONDecodeError = json.JSONDecodeError
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Returns the object of the json (bytes or str)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, pretty: bool = False) -> bytes:
+    """
+    Returns the json of the object as utf-8 bytes (non ascii characters are not escaped)
+
+    Parameters:
+        obj (Any): The object to serialize
+        pretty (bool) (default: False): Whether to indent the json (2 spaces) instead of the compact output
+    Returns:
+        data (bytes): The json
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def load(path: str) -> Any:
+    """Returns the object of the json file"""
+    with open(path, "rb") as json_file:
+        return loads(json_file.read())
+
+
+def dump(obj: Any, path: str, pretty: bool = False) -> None:
+    """Writes the object in the json file (see dumps)"""
+    with open(path, "wb") as json_file:
+        json_file.write(dumps(obj, pretty))
@@ -0,0 +1,126 @@
+"""
+Client of the adaptation service (fantastic/service/main.py), over its unix socket or its url.
+Only the standard library is used: the processes using the service do not load the models nor their packages.
+"""
+from typing import Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+import http.client
+import json
+import socket
+import threading
+from fantastic import serializer
+
+
+class ServiceError(Exception):
+    """Error returned by the adaptation service (or the service could not be reached)"""
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over a unix socket (uvicorn --uds) instead of a tcp one"""
+
+    def __init__(self, socket_path: str, timeout: float) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class ServiceClient:
+    """
+    Client of the adaptation service, one persistent connection per thread
+
+    Class attributes:
+        socket_path (str): The unix socket of the service (None if it is reached by its url)
+        url (str): The url of the service (ex: http://127.0.0.1:8001), used if there is no socket_path
+        timeout (float): The timeout (s) of a request (a batch of exercises can take a while)
+    """
+
+    def __init__(self, socket_path: str = None, url: str = None, timeout: float = 600) -> None:
+        if not socket_path and not url:
+            raise ValueError("the adaptation service needs a socket path or an url")
+        self.socket_path = socket_path
+        self.url = url
+        self.timeout = timeout
+        self.__local = threading.local()
+
+    def connection(self) -> http.client.HTTPConnection:
+        """Returns the connection of the current thread (opened at its first request)"""
+        connection = getattr(self.__local, "connection", None)
+        if connection is None:
+            if self.socket_path:
+                connection = UnixHTTPConnection(self.socket_path, self.timeout)
+            else:
+                parts = urlsplit(self.url)
+                connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=self.timeout)
+            self.__local.connection = connection
+        return connection
+
+    def request(self, method: str, path: str, body: dict = None):
+        """Sends the request and returns the json of the response (ServiceError if it is not a success)"""
+        data = serializer.dumps(body) if body is not None else None
+        headers = {"Content-Type": "application/json"} if data is not None else {}
+        # the connection kept may have been closed by the service since the last request: we try again once
+        for attempt in range(2):
+            connection = self.connection()
+            try:
+                connection.request(method, path, body=data, headers=headers)
+                response = connection.getresponse()
+                content = response.read()
+                break
+            except (http.client.HTTPException, OSError) as e:
+                connection.close()
+                self.__local.connection = None
+                if attempt:
+                    raise ServiceError(f"the adaptation service could not be reached: {e}") from e
+        if response.status != 200:
+            raise ServiceError(f"{method} {path}: {response.status} {content.decode('utf-8', 'replace')}")
+        return serializer.loads(content)
+
+    def health(self) -> dict:
+        """Returns the status of the service and the models it loaded"""
+        return self.request("GET", "/health")
+
+    def adapt(self, exercise_json: dict, exercise_type: str, exercise_id: str = "exercise") -> dict:
+        """
+        Returns the adaptation of the exercise by the service (ServiceError if it could not be adapted)
+
+        Parameters:
+            exercise_json (dict): The json of the exercise
+            exercise_type (str): Its type (ex: "RC") or the name of the class adapting it (ex: "RemplirClavier")
+            exercise_id (str): The id of the exercise (the name of its json file)
+        Returns:
+            result (dict): The html ("html"), the output folder of the type ("output_folder") and the run log
+            record of the adaptation ("record", see fantastic.run_log.ExerciseRecord.to_dict)
+        """
+        result = self.request("POST", "/adapt", {"id": exercise_id, "type": exercise_type, "exercise": exercise_json})
+        if result["html"] is None:
+            raise ServiceError(f"{exercise_id} could not be adapted: {result['record']['error']}")
+        return result
+
+    def adapt_batch(self, exercises: Iterable[Tuple[str, str, dict]]) -> List[dict]:
+        """
+        Returns the adaptation of each exercise (id, type, json) by the service, in one request
+        (the html of an exercise that could not be adapted is None, see adapt)
+        """
+        body = {"exercises": [
+            {"id": exercise_id, "type": exercise_type, "exercise": exercise_json}
+            for exercise_id, exercise_type, exercise_json in exercises
+        ]}
+        return self.request("POST", "/adapt_batch", body)["results"]
+
+    def predict_tags(self, xml: str) -> dict:
+        """Returns the probabilities of the tags of the xml of an exercise, predicted by the tagging model"""
+        return self.request("POST", "/predict_tags", {"xml": xml})["tags"]
+
+
+def configured_client(config) -> Optional[ServiceClient]:
+    """Returns the client of the service of the [service] section of data.cfg if it is used, None otherwise"""
+    if not config.has_section("service") or not json.loads(config.get("service", "use_service")):
+        return None
+    return ServiceClient(
+        socket_path=json.loads(config.get("service", "socket")) or None,
+        url=json.loads(config.get("service", "url")) or None,
+    )
@@ -0,0 +1,170 @@
+"""
+Adaptation service: the nlp models (spacy, camembert) and the tagging model loaded once and kept in memory,
+used by fantastic/main.py and the correction application (with use_service=true in the [service] section of
+data.cfg, see fantastic/service/client.py) instead of loading them at every start:
+    uvicorn fantastic.service.main:app --uds /tmp/fantastic.sock
+"""
+from configparser import ConfigParser
+from typing import Dict, List, Tuple
+import asyncio
+import json
+import os
+import threading
+from fastapi import Body, FastAPI, HTTPException
+from starlette.concurrency import run_in_threadpool
+import fantastic.paths
+from fantastic.correction.backend.tag_prediction import load_tagging_model, predict_tags_batch
+from fantastic.exercises.utils import generate_nlp_models
+from fantastic.main import DISPATCH, adapt_exercise
+from fantastic.run_log import ExerciseRecord, OK, SKIPPED
+
+config = ConfigParser()
+config.read(os.path.join(fantastic.paths.FANTASTIC_DIR, "exercises", "data.cfg"))
+
+# EXERCISE_CLASSES: The class adapting each type of exercise and whether it needs the nlp models, by type
+# (ex: "RC", the type of the json) and by class name (ex: "RemplirClavier", the tags of the correction application)
+EXERCISE_CLASSES: Dict[str, Tuple[type, bool]] = dict(DISPATCH)
+EXERCISE_CLASSES.update(
+    {exercise_class.__name__: (exercise_class, needs_nlp) for exercise_class, needs_nlp in DISPATCH.values()}
+)
+# MODELS: The models loaded when starting the service
+MODELS = {"nlp": (None, None), "tagging": None}
+# ADAPT_LOCK: The adaptations are done one at a time (the models and the nlp caches are shared)
+ADAPT_LOCK = threading.Lock()
+
+
+class ResponseWriter:
+    """Keeps the html of the adapted exercises for the response instead of writing it (see Exercise.write_template)"""
+
+    def __init__(self) -> None:
+        self.pages = {}
+
+    def add(self, exercise_id: str, exercise_type: str, html: str) -> None:
+        self.pages[exercise_id] = (exercise_type, html)
+
+
+class TagBatcher:
+    """
+    Groups the xml of the /predict_tags requests received at the same time into one call of the tagging model
+
+    Class attributes:
+        max_batch_size (int): The number of xml from which a batch is predicted without waiting
+        max_wait (float): The time (s) a request waits for other ones before its batch is predicted
+    """
+
+    def __init__(self, max_batch_size: int, max_wait: float) -> None:
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.pending: List[Tuple[str, asyncio.Future]] = []
+        self.timer = None
+
+    async def predict(self, xml: str) -> dict:
+        """Returns the probabilities of the tags of the xml, predicted with the other xml of its batch"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((xml, future))
+        if len(self.pending) >= self.max_batch_size:
+            self.flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.max_wait, self.flush)
+        return await future
+
+    def flush(self) -> None:
+        """Starts the prediction of the pending xml"""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        batch, self.pending = self.pending, []
+        if batch:
+            asyncio.ensure_future(self.run(batch))
+
+    async def run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        try:
+            predictions = await run_in_threadpool(predict_tags_batch, MODELS["tagging"], [xml for xml, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():  # cancelled if its request was (ex: the client disconnected)
+                    future.set_exception(e)
+            return
+        for (_, future), prediction in zip(batch, predictions):
+            if not future.done():
+                # numpy floats are not serializable
+                future.set_result({tag: float(probability) for tag, probability in prediction.items()})
+
+
+def adapt(exercise: dict) -> dict:
+    """
+    Adapts the exercise of the request ({"id", "type", "exercise"}) and returns its html (None if it could not be
+    adapted), the output folder of its type and its run log record (its stages, its error...)
+    """
+    exercise_id, exercise_type = exercise.get("id", "exercise"), exercise.get("type")
+    record = ExerciseRecord(exercise_id, exercise_type, None)
+    if exercise_type not in EXERCISE_CLASSES:
+        record.status = SKIPPED
+        record.error = f"the type {exercise_type} is not converted"
+        return {"id": exercise_id, "html": None, "output_folder": None, "record": record.to_dict()}
+    exercise_class, needs_nlp = EXERCISE_CLASSES[exercise_type]
+    record.class_name = exercise_class.__name__
+    writer = ResponseWriter()
+    instance = None
+    # an exercise that cannot be adapted (missing json, unexpected structure...) only fails its own record
+    with ADAPT_LOCK:
+        try:
+            instance = exercise_class(os.path.join(fantastic.paths.JSON_DIR, exercise_id + ".json"), config)
+            adapt_exercise(instance, record, exercise["exercise"], needs_nlp, MODELS["nlp"], writer)
+        except Exception as e:
+            record.fail(e)
+    output_folder, html = None, None
+    if instance is not None:
+        output_folder, html = writer.pages.get(instance.exercise_id, (instance.output_folder_name, None))
+    return {
+        "id": exercise_id,
+        "html": html if record.status == OK else None,
+        "output_folder": output_folder,
+        "record": record.to_dict(),
+    }
+
+
+app = FastAPI()
+tag_batcher = TagBatcher(
+    json.loads(config.get("service", "tags_batch_size")), json.loads(config.get("service", "tags_max_wait_ms")) / 1000
+)
+
+
+@app.on_event("startup")
+def startup_event():
+    """Loads the models once for all the requests (the tagging model only if enabled in the [service] section)"""
+    MODELS["nlp"] = generate_nlp_models(config)
+    if json.loads(config.get("service", "load_tagging_model")):
+        MODELS["tagging"] = load_tagging_model()
+
+
+@app.get("/health")
+def health():
+    """Returns the status of the service and the models loaded"""
+    return {
+        "status": "ok",
+        "pid": os.getpid(),
+        "nlp": MODELS["nlp"][1] is not None,
+        "tagging": MODELS["tagging"] is not None,
+    }
+
+
+@app.post("/adapt")
+def api_adapt(exercise: dict = Body(..., example={"id": "17_9", "type": "RC", "exercise": {}})):
+    """Returns the adaptation of the exercise (see adapt)"""
+    return adapt(exercise)
+
+
+@app.post("/adapt_batch")
+def api_adapt_batch(batch: dict = Body(..., example={"exercises": [{"id": "17_9", "type": "RC", "exercise": {}}]})):
+    """Returns the adaptation of each exercise of the batch, in order (see adapt)"""
+    return {"results": [adapt(exercise) for exercise in batch["exercises"]]}
+
+
+@app.post("/predict_tags")
+async def api_predict_tags(body: dict = Body(..., example={"xml": "<exercice>...</exercice>"})):
+    """Returns the probabilities of the tags of the xml of an exercise"""
+    if MODELS["tagging"] is None:
+        raise HTTPException(status_code=503, detail="the tagging model is not loaded (see the [service] section)")
+    return {"tags": await tag_batcher.predict(body["xml"])}
@@ -33,4 +33,15 @@ setuptools.setup(
         "fastapi==0.70.0",
         "uvicorn[standard]",
     ],
+    extras_require={
+        # optional: used when installed, the code falls back on the packages above otherwise
+        "fast": [
+            "rapidfuzz",  # Levenshtein scoring of the Choose guidelines (fantastic/exercises/choose/similarity.py)
+            "orjson",  # json files (fantastic/serializer.py)
+        ],
+        "compression": [
+            "brotli",  # .br variants of the output files (fantastic/precompress.py)
+            "brotli-asgi",  # brotli responses of the correction interface
+        ],
+    },
 )
@@ -1,10 +1,11 @@
-import json
+from configparser import ConfigParser
 import os
 import xml.etree
 import numpy as np
 import pandas as pd
 
 import fantastic.paths
+from fantastic.corpus import list_exercise_ids, load_exercise_json
 from fantastic.exercises.utils import find_all_sentences, find_in_dict
 
 
@@ -22,60 +23,52 @@ def get_data_from_json(types_df: pd.DataFrame):
     # creating a new col for content for types_df
     types_df["content"] = pd.Series(np.zeros(len(types_df["exerciseID"])))
 
-    # list of all json files
-    ex_paths = [
-        json_file
-        for json_file in os.listdir(fantastic.paths.JSON_DIR)
-        if json_file.endswith("json")
-    ]
+    # ids of all the exercises (files of JSON_DIR, or the packed corpus if it is used)
+    config = ConfigParser()
+    config.read(os.path.join(fantastic.paths.FANTASTIC_DIR, "exercises", "data.cfg"))
 
-    for ex_path in ex_paths:
+    for ex_nb in list_exercise_ids(config):
 
-        with open(
-            os.path.join(fantastic.paths.JSON_DIR, ex_path), mode="r", encoding="UTF-8"
-        ) as opened_file:
+        json_ex = load_exercise_json(os.path.join(fantastic.paths.JSON_DIR, ex_nb + ".json"), config)
 
-            json_ex = json.load(opened_file)
+        # getting exercise
+        exercise = find_in_dict(json_ex, dict, "exercice")
 
-            # getting exercise
-            exercise = find_in_dict(json_ex, dict, "exercice")
+        # getting guideline
+        guideline = find_in_dict(exercise, str, "consigne")
 
-            # getting guideline
-            guideline = find_in_dict(exercise, str, "consigne")
+        # getting exercise text
+        dict_found = find_in_dict(exercise, dict, "enonce")
+        if not dict_found:
+            exercise_text = find_in_dict(exercise, str, "enonce")
+        else:
+            exercise_text = dict_found
 
-            # getting exercise text
-            dict_found = find_in_dict(exercise, dict, "enonce")
-            if not dict_found:
-                exercise_text = find_in_dict(exercise, str, "enonce")
-            else:
-                exercise_text = dict_found
+        # getting additional_guideline
+        additional_guideline = find_in_dict(exercise, str, "noteSC").join(
+            find_in_dict(exercise_text, str, "#text")
+        )
 
-            # getting additional_guideline
-            additional_guideline = find_in_dict(exercise, str, "noteSC").join(
-                find_in_dict(exercise_text, str, "#text")
-            )
+        # getting sentences
+        if isinstance(exercise_text, dict):
+            ol_case = find_in_dict(exercise_text, dict, "ol")
+            if ol_case:
+                sentences = find_in_dict(ol_case, list, "li")
+            sentences = []
+        else:
+            sentences = find_all_sentences(exercise_text)
+        sentences_str = "".join(sentences)
 
-            # getting sentences
-            if isinstance(exercise_text, dict):
-                ol_case = find_in_dict(exercise_text, dict, "ol")
-                if ol_case:
-                    sentences = find_in_dict(ol_case, list, "li")
-                sentences = []
-            else:
-                sentences = find_all_sentences(exercise_text)
-            sentences_str = "".join(sentences)
+        # getting remaining
+        remaining = find_in_dict(exercise, str, "rest")
 
-            # getting remaining
-            remaining = find_in_dict(exercise, str, "rest")
+        # the content we'll put in data
+        content = f"{guideline} {additional_guideline} {sentences_str} {remaining}"
 
-            # the content we'll put in data
-            content = f"{guideline} {additional_guideline} {sentences_str} {remaining}"
-
-            # we put the content in the dataframe
-            ex_nb = ex_path.split(".")[0]
-            if not types_df.loc[types_df["exerciseID"] == ex_nb, :].empty:
-                index = types_df.index[types_df["exerciseID"] == ex_nb]
-                types_df.loc[index, ["content"]] = content
+        # we put the content in the dataframe
+        if not types_df.loc[types_df["exerciseID"] == ex_nb, :].empty:
+            index = types_df.index[types_df["exerciseID"] == ex_nb]
+            types_df.loc[index, ["content"]] = content
 
     return types_df
 
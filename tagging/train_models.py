@@ -1,3 +1,4 @@
+from typing import List
 import logging
 import os
 import torch
@@ -151,11 +152,23 @@ def evaluate_model(model, eval_data: pd.DataFrame, nb_cats: int):
 def predict(model, input_data: str, nb_cats: int):
     """predict the output of a model on a data point"""
 
+    return predict_batch(model, [input_data], nb_cats)[0]
+
+
+def predict_batch(model, input_data: List[str], nb_cats: int):
+    """predict the output of a model on several data points at once (one call of the model)"""
+
     # predict
-    predictions, raw_outputs = model.predict([input_data])
+    predictions, raw_outputs = model.predict(list(input_data))
+
+    return [probabilities_from_output(raw_output, nb_cats) for raw_output in raw_outputs]
+
+
+def probabilities_from_output(raw_output, nb_cats: int):
+    """the probability of each category from the raw output of the model on a data point, sorted"""
 
     # transforming outputs into a proper dict
-    output_dict = {k: raw_outputs[0][k] for k in range(nb_cats)}
+    output_dict = {k: raw_output[k] for k in range(nb_cats)}
 
     # we add labels to the output dict
     label_dict = get_label_dict(nb_cats)